@@ -0,0 +1,48 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+"""
+Offline benchmarks of pylenium's own overhead, run against a local threaded http server so no network is needed.
+
+Run them standalone (defaults to headless chrome with a reused driver):
+
+    python -m benchmarks --driver-binary-path=/path/to/chromedriver --bench-json=results.json
+
+or through pytest directly, in which case pytest-benchmark is used when it is installed:
+
+    pytest benchmarks -o addopts="" --headless --driver-reuse=session
+"""
+import sys
+
+import pytest
+
+DEFAULT_ARGS = [
+    "-o",
+    "addopts=",
+    "-p",
+    "no:cacheprovider",
+    "--driver-reuse=session",
+    "--chrome-switches=--headless,--no-sandbox,--disable-dev-shm-usage,--disable-gpu",
+]
+
+
+def main(args=None) -> int:
+    return pytest.main(["benchmarks", *DEFAULT_ARGS, *(sys.argv[1:] if args is None else args)])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import os
+import statistics
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+STATIC_CONTENT = os.path.join(os.path.dirname(__file__), os.pardir, "testing", "integration", "static_content")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("pylenium benchmarks")
+    group.addoption(
+        "--bench-json",
+        action="store",
+        default="benchmark-results.json",
+        dest="bench_json",
+        help="File the benchmark results are written to (when pytest-benchmark is not in use)",
+    )
+    group.addoption(
+        "--bench-rounds",
+        action="store",
+        type=int,
+        default=20,
+        dest="bench_rounds",
+        help="How many times each benchmark is repeated",
+    )
+
+
+class BenchmarkHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the integration static content, plus generated pages under /generated/ for heavier scenarios:
+        /generated/grid?rows=N        a table with N rows of text and links
+        /generated/delayed?ms=N       an element which is only added to the page after N milliseconds
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: int(values[0]) for key, values in parse_qs(url.query).items()}
+        if url.path == "/generated/grid":
+            return self._send_html(_grid_page(query.get("rows", 500)))
+        if url.path == "/generated/delayed":
+            return self._send_html(_delayed_page(query.get("ms", 200)))
+        return super().do_GET()
+
+    def _send_html(self, html: str):
+        body = html.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _grid_page(rows: int) -> str:
+    cells = "".join(
+        f'<tr class="row"><td class="name">row {index}</td><td><a href="#{index}">link {index}</a></td></tr>'
+        for index in range(rows)
+    )
+    return f"<html><head><title>grid</title></head><body><table id='grid'>{cells}</table></body></html>"
+
+
+def _delayed_page(delay_ms: int) -> str:
+    return (
+        "<html><head><title>delayed</title></head><body><script>"
+        f"setTimeout(function () {{ var done = document.createElement('div'); done.id = 'done';"
+        f"done.textContent = 'done'; document.body.appendChild(done); }}, {delay_ms});"
+        "</script></body></html>"
+    )
+
+
+@pytest.fixture(scope="session")
+def static_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(BenchmarkHandler, directory=STATIC_CONTENT))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+class Timer:
+    """
+    Stand in for the pytest-benchmark fixture when it is not installed, runs a callable for a number of rounds
+    and records summary statistics which are written to --bench-json at the end of the session
+    """
+
+    results = {}
+
+    def __init__(self, name: str, rounds: int):
+        self.name = name
+        self.rounds = rounds
+
+    def __call__(self, function, *args, setup=None, **kwargs):
+        durations = []
+        for _ in range(self.rounds):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            durations.append(time.perf_counter() - start)
+        Timer.results[self.name] = {
+            "rounds": self.rounds,
+            "min": min(durations),
+            "median": statistics.median(durations),
+            "mean": statistics.mean(durations),
+            "max": max(durations),
+            "stddev": statistics.pstdev(durations),
+        }
+        return result
+
+
+@pytest.fixture
+def bench(request):
+    """
+    :return: a callable bench(function, *args, setup=None) which times function over --bench-rounds rounds
+    """
+    rounds = request.config.getoption("bench_rounds")
+    if request.config.pluginmanager.hasplugin("benchmark"):
+        benchmark = request.getfixturevalue("benchmark")
+
+        def run(function, *args, setup=None, **kwargs):
+            return benchmark.pedantic(
+                function, args=args, kwargs=kwargs, setup=setup, rounds=rounds, iterations=1
+            )
+
+        return run
+    return Timer(request.node.name, rounds)
+
+
+def pytest_sessionfinish(session):
+    if Timer.results:
+        with open(session.config.getoption("bench_json"), "w") as results:
+            json.dump(Timer.results, results, indent=2, sort_keys=True)
@@ -0,0 +1,82 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import pytest
+from selenium.webdriver.common.by import By
+
+from pylenium import plugin
+from pylenium.elements.pylenium_wait import PyleniumWait
+from pylenium.strategies.polling_strategy import FixedPollingStrategy, BackoffPollingStrategy
+
+LOCATORS = {
+    "css": (By.CSS_SELECTOR, "tr.row td.name"),
+    "xpath": (By.XPATH, "//tr[@class='row']/td[@class='name']"),
+}
+
+WAITS = {
+    "poll-fixed": dict(wait_mode="poll", polling_strategy=FixedPollingStrategy(0.25)),
+    "poll-backoff": dict(wait_mode="poll", polling_strategy=BackoffPollingStrategy()),
+    "observer": dict(wait_mode="observer"),
+}
+
+
+def test_driver_creation_and_teardown(bench):
+    create_driver = plugin.thread_local_drivers.supported_drivers[plugin.configuration.browser]
+    bench(lambda: create_driver().quit())
+
+
+def test_navigation(bench, driver, static_server):
+    bench(driver.get, f"{static_server}/start_page.html")
+
+
+@pytest.mark.parametrize("strategy", LOCATORS)
+def test_locate(bench, driver, static_server, strategy):
+    driver.get(f"{static_server}/generated/grid?rows=500")
+    elements = bench(driver.browser.find_elements, *LOCATORS[strategy])
+    assert len(elements) == 500
+
+
+def test_bulk_read_one_call_per_element(bench, driver, static_server):
+    driver.get(f"{static_server}/generated/grid?rows=200")
+    elements = driver.browser.find_elements(*LOCATORS["css"])
+    texts = bench(lambda: [element.text for element in elements])
+    assert texts[-1] == "row 199"
+
+
+def test_bulk_read_batched(bench, driver, static_server):
+    driver.get(f"{static_server}/generated/grid?rows=200")
+    elements = driver.find_all(LOCATORS["css"][1], By.CSS_SELECTOR)
+    texts = bench(lambda: elements.refresh().texts())
+    assert texts[-1] == "row 199"
+
+
+@pytest.mark.parametrize("mode", WAITS)
+def test_wait_for_late_element(bench, driver, static_server, mode):
+    wait = PyleniumWait(driver.browser, 10, **WAITS[mode])
+
+    def open_delayed_page():
+        driver.get(f"{static_server}/generated/delayed?ms=100")
+
+    bench(lambda: wait.until_located((By.ID, "done"), "present"), setup=open_delayed_page)
+
+
+def test_reset_for_reuse(bench, driver, static_server):
+    # pytest-benchmark treats anything setup returns as the (args, kwargs) of the timed call
+    def open_start_page():
+        driver.get(f"{static_server}/start_page.html")
+
+    bench(driver.reset, setup=open_start_page)
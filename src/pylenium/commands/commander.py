@@ -15,21 +15,138 @@
 #  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
 #  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
-from typing import Type
+from typing import Type, List, Any
 
-from pylenium.commands.commands import PyleniumCommand, GetTextCommand
+from pylenium.commands.commands import (
+    PyleniumCommand,
+    GetTextCommand,
+    GetAttributeCommand,
+    GetValueCommand,
+    IsDisplayedCommand,
+    ClickCommand,
+    SetValueCommand,
+    ExecuteScriptCommand,
+)
+from pylenium.exceptions.custom_exceptions import PyleniumCommandException
+
+# Runs a batch of commands in order, stopping at the first failure, and reports each outcome individually
+BATCH_TEMPLATE = """
+var commands = [{functions}], batch = arguments[0], results = [];
+for (var i = 0; i < commands.length; i++) {{
+  try {{
+    results.push({{ok: true, value: commands[i](batch[i])}});
+  }} catch (e) {{
+    results.push({{ok: false, error: String(e)}});
+    break;
+  }}
+}}
+return results;
+"""
+
+
+class CommandResult:
+    """
+    The eventual outcome of a queued command, available once the Commander has flushed its queue
+    """
+
+    def __init__(self, command: PyleniumCommand):
+        self.command = command
+        self.done = False
+        self._value = None
+        self._error = None
+
+    @property
+    def value(self) -> Any:
+        if not self.done:
+            raise PyleniumCommandException(f"{type(self.command).__name__} has not been executed yet")
+        if self._error is not None:
+            raise PyleniumCommandException(self._error)
+        return self._value
+
+    def _settle(self, outcome: dict):
+        self.done = True
+        if outcome is None:
+            self._error = "Not executed, an earlier command in the batch failed"
+        elif outcome.get("ok"):
+            self._value = outcome.get("value")
+        else:
+            self._error = outcome.get("error")
 
 
 class Commander:
-    def __init__(self):
+    """
+    Queues commands against a browser and executes the whole queue as a single javascript payload (one round trip),
+    handing each caller its own CommandResult; registered commands are queued by calling them by name, e.g:
+
+        with driver.commander() as batch:
+            username = batch.get_value(username_field)
+            batch.set_value(password_field, "secret")
+        username.value
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
         self._commands = {}
+        self._queue: List[CommandResult] = []
         self._reset_commands()
+        self._add_element_information_commands()
+        self._add_interaction_commands()
+
+    def __getattr__(self, method: str):
+        commands = self.__dict__.get("_commands", {})
+        if method not in commands:
+            raise AttributeError(f"Commander has no command registered as {method}")
+        return lambda *arguments: self.queue(commands[method](*arguments))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._queue.clear()
+
+    def queue(self, command: PyleniumCommand) -> CommandResult:
+        result = CommandResult(command)
+        self._queue.append(result)
+        return result
+
+    def flush(self) -> List[CommandResult]:
+        """
+        Executes every queued command in a single round trip and settles their results
+        n.b -> when the round trip itself fails every result is settled with that error before it is raised
+        :return: the results in the order the commands were queued
+        """
+        queued, self._queue = self._queue, []
+        if not queued:
+            return queued
+        functions = ", ".join(f"function (args) {{ {result.command.script} }}" for result in queued)
+        try:
+            outcomes = self.browser.execute_script(
+                BATCH_TEMPLATE.format(functions=functions), [result.command.arguments for result in queued]
+            ) or []
+        except Exception as exc:
+            for result in queued:
+                result._settle({"ok": False, "error": f"The batch failed to execute: {exc}"})
+            raise
+        for index, result in enumerate(queued):
+            result._settle(outcomes[index] if index < len(outcomes) else None)
+        return queued
 
     def _reset_commands(self):
         self._commands.clear()
 
     def _add_element_information_commands(self):
         self._register("get_text", GetTextCommand)
+        self._register("get_attribute", GetAttributeCommand)
+        self._register("get_value", GetValueCommand)
+        self._register("is_displayed", IsDisplayedCommand)
+
+    def _add_interaction_commands(self):
+        self._register("click", ClickCommand)
+        self._register("set_value", SetValueCommand)
+        self._register("execute_script", ExecuteScriptCommand)
 
     def _register(self, method: str, command: Type[PyleniumCommand]):
         self._commands.update({method: command})
@@ -20,13 +20,63 @@ from typing import Any
 
 
 class PyleniumCommand(ABC):
-    """The command interface declares a method for executing a command"""
+    """
+    The command interface declares the javascript a command runs in the browser, the script is the body of a
+    function receiving the commands arguments as args, so commands can be executed alone or batched by the Commander
+    """
 
+    def __init__(self, *arguments):
+        self.arguments = list(arguments)
+
+    @property
     @abstractmethod
-    def execute(self) -> Any:
+    def script(self) -> str:
         pass
 
+    def execute(self, browser) -> Any:
+        return browser.execute_script(f"return (function (args) {{ {self.script} }})(arguments[0]);", self.arguments)
+
 
 class GetTextCommand(PyleniumCommand):
-    def execute(self) -> str:
-        pass
+    script = "return args[0].innerText;"
+
+
+class GetAttributeCommand(PyleniumCommand):
+    script = "return args[0].getAttribute(args[1]);"
+
+
+class GetValueCommand(PyleniumCommand):
+    script = "return args[0].value;"
+
+
+class IsDisplayedCommand(PyleniumCommand):
+    script = (
+        "var style = window.getComputedStyle(args[0]);"
+        "return style.visibility !== 'hidden' && style.display !== 'none' && args[0].getClientRects().length > 0;"
+    )
+
+
+class ClickCommand(PyleniumCommand):
+    script = "args[0].click();"
+
+
+class SetValueCommand(PyleniumCommand):
+    script = (
+        "args[0].value = args[1];"
+        "args[0].dispatchEvent(new Event('input', {bubbles: true}));"
+        "args[0].dispatchEvent(new Event('change', {bubbles: true}));"
+    )
+
+
+class ExecuteScriptCommand(PyleniumCommand):
+    """
+    Runs an arbitrary script, which can refer to its own arguments as it would with execute_script
+    """
+
+    def __init__(self, script: str, *arguments):
+        super().__init__(*arguments)
+        self.user_script = script
+
+    @property
+    def script(self) -> str:
+        return f"return (function () {{ {self.user_script} }}).apply(null, args);"
@@ -1,26 +1,26 @@
-from dataclasses import dataclass
-from typing import Dict, Type
-
-import yaml
-from yaml.parser import ParserError
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
 
 from pylenium.exceptions.custom_exceptions import (
     PyleniumCapabilitiesException,
     PyleniumInvalidYamlException,
 )
+from pylenium.strategies.page_loading_strategy import PageLoadingStrategy
+from pylenium.strategies.polling_strategy import (
+    PollingStrategy,
+    FixedPollingStrategy,
+    BackoffPollingStrategy,
+)
 from pylenium.constants.string_globals import (
     LOCALHOST_URL,
     CHROME,
+    DRIVER_REUSE_TEST,
+    WAIT_MODE_POLL,
     NO_CAP_FILE_FOUND_EXCEPTION,
     CAP_FILE_YAML_FORMAT_NOT_ACCEPTABLE,
 )
 
 
-@dataclass
-class PageLoadingStrategy:
-    pass
-
-
 @dataclass
 class ValidUrl:
     pass
@@ -36,27 +36,57 @@ class PyleniumConfig:
         --browser: The browser in which to execute testing on
         --headless: Should the browser run headlessly
         --remote: Should the browser be instantiated for the selenium grid
-        --server: Server ip address of the selenium grid
+        --server: Server ip address of the selenium grid, or a comma separated list of hubs
         --server_port: Server port of the selenium grid
+        --remote_pool_size: Number of keep-alive connections to the selenium grid shared by each worker
+        --remote_keep_alive: Should connections to the selenium grid be pooled and kept alive between commands
+        --remote_connect_timeout: Seconds to wait when connecting to the selenium grid
+        --remote_read_timeout: Seconds to wait for the selenium grid to answer a command
+        --remote_retries: How many times a failed connection to the selenium grid is retried
+        --grid_status_ttl: Seconds a hub's reported load is cached before it is polled again
+        --grid_queue_timeout: Seconds a new session waits for a free slot when every hub is saturated
         --browser_resolution: Size of the instantiated browser window
         --browser_version: Version of the browser we should attempt to automatically aquire (unnecessary with --remote=True)
         --browser_maximized: Should the browser instantiated be maximized
         --aquire_binary: Should we aquire the binary automatically and cache it locally
         --driver_binary_path: If you do not want to aquire the binary, the path to your chromedriver or geckodriver binary
         --page_load_strategy: The strategy we should use to load page(s) and ensure it is time to proceed
+        --network_quiet_period: Seconds without a request in flight before the network counts as idle
         --browser_capabilities: Path to a file containing a dictionary of your browser capabilities @default None
         --load_base_url: On driver instantiation, automatically load your applications base url (e.g login page)
         --explicit_wait: Time in milliseconds to explicitly wait for pyleniums smart actions
         --polling_interval: Time in milliseconds to check smart actions predicates to decipher if continuation should occur
+        --polling_strategy: The PollingStrategy used between polls, fixed at polling_interval or an exponential backoff
+        --polling_max_interval: The cap on the time between polls for the backoff polling strategy
+        --wait_mode: Wait for elements by polling the driver (poll) or with an in page MutationObserver (observer)
         --screenshot_on_fail: Attach a screenshot of the browser if a testing fails
         --page_source_on_fail: Attach the page source (DOM) of the browser if a testing fails
         --stack_trace_on_fail: Provides basic information regarding the reason behind a testing failing
+        --artifacts_dir: Directory failure artifacts (screenshot, page source, stack trace) are written to
+        --artifact_compression: How failure artifacts are compressed on disk, gzip, zstd or none
+        --artifact_max_mb: The most failure artifacts may take up on disk in a single session
+        --command_timings: Time every WebDriver command and report percentiles per command at the end of the run
+        --command_timings_json: Also write the command timings report to this json file (implies --command-timings)
         --click_with_js: Attempt to do clicks using javascript actions (not selenium click actions)
         --sendkeys_with_js: Attempt to send keys (text) using javascript actions (not selenium click actions)
         --default_selector: Default selector for PyleniumElements to use for lookup
         --no-wrap-driver: Should pylenium wrap the driver instance in our own EventFiringWebDriver
         --driver-listener: The path to the .py module we should load your event firing driver listener from
         --chrome-switches: The list of switches to pass to Chrome Options before creating the driver
+        --block-urls: The list of url patterns the browser should never request, e.g analytics or chat widgets
+        --caching-proxy: Send local browsers through a proxy caching static assets on disk for every browser and worker
+        --proxy-cache-dir: The directory the caching proxy keeps its assets in
+        --driver-reuse: Quit the driver after every test (test) or keep it alive and reset it between tests (session)
+        --driver-max-tests: With session reuse, the number of tests after which a driver is replaced
+        --driver-max-age: With session reuse, the seconds after which a driver is replaced
+        --driver-max-memory: With session reuse, the browser memory in MB above which a driver is replaced
+        --driver-liveness-timeout: Seconds a reused driver has to answer a liveness probe before it is replaced, off by
+        default as the probe costs a round trip per test
+        --prewarm-drivers: Number of drivers to launch in the background while tests are being collected
+        --contexts-per-browser: Number of tests which may share one browser at once, each in its own window
+        --pylenium-threads: Number of threads tests run on inside a single process, instead of xdist processes
+        --session-snapshot-ttl: Seconds a login captured by login_as is reused before logging in again
+        --fake-webdriver: Run against the in process fake webdriver server instead of a real browser
     """
 
     def __init__(self, config):
@@ -65,6 +95,13 @@ class PyleniumConfig:
         self.remote: bool = config.getoption("remote")
         self.server: str = config.getoption("server") or LOCALHOST_URL
         self.server_port: int = config.getoption("server_port") or 4444
+        self.remote_pool_size: int = config.getoption("remote_pool_size")
+        self.remote_keep_alive: bool = config.getoption("remote_keep_alive")
+        self.remote_connect_timeout: float = config.getoption("remote_connect_timeout")
+        self.remote_read_timeout: float = config.getoption("remote_read_timeout")
+        self.remote_retries: int = config.getoption("remote_retries")
+        self.grid_status_ttl: float = config.getoption("grid_status_ttl")
+        self.grid_queue_timeout: float = config.getoption("grid_queue_timeout")
         self.browser_resolution: str = config.getoption(
             "browser_resolution"
         ) or "1366x768"
@@ -72,8 +109,9 @@ class PyleniumConfig:
         self.browser_maximized: bool = config.getoption("browser_maximized")
         self.aquire_binary: bool = config.getoption("acquire_binary")
         self.driver_binary_path: str = config.getoption("driver_binary_path")
-        self.page_load_strategy: Type[PageLoadingStrategy] = config.getoption(
-            "page_load_strategy"
+        self.network_quiet_period: float = config.getoption("network_quiet_period")
+        self.page_load_strategy: PageLoadingStrategy = self._resolve_page_load_strategy(
+            config.getoption("page_load_strategy"), self.network_quiet_period
         )
         self.browser_capabilities: Dict = self._try_parse_capabilities_yaml(
             config.getoption("browser_capabilities")
@@ -81,19 +119,61 @@ class PyleniumConfig:
         self.base_url: ValidUrl = config.getoption("base_url")
         self.explicit_wait: int = config.getoption("explicit_wait")
         self.polling_interval: int = config.getoption("polling_interval")
+        self.polling_strategy: PollingStrategy = self._resolve_polling_strategy(
+            config.getoption("polling_strategy"),
+            self.polling_interval,
+            config.getoption("polling_max_interval"),
+        )
+        self.wait_mode: str = config.getoption("wait_mode") or WAIT_MODE_POLL
         self.screenshot_on_fail: bool = config.getoption("store_screenshot")
         self.page_source_on_fail: bool = config.getoption("store_page_source")
         self.stack_trace_on_fail: bool = config.getoption("store_stack_trace")
+        self.artifacts_dir: str = config.getoption("artifacts_dir")
+        self.artifact_compression: str = config.getoption("artifact_compression")
+        self.artifact_max_bytes: int = config.getoption("artifact_max_mb") * 1024 * 1024
+        self.command_timings_json: str = config.getoption("command_timings_json")
+        self.command_timings: bool = config.getoption("command_timings") or bool(self.command_timings_json)
         self.click_with_js: bool = config.getoption("click_with_js")
         self.sendkeys_with_js: bool = config.getoption("sendkeys_with_js")
         self.default_selector: str = config.getoption("default_selector")
         self.driver_listener: str = config.getoption("driver_listener")
         self.chrome_switches: list = config.getoption("chrome_switches")
+        self.block_urls: list = config.getoption("block_urls")
+        self.caching_proxy: bool = config.getoption("caching_proxy")
+        self.proxy_cache_dir: str = config.getoption("proxy_cache_dir")
+        # host:port of the running caching proxy, set once the plugin has started (or been handed) one
+        self.proxy_address: Optional[str] = None
+        self.driver_reuse: str = config.getoption("driver_reuse") or DRIVER_REUSE_TEST
+        self.driver_max_tests: int = config.getoption("driver_max_tests") or 0
+        self.driver_max_age: float = config.getoption("driver_max_age") or 0.0
+        self.driver_max_memory: float = config.getoption("driver_max_memory") or 0.0
+        self.driver_liveness_timeout: float = config.getoption("driver_liveness_timeout") or 0.0
+        self.prewarm_drivers: int = config.getoption("prewarm_drivers") or 0
+        self.contexts_per_browser: int = max(config.getoption("contexts_per_browser") or 1, 1)
+        self.pylenium_threads: int = max(config.getoption("pylenium_threads") or 1, 1)
+        self.session_snapshot_ttl: float = config.getoption("session_snapshot_ttl")
+        self.fake_webdriver: bool = config.getoption("fake_webdriver")
+
+    @staticmethod
+    def _resolve_polling_strategy(choice: str, interval: float, max_interval: float) -> PollingStrategy:
+        if choice == "backoff":
+            return BackoffPollingStrategy(maximum=max_interval)
+        return FixedPollingStrategy(interval)
+
+    @staticmethod
+    def _resolve_page_load_strategy(strategy, network_quiet_period: float) -> PageLoadingStrategy:
+        strategy = strategy() if isinstance(strategy, type) else strategy
+        if strategy.network_quiet_ms is not None:
+            return replace(strategy, network_quiet_ms=int(network_quiet_period * 1000))
+        return strategy
 
     @staticmethod
     def _try_parse_capabilities_yaml(file_path) -> dict:
         if file_path is None:
             return {}
+        import yaml
+        from yaml.parser import ParserError
+
         try:
             with open(file_path, "r") as yaml_file:
                 parsed_yaml = yaml.safe_load(yaml_file)
@@ -0,0 +1,190 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# DRIVER RESET
+CLEAR_WEB_STORAGE = """
+try { window.localStorage.clear(); } catch (e) {}
+try { window.sessionStorage.clear(); } catch (e) {}
+"""
+
+# OBSERVER WAITS
+OBSERVE_LOCATOR = """
+var using = arguments[0], value = arguments[1], condition = arguments[2], expected = arguments[3];
+var timeout = arguments[4], done = arguments[arguments.length - 1];
+var settled = false, observer = null, frame = null, interval = null, timer = null;
+
+function locate() {
+  if (using === 'xpath') {
+    var snapshot = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var found = [];
+    for (var i = 0; i < snapshot.snapshotLength; i++) { found.push(snapshot.snapshotItem(i)); }
+    return found;
+  }
+  return Array.prototype.slice.call(document.querySelectorAll(value));
+}
+
+function visible(element) {
+  var style = window.getComputedStyle(element);
+  return style.visibility !== 'hidden' && style.display !== 'none' && element.getClientRects().length > 0;
+}
+
+function check() {
+  var found = locate();
+  if (condition === 'count') { return found.length === expected ? {value: found} : null; }
+  var element = found[0];
+  if (!element) { return null; }
+  if (condition === 'present' ||
+      (condition === 'visible' && visible(element)) ||
+      (condition === 'enabled' && visible(element) && !element.disabled) ||
+      (condition === 'text' && (element.innerText || element.textContent || '').indexOf(expected) !== -1)) {
+    return {value: element};
+  }
+  return null;
+}
+
+function finish(result) {
+  if (settled) { return; }
+  settled = true;
+  if (observer) { observer.disconnect(); }
+  if (frame) { cancelAnimationFrame(frame); }
+  clearInterval(interval);
+  clearTimeout(timer);
+  done(result);
+}
+
+function evaluate() {
+  frame = null;
+  try {
+    var result = check();
+    if (result) { finish(result); }
+  } catch (e) {
+    finish({error: String(e)});
+  }
+}
+
+function schedule() {
+  if (!frame && !settled) { frame = requestAnimationFrame(evaluate); }
+}
+
+evaluate();
+if (!settled) {
+  observer = new MutationObserver(schedule);
+  observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+  interval = setInterval(evaluate, 100);
+  timer = setTimeout(function () { finish({timeout: true}); }, timeout);
+}
+"""
+
+# BATCHED ELEMENT READS
+READ_ELEMENTS = """
+var elements = arguments[0], reads = arguments[1];
+
+function visible(element) {
+  var style = window.getComputedStyle(element);
+  return style.visibility !== 'hidden' && style.display !== 'none' && element.getClientRects().length > 0;
+}
+
+function attribute(element, name) {
+  var property = element[name];
+  if (typeof property === 'boolean') { return property ? 'true' : null; }
+  if (typeof property === 'string' || typeof property === 'number') { return String(property); }
+  return element.getAttribute(name);
+}
+
+return reads.map(function (read) {
+  return elements.map(function (element) {
+    if (read[0] === 'text') { return visible(element) ? (element.innerText || '').trim() : ''; }
+    if (read[0] === 'visible') { return visible(element); }
+    return attribute(element, read[1]);
+  });
+});
+"""
+
+CAPTURE_WEB_STORAGE = """
+function read(storage) {
+  var entries = {};
+  try {
+    for (var i = 0; i < storage.length; i++) { entries[storage.key(i)] = storage.getItem(storage.key(i)); }
+  } catch (e) {}
+  return entries;
+}
+return {local: read(window.localStorage), session: read(window.sessionStorage)};
+"""
+
+RESTORE_WEB_STORAGE = """
+function write(storage, entries) {
+  try {
+    for (var key in entries) { storage.setItem(key, entries[key]); }
+  } catch (e) {}
+}
+write(window.localStorage, arguments[0]);
+write(window.sessionStorage, arguments[1]);
+"""
+
+# Wraps fetch and XMLHttpRequest once per document to count the requests in flight, chrome installs it before the
+# page's own scripts run; elsewhere requests started before it is installed are only seen through the Resource
+# Timing entries once they finish
+NETWORK_TRACKER = """
+function pyleniumNetwork() {
+  var tracker = window.__pyleniumNetwork;
+  if (tracker) { return tracker; }
+  tracker = window.__pyleniumNetwork = {pending: 0, last: performance.now()};
+  function started() { tracker.pending++; tracker.last = performance.now(); }
+  function finished() { tracker.pending = Math.max(0, tracker.pending - 1); tracker.last = performance.now(); }
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function () {
+      started();
+      try {
+        return fetch.apply(this, arguments).then(
+          function (response) { finished(); return response; },
+          function (error) { finished(); throw error; });
+      } catch (e) { finished(); throw e; }
+    };
+  }
+  var send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    started();
+    this.addEventListener('loadend', finished);
+    try { return send.apply(this, arguments); } catch (e) { this.removeEventListener('loadend', finished); finished(); throw e; }
+  };
+  return tracker;
+}
+
+function networkQuietFor() {
+  var tracker = pyleniumNetwork();
+  if (tracker.pending > 0) { return 0; }
+  var last = tracker.last, entries = performance.getEntriesByType('resource');
+  for (var i = 0; i < entries.length; i++) { last = Math.max(last, entries[i].responseEnd); }
+  return performance.now() - last;
+}
+"""
+
+TRACK_NETWORK = NETWORK_TRACKER + "pyleniumNetwork();"
+
+# Registered with chrome to run before the scripts of every new document, scoped so no helper leaks onto the page
+TRACK_NETWORK_ON_NEW_DOCUMENT = "(function () {" + TRACK_NETWORK + "})();"
+
+NETWORK_IDLE = NETWORK_TRACKER + "return networkQuietFor() >= arguments[0];"
+
+PAGE_READY = NETWORK_TRACKER + """
+var states = arguments[0], quietPeriod = arguments[1];
+if (quietPeriod !== null) { pyleniumNetwork(); }
+if (states.indexOf(document.readyState) === -1) { return false; }
+return quietPeriod === null || networkQuietFor() >= quietPeriod;
+"""
@@ -24,8 +24,19 @@ FIREFOX = "FIREFOX"
 REMOTE = "REMOTE"
 LOCALHOST_URL = "http://localhost:8080"
 
+# DRIVER REUSE
+DRIVER_REUSE_TEST = "test"
+DRIVER_REUSE_SESSION = "session"
+
+# WAIT MODES
+WAIT_MODE_POLL = "poll"
+WAIT_MODE_OBSERVER = "observer"
+
 # PYTEST XDIST
 PYTEST_XDIST_WORKER = "PYTEST_XDIST_WORKER"
+PYTEST_XDIST_TESTRUNUID = "PYTEST_XDIST_TESTRUNUID"
+# markers by which async plugins claim the async def tests they run
+ASYNC_PLUGIN_MARKERS = ("asyncio", "anyio", "trio")
 
 # PLUGIN MISC
 EXEC_STARTED = "Pylenium-pytest has been loaded... Firing on all cylinders!"
@@ -0,0 +1,379 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import asyncio
+import itertools
+import json
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.webdriver import _make_w3c_caps
+
+from pylenium.constants.javascript import PAGE_READY
+from pylenium.driver.driver_factories import RemoteWebDriverFactory
+from pylenium.driver.grid_balancer import parse_hub_urls
+from pylenium.driver.pylenium_driver import SELECTORS
+from pylenium.elements.pylenium_wait import _escape_attribute
+from pylenium.logging.log import log
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class AsyncWebDriverClient:
+    """
+    A small HTTP/1.1 client speaking json to a WebDriver server over asyncio streams, connections are kept alive
+    and reused so concurrent commands only pay for a connection the first time they overlap
+    n.b -> connections belong to the event loop that opened them, any left from an earlier loop are discarded
+    """
+
+    def __init__(self, base_url: str, connect_timeout: float = 10.0, read_timeout: float = 120.0, pool_size: int = 4):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.pool_size = pool_size
+        self._idle: List[Tuple[asyncio.AbstractEventLoop, asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._errors = ErrorHandler()
+
+    async def request(self, method: str, path: str, payload: dict = None) -> Any:
+        """
+        Sends a single command
+        :return: the value of the response
+        :raises: the selenium exception matching the W3C error the server responded with
+        """
+        body = json.dumps(payload if payload is not None else {}).encode() if method == "POST" else b""
+        reader, writer = await self._connection()
+        try:
+            writer.write(self._head(method, path, len(body)) + body)
+            status, keep_alive, data = await asyncio.wait_for(self._response(reader), self.read_timeout)
+        except BaseException:
+            writer.close()
+            raise
+        if keep_alive and len(self._idle) < self.pool_size:
+            self._idle.append((asyncio.get_running_loop(), reader, writer))
+        else:
+            writer.close()
+        text = data.decode("utf-8")
+        if status >= 400:
+            self._errors.check_response({"status": status, "value": text})
+            raise WebDriverException(f"{method} {path} failed with status {status}: {text}")
+        return json.loads(text).get("value") if text else None
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        loop = asyncio.get_running_loop()
+        for owner, _, writer in idle:
+            if owner is loop:
+                writer.close()
+
+    async def _connection(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        loop = asyncio.get_running_loop()
+        while self._idle:
+            owner, reader, writer = self._idle.pop()
+            if owner is loop and not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl or None), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as exc:
+            raise WebDriverException(f"Unable to connect to {self.host}:{self.port}: {exc!r}")
+
+    def _head(self, method: str, path: str, length: int) -> bytes:
+        return (
+            f"{method} {self.prefix}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Accept: application/json\r\n"
+            "Content-Type: application/json;charset=UTF-8\r\n"
+            f"Content-Length: {length}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode()
+
+    @staticmethod
+    async def _response(reader: asyncio.StreamReader) -> Tuple[int, bool, bytes]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise WebDriverException("The WebDriver server closed the connection without responding")
+        version, status = status_line.decode("latin-1").split(" ", 2)[:2]
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            data = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if not size:
+                    break
+                data += chunk[:-2]
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read()
+            headers["connection"] = "close"
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+        return int(status), keep_alive, data
+
+
+class AsyncPyleniumElement:
+    def __init__(self, driver: "AsyncPyleniumDriver", element_id: str):
+        self.driver = driver
+        self.id = element_id
+
+    def __repr__(self):
+        return f"<AsyncPyleniumElement {self.id}>"
+
+    async def _command(self, method: str, path: str, payload: dict = None) -> Any:
+        return await self.driver.command(method, f"/element/{self.id}{path}", payload)
+
+    async def click(self) -> "AsyncPyleniumElement":
+        await self._command("POST", "/click")
+        return self
+
+    async def send_keys(self, *text: str) -> "AsyncPyleniumElement":
+        value = "".join(text)
+        await self._command("POST", "/value", {"text": value, "value": list(value)})
+        return self
+
+    async def clear(self) -> "AsyncPyleniumElement":
+        await self._command("POST", "/clear")
+        return self
+
+    async def text(self) -> str:
+        return await self._command("GET", "/text")
+
+    async def get_attribute(self, name: str) -> Optional[str]:
+        return await self._command("GET", f"/attribute/{name}")
+
+    async def get_property(self, name: str) -> Any:
+        return await self._command("GET", f"/property/{name}")
+
+    async def is_displayed(self) -> bool:
+        return await self._command("GET", "/displayed")
+
+    async def is_enabled(self) -> bool:
+        return await self._command("GET", "/enabled")
+
+    async def find(self, locator: str, by: str = None) -> "AsyncPyleniumElement":
+        return self.driver._element(await self._command("POST", "/element", self.driver._locator(locator, by)))
+
+    async def find_all(self, locator: str, by: str = None) -> List["AsyncPyleniumElement"]:
+        found = await self._command("POST", "/elements", self.driver._locator(locator, by))
+        return [self.driver._element(element) for element in found]
+
+
+class AsyncPyleniumDriver:
+    """
+    A PyleniumDriver counterpart whose commands are coroutines sent straight over the W3C WebDriver protocol, so
+    several sessions can be driven at once with asyncio.gather:
+        alice, bob = AsyncPyleniumDriver(config), AsyncPyleniumDriver(config)
+        await asyncio.gather(alice.get(url), bob.get(url))
+    The session is started against the --server / --server_port hub by start, or on the first command
+    """
+
+    def __init__(self, config, hub: str = None):
+        self.config = config
+        self.hub = hub or parse_hub_urls(config.server, config.server_port)[0]
+        self.client = AsyncWebDriverClient(
+            f"{self.hub}/wd/hub",
+            connect_timeout=config.remote_connect_timeout,
+            read_timeout=config.remote_read_timeout,
+            pool_size=config.remote_pool_size,
+        )
+        self.session_id: Optional[str] = None
+        self.capabilities: dict = {}
+        self._starting: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Lock]] = None
+
+    async def __aenter__(self) -> "AsyncPyleniumDriver":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.quit()
+
+    async def start(self) -> "AsyncPyleniumDriver":
+        """
+        Starts the browser session unless it is already running, concurrent callers share a single start
+        n.b -> the lock is made per event loop, AsyncDriverPool.close quits the sessions on a loop of its own
+        """
+        loop = asyncio.get_running_loop()
+        if self._starting is None or self._starting[0] is not loop:
+            self._starting = (loop, asyncio.Lock())
+        async with self._starting[1]:
+            if self.session_id is None:
+                capabilities = RemoteWebDriverFactory(self.config).resolve_capabilities()
+                payload = {"capabilities": _make_w3c_caps(capabilities), "desiredCapabilities": capabilities}
+                response = await self.client.request("POST", "/session", payload)
+                self.session_id = response["sessionId"]
+                self.capabilities = response.get("capabilities", {})
+        return self
+
+    async def quit(self):
+        """
+        Ends the browser session and closes the connections kept alive to the hub
+        """
+        try:
+            if self.session_id is not None:
+                await self.client.request("DELETE", f"/session/{self.session_id}")
+        finally:
+            self.session_id = None
+            await self.client.close()
+
+    async def command(self, method: str, path: str, payload: dict = None) -> Any:
+        """
+        Sends a command for this session, path is relative to /session/{session id}
+        """
+        if self.session_id is None:
+            await self.start()
+        return await self.client.request(method, f"/session/{self.session_id}{path}", payload)
+
+    # Navigational capabilities
+    async def get(self, url: str) -> "AsyncPyleniumDriver":
+        await self.command("POST", "/url", {"url": url})
+        await self.wait_until_ready()
+        return self
+
+    async def wait_until_ready(self) -> "AsyncPyleniumDriver":
+        """
+        The async counterpart of PyleniumDriver.wait_until_ready, only polls when the page load strategy asks for
+        more than the browser already waits for
+        """
+        strategy = self.config.page_load_strategy
+        if strategy.browser_waits:
+            return self
+        states, quiet = list(strategy.ready_states), strategy.network_quiet_ms
+
+        async def page_ready():
+            return await self.execute_script(PAGE_READY, states, quiet)
+
+        await self.wait_until(page_ready, message="page did not become ready")
+        return self
+
+    async def current_url(self) -> str:
+        return await self.command("GET", "/url")
+
+    async def title(self) -> str:
+        return await self.command("GET", "/title")
+
+    async def page_source(self) -> str:
+        return await self.command("GET", "/source")
+
+    async def execute_script(self, script: str, *args) -> Any:
+        return await self.command("POST", "/execute/sync", {"script": script, "args": list(args)})
+
+    async def delete_all_cookies(self):
+        await self.command("DELETE", "/cookie")
+
+    # Finding elements
+    async def find(self, locator: str, by: str = None) -> AsyncPyleniumElement:
+        """
+        :param by: the selenium By strategy to use, defaults to the --default-selector
+        """
+        return self._element(await self.command("POST", "/element", self._locator(locator, by)))
+
+    async def find_all(self, locator: str, by: str = None) -> List[AsyncPyleniumElement]:
+        found = await self.command("POST", "/elements", self._locator(locator, by))
+        return [self._element(element) for element in found]
+
+    async def xpath(self, expression: str) -> AsyncPyleniumElement:
+        return await self.find(expression, By.XPATH)
+
+    async def wait_until(
+        self, condition: Callable[[], Awaitable[Any]], timeout: float = None, message: str = ""
+    ) -> Any:
+        """
+        Awaits condition every poll of the --polling-strategy until it returns something truthy
+        :param timeout: seconds, defaults to --explicit-wait
+        :return: the truthy result of condition
+        n.b -> a polling strategy which runs out of delays times out as well
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.config.explicit_wait if timeout is None else timeout)
+        for delay in self.config.polling_strategy.delays():
+            result = await condition()
+            if result:
+                return result
+            if loop.time() + delay > deadline:
+                raise TimeoutException(message)
+            await asyncio.sleep(delay)
+        raise TimeoutException(message)
+
+    def _locator(self, locator: str, by: str = None) -> dict:
+        by = by or SELECTORS[self.config.default_selector]
+        if by == By.ID:
+            by, locator = By.CSS_SELECTOR, f'[id="{_escape_attribute(locator)}"]'
+        elif by == By.NAME:
+            by, locator = By.CSS_SELECTOR, f'[name="{_escape_attribute(locator)}"]'
+        elif by == By.CLASS_NAME:
+            by, locator = By.CSS_SELECTOR, f".{locator}"
+        return {"using": by, "value": locator}
+
+    def _element(self, reference: dict) -> AsyncPyleniumElement:
+        return AsyncPyleniumElement(self, reference[ELEMENT_KEY])
+
+
+class AsyncDriverPool:
+    """
+    Hands out AsyncPyleniumDrivers for a single test, spreading their sessions over every configured hub, and
+    quits whichever are still running once the test is over
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.drivers: List[AsyncPyleniumDriver] = []
+        self._hubs = itertools.cycle(parse_hub_urls(config.server, config.server_port))
+
+    def driver(self) -> AsyncPyleniumDriver:
+        """
+        :return: a driver whose session starts on its first command
+        """
+        driver = AsyncPyleniumDriver(self.config, next(self._hubs))
+        self.drivers.append(driver)
+        return driver
+
+    async def start(self, count: int = 1) -> List[AsyncPyleniumDriver]:
+        """
+        Starts count sessions concurrently
+        """
+        return list(await asyncio.gather(*(self.driver().start() for _ in range(count))))
+
+    async def quit_all(self):
+        """
+        Quits every driver concurrently, failures are logged and never stop the remaining drivers from being quit
+        """
+        drivers, self.drivers = self.drivers, []
+        for outcome in await asyncio.gather(*(driver.quit() for driver in drivers), return_exceptions=True):
+            if isinstance(outcome, Exception):
+                log.warning(f"Unable to quit async driver cleanly: {outcome}")
+
+    def close(self):
+        """
+        Quits any sessions left running from outside an event loop, e.g when the test was run by another plugin
+        """
+        if any(driver.session_id for driver in self.drivers):
+            asyncio.run(self.quit_all())
+        self.drivers = []
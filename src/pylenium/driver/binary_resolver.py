@@ -0,0 +1,143 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict
+
+from pylenium.constants.string_globals import CHROME, FIREFOX, PYTEST_XDIST_TESTRUNUID
+from pylenium.exceptions.custom_exceptions import PyleniumArgumentException
+
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.expanduser("~"), ".pylenium", "drivers.json")
+DRIVER_EXECUTABLES = {CHROME: "chromedriver", FIREFOX: "geckodriver"}
+# Browsers auto update, so a driver recorded for the latest version is resolved again once it is this old (seconds)
+LATEST_DRIVER_TTL = 24 * 60 * 60
+
+# Identifies this test run; shared by every xdist worker of the same run so a driver acquired by one is reused by all
+_RUN_ID = os.environ.get(PYTEST_XDIST_TESTRUNUID) or uuid.uuid4().hex
+
+
+class DriverBinaryResolver:
+    """
+    Resolves the driver binary (chromedriver / geckodriver) for a browser once per session and records it in a
+    local manifest keyed by browser and --browser-version, so later sessions (and other xdist workers) can skip
+    the webdriver manager entirely and run deterministically offline
+
+    --driver-binary-path always wins, --acquire-binary forces a fresh acquisition once per test run
+    n.b -> drivers recorded for the 'latest' browser version are only reused for latest_ttl seconds
+    """
+
+    def __init__(self, config, manifest_path: str = DEFAULT_MANIFEST_PATH, latest_ttl: float = LATEST_DRIVER_TTL):
+        self.config = config
+        self.manifest_path = manifest_path
+        self.latest_ttl = latest_ttl
+        self._resolved: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, browser: str, install: Callable[[str], str]) -> str:
+        """
+        :param browser: the browser the driver binary is for, e.g CHROME
+        :param install: callable accepting the browser version and returning the path of an installed binary
+        :return: the path to the driver binary
+        """
+        key = f"{browser}:{self.config.browser_version}"
+        with self._lock:
+            if key not in self._resolved:
+                self._resolved[key] = self._resolve_uncached(browser, key, install)
+            return self._resolved[key]
+
+    def _resolve_uncached(self, browser: str, key: str, install: Callable[[str], str]) -> str:
+        if self.config.driver_binary_path:
+            return self._binary_from_path(browser)
+        with _FileLock(f"{self.manifest_path}.lock"):
+            manifest = self._read_manifest()
+            entry = manifest.get(key)
+            if entry and os.path.isfile(entry["path"]) and not self._expired(entry):
+                if not self.config.aquire_binary or entry["run_id"] == _RUN_ID:
+                    return entry["path"]
+            path = install(self.config.browser_version)
+            manifest[key] = {"path": path, "run_id": _RUN_ID, "resolved_at": time.time()}
+            self._write_manifest(manifest)
+            return path
+
+    def _expired(self, entry: dict) -> bool:
+        """
+        :return: True for a driver recorded for the latest browser version longer than latest_ttl ago, the browser
+        may have updated since
+        """
+        if self.config.browser_version != "latest":
+            return False
+        return time.time() - entry.get("resolved_at", 0) >= self.latest_ttl
+
+    def _binary_from_path(self, browser: str) -> str:
+        path = self.config.driver_binary_path
+        if os.path.isdir(path):
+            executable = DRIVER_EXECUTABLES.get(browser, "")
+            path = os.path.join(path, f"{executable}.exe" if sys.platform.startswith("win") else executable)
+        if not os.path.isfile(path):
+            raise PyleniumArgumentException(f"--driver-binary-path did not contain a driver binary: {path}")
+        return path
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path, "r") as manifest:
+                return json.load(manifest)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: dict):
+        temporary_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as temporary:
+            json.dump(manifest, temporary, indent=2)
+        os.replace(temporary_path, self.manifest_path)
+
+
+class _FileLock:
+    """
+    Minimal cross process lock built on exclusive file creation, locks left behind by a crashed process
+    are considered stale and broken after stale_after seconds
+    """
+
+    def __init__(self, path: str, stale_after: float = 120.0, poll: float = 0.05):
+        self.path = path
+        self.stale_after = stale_after
+        self.poll = poll
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_after:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(self.poll)
+
+    def __exit__(self, *exc_info):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
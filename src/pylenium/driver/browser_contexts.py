@@ -0,0 +1,286 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import copy
+import threading
+import time
+from typing import Callable, List, Optional, Set
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+from pylenium.driver.pylenium_driver import PyleniumDriver
+from pylenium.driver.request_blocking import CDP_EXECUTE, block_in_chrome
+from pylenium.logging.log import log
+
+NEW_WINDOW = ("POST", "/session/$sessionId/window/new")
+WINDOW_HANDLE_COMMANDS = (Command.W3C_GET_WINDOW_HANDLES, Command.GET_WINDOW_HANDLES)
+TARGET_DISCOVERY_TIMEOUT = 2.0
+
+
+class BrowserContext:
+    """
+    The windows one test owns inside a shared browser, commands sent through its scoped browser are always
+    routed to the context's current window first
+    """
+
+    def __init__(self, shared: "SharedBrowser", handle: str, chrome_context_id: str = None):
+        self.shared = shared
+        self.current = handle
+        self.windows: Set[str] = {handle}
+        self.chrome_context_id = chrome_context_id
+        self.closed = False
+
+    @property
+    def isolated(self) -> bool:
+        """
+        Only Chrome DevTools browser contexts keep their own cookies and storage, plain windows share them
+        """
+        return self.chrome_context_id is not None
+
+    def scoped_browser(self):
+        """
+        :return: a shallow copy of the shared webdriver whose commands are confined to this context
+        """
+        root = self.shared.webdriver
+        execute = root.execute
+        scoped = copy.copy(root)
+
+        def routed_execute(driver_command, params=None):
+            return self.shared.route(self, execute, driver_command, params)
+
+        scoped.execute = routed_execute
+        scoped.quit = self.close
+        scoped._switch_to = SwitchTo(scoped)
+        return scoped
+
+    def close(self):
+        """
+        Closes every window the context owns and hands its slot back to the shared browser
+        """
+        self.shared.close_context(self)
+
+
+class SharedBrowser:
+    """
+    A single browser hosting up to capacity tests at once, each one in its own window (and, for Chrome, its own
+    DevTools browser context). The browser can only act on one window at a time so commands are serialised
+    """
+
+    def __init__(self, root: PyleniumDriver, capacity: int, block_urls: List[str] = ()):
+        self.root = root
+        self.webdriver = getattr(root.browser, "wrapped_driver", root.browser)
+        self.capacity = capacity
+        self.block_urls = list(block_urls)
+        self.contexts: List[BrowserContext] = []
+        self.lock = threading.RLock()
+        self.anchor = self.webdriver.current_window_handle
+        self.current = self.anchor
+
+    @property
+    def has_capacity(self) -> bool:
+        return len(self.contexts) < self.capacity
+
+    def open_context(self) -> BrowserContext:
+        """
+        Opens a new window for a test, inside a fresh DevTools browser context when the browser supports it
+        n.b -> --block-urls is applied to every new chrome window, firefox blocks through a browser wide proxy script
+        """
+        with self.lock:
+            context = self._open_chrome_context() or BrowserContext(self, self._open_window())
+            self.contexts.append(context)
+            if self.block_urls and self.webdriver.capabilities.get("browserName") == "chrome":
+                block_in_chrome(self.webdriver, self.block_urls)
+            return context
+
+    def route(self, context: BrowserContext, execute: Callable, driver_command: str, params: Optional[dict]):
+        """
+        Sends a command on behalf of a context, switching the browser to the context's window beforehand
+        n.b -> window switches made by the test are tracked so popups it opened can still be driven
+        """
+        with self.lock:
+            if driver_command == Command.QUIT:
+                context.close()
+                return {"value": None}
+            if driver_command == Command.SWITCH_TO_WINDOW:
+                response = execute(driver_command, params)
+                handle = params.get("handle") or params.get("name")
+                context.current = self.current = handle
+                context.windows.add(handle)
+                return response
+            self._focus(context, execute)
+            response = execute(driver_command, params)
+            if driver_command in WINDOW_HANDLE_COMMANDS:
+                response["value"] = self._visible_handles(context, response["value"])
+            elif driver_command == Command.CLOSE:
+                self._window_closed(context)
+            return response
+
+    def close_context(self, context: BrowserContext):
+        with self.lock:
+            if context.closed:
+                return
+            context.closed = True
+            if context in self.contexts:
+                self.contexts.remove(context)
+            for handle in list(context.windows):
+                try:
+                    self._switch(handle)
+                    self.webdriver.execute(Command.CLOSE)
+                except WebDriverException as exc:
+                    log.debug(f"Window {handle} was already closed: {exc}")
+            context.windows.clear()
+            if context.isolated:
+                self._dispose_chrome_context(context.chrome_context_id)
+            self._switch(self.anchor)
+
+    def quit(self):
+        """
+        Quits the whole browser, along with every context still open in it
+        """
+        with self.lock:
+            for context in self.contexts:
+                context.closed = True
+            self.contexts.clear()
+            self.webdriver.quit()
+
+    def _focus(self, context: BrowserContext, execute: Callable):
+        if context.current is not None and self.current != context.current:
+            execute(Command.SWITCH_TO_WINDOW, {"handle": context.current, "name": context.current})
+            self.current = context.current
+
+    def _switch(self, handle: str):
+        if self.current != handle:
+            self.current = None
+            self.webdriver.execute(Command.SWITCH_TO_WINDOW, {"handle": handle, "name": handle})
+            self.current = handle
+
+    def _visible_handles(self, context: BrowserContext, handles: List[str]) -> List[str]:
+        """
+        Hides the anchor window and the windows of every other context, popups are visible to everyone
+        """
+        foreign = {self.anchor}
+        for other in self.contexts:
+            if other is not context:
+                foreign.update(other.windows)
+        return [handle for handle in handles if handle not in foreign]
+
+    def _window_closed(self, context: BrowserContext):
+        context.windows.discard(context.current)
+        self.current = None
+        context.current = next(iter(context.windows), None)
+        if context.current is None:
+            context.close()
+
+    def _open_window(self) -> str:
+        commands = self.webdriver.command_executor._commands
+        commands.setdefault("newWindow", NEW_WINDOW)
+        try:
+            handle = self.webdriver.execute("newWindow", {"type": "tab"})["value"]["handle"]
+        except (WebDriverException, KeyError, TypeError):
+            self._switch(self.anchor)
+            before = set(self.webdriver.window_handles)
+            self.webdriver.execute_script("window.open('about:blank');")
+            handle = next(iter(set(self.webdriver.window_handles) - before))
+        self._switch(handle)
+        return handle
+
+    def _open_chrome_context(self) -> Optional[BrowserContext]:
+        """
+        Creates an isolated DevTools browser context holding a single blank target, chromedriver exposes the
+        target as a window once it has discovered it
+        :return: the context or None when the browser is not chrome or does not forward DevTools commands
+        """
+        if self.webdriver.capabilities.get("browserName") != "chrome":
+            return None
+        try:
+            context_id = self._cdp("Target.createBrowserContext", {}).get("browserContextId")
+            if not context_id:
+                return None
+            target = self._cdp("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})
+        except WebDriverException as exc:
+            log.debug(f"DevTools browser contexts unavailable, falling back to windows: {exc}")
+            return None
+        handle = self._discover_target(target.get("targetId", ""))
+        if handle is None:
+            self._dispose_chrome_context(context_id)
+            return None
+        self._switch(handle)
+        return BrowserContext(self, handle, context_id)
+
+    def _discover_target(self, target_id: str) -> Optional[str]:
+        deadline = time.monotonic() + TARGET_DISCOVERY_TIMEOUT
+        while target_id:
+            for handle in self.webdriver.window_handles:
+                if handle.endswith(target_id):
+                    return handle
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        return None
+
+    def _dispose_chrome_context(self, context_id: str):
+        try:
+            self._cdp("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except WebDriverException as exc:
+            log.debug(f"Unable to dispose of browser context {context_id}: {exc}")
+
+    def _cdp(self, cmd: str, params: dict) -> dict:
+        self.webdriver.command_executor._commands.setdefault("executeCdpCommand", CDP_EXECUTE)
+        return self.webdriver.execute("executeCdpCommand", {"cmd": cmd, "params": params})["value"] or {}
+
+
+class BrowserContextPool:
+    """
+    Packs tests into shared browsers, a new browser is only launched once every existing one is full
+    """
+
+    def __init__(self, config, capacity: int):
+        self.config = config
+        self.capacity = capacity
+        self.browsers: List[SharedBrowser] = []
+        self._lock = threading.Lock()
+
+    def acquire(self, launch: Callable[[], PyleniumDriver]) -> PyleniumDriver:
+        """
+        :param launch: called to start another browser when none of the shared browsers have a free slot
+        :return: a PyleniumDriver confined to a newly opened context
+        """
+        with self._lock:
+            shared = next((browser for browser in self.browsers if browser.has_capacity), None)
+            if shared is None:
+                shared = SharedBrowser(launch(), self.capacity, self.config.block_urls)
+                self.browsers.append(shared)
+            context = shared.open_context()
+        return PyleniumDriver(self.config, context.scoped_browser())
+
+    def release(self, driver: PyleniumDriver):
+        """
+        Closes the context behind driver, freeing its slot for the next test
+        """
+        browser = getattr(driver.browser, "wrapped_driver", driver.browser)
+        browser.quit()
+
+    def drain(self) -> List[SharedBrowser]:
+        """
+        Forgets every shared browser without quitting them
+        :return: the browsers the pool held
+        """
+        with self._lock:
+            browsers, self.browsers = self.browsers, []
+        return browsers
@@ -0,0 +1,209 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+from abc import ABC, abstractmethod
+import threading
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.firefox import GeckoDriverManager
+
+from pylenium.constants.string_globals import CHROME, FIREFOX
+from pylenium.driver.binary_resolver import DriverBinaryResolver
+from pylenium.driver.grid_balancer import GridBalancer, parse_hub_urls
+from pylenium.driver.pylenium_driver import PyleniumDriver
+from pylenium.driver.request_blocking import block_in_chrome, chrome_capabilities, firefox_preferences, with_blocking
+from pylenium.driver.remote_connection import build_connection_pool, PooledRemoteConnection
+from pylenium.driver.shared_service_chrome import SharedServiceChrome
+from pylenium.logging.log import log
+
+DEFAULT_REMOTE_CAPABILITIES = {CHROME: DesiredCapabilities.CHROME, FIREFOX: DesiredCapabilities.FIREFOX}
+
+
+def _driver_manager_kwargs(version: str) -> dict:
+    """
+    webdriver manager resolves the latest driver by default, only pin a version when one was asked for
+    """
+    return {} if version == "latest" else {"version": version}
+
+
+class AbstractDriverFactory(ABC):
+    def __init__(self, config, binary_resolver: DriverBinaryResolver = None):
+        self.config = config
+        self.binary_resolver = binary_resolver
+
+    @abstractmethod
+    def get_driver(self):
+        pass
+
+    @abstractmethod
+    def resolve_capabilities(self):
+        pass
+
+    def page_load_capabilities(self) -> dict:
+        return {"pageLoadStrategy": self.config.page_load_strategy.capability}
+
+    def shutdown(self):
+        """
+        Releases anything the factory keeps alive between drivers, called once the test session is over
+        """
+
+
+class ChromeDriverFactory(AbstractDriverFactory):
+    def __init__(self, config, binary_resolver: DriverBinaryResolver = None):
+        super().__init__(config, binary_resolver)
+        self._service = None
+        self._service_lock = threading.Lock()
+
+    def resolve_capabilities(self) -> Options:
+        pylenium_chrome_opts = Options()
+        for switch in self.config.chrome_switches:
+            pylenium_chrome_opts.add_argument(switch)
+        if self.config.proxy_address:
+            pylenium_chrome_opts.add_argument(f"--proxy-server=http://{self.config.proxy_address}")
+        return pylenium_chrome_opts
+
+    def get_driver(self):
+        browser = SharedServiceChrome(
+            self._running_service(),
+            desired_capabilities={
+                **self.resolve_capabilities().to_capabilities(),
+                **self.page_load_capabilities(),
+                **chrome_capabilities(self.config.block_urls),
+            },
+        )
+        try:
+            block_in_chrome(browser, self.config.block_urls)
+        except WebDriverException:
+            browser.quit()
+            raise
+        return PyleniumDriver(self.config, browser)
+
+    def shutdown(self):
+        with self._service_lock:
+            if self._service is not None:
+                self._service.stop()
+                self._service = None
+
+    def _running_service(self) -> Service:
+        """
+        Every chrome session for this worker is opened against a single chromedriver service, which is started
+        on first use (or restarted if it has died) and only stopped when the factory is shut down
+        """
+        with self._service_lock:
+            if self._service is None or self._service.process.poll() is not None:
+                self._service = Service(self.binary_resolver.resolve(CHROME, self._install))
+                self._service.start()
+            return self._service
+
+    @staticmethod
+    def _install(version: str) -> str:
+        return ChromeDriverManager(**_driver_manager_kwargs(version)).install()
+
+
+class FireFoxDriverFactory(AbstractDriverFactory):
+    def resolve_capabilities(self) -> Options:
+        pass
+
+    def get_driver(self):
+        options = FirefoxOptions()
+        for name, value in firefox_preferences(self.config.block_urls, self.config.proxy_address).items():
+            options.set_preference(name, value)
+        return PyleniumDriver(
+            self.config,
+            webdriver.Firefox(
+                capabilities={**DesiredCapabilities.FIREFOX, **self.page_load_capabilities()},
+                options=options,
+                executable_path=self.binary_resolver.resolve(FIREFOX, self._install),
+            ),
+        )
+
+    @staticmethod
+    def _install(version: str) -> str:
+        return GeckoDriverManager(**_driver_manager_kwargs(version)).install()
+
+
+class RemoteWebDriverFactory(AbstractDriverFactory):
+    def __init__(self, config, binary_resolver: DriverBinaryResolver = None):
+        super().__init__(config, binary_resolver)
+        self._pool = None
+        self._balancer = None
+        self._pool_lock = threading.Lock()
+
+    def resolve_capabilities(self) -> dict:
+        """
+        Capabilities come from --browser-capabilities-file, falling back to the defaults for --browser; the
+        --page-load-strategy applies unless the capabilities file sets a pageLoadStrategy of its own
+        """
+        if self.config.browser_capabilities:
+            capabilities = dict(self.config.browser_capabilities)
+        else:
+            capabilities = dict(DEFAULT_REMOTE_CAPABILITIES.get(self.config.browser, {}))
+        return with_blocking({**self.page_load_capabilities(), **capabilities}, self.config.block_urls)
+
+    def get_driver(self):
+        capabilities = self.resolve_capabilities()
+
+        def start(hub: str):
+            return webdriver.Remote(
+                command_executor=self._command_executor(f"{hub}/wd/hub"), desired_capabilities=capabilities
+            )
+
+        hubs = parse_hub_urls(self.config.server, self.config.server_port)
+        browser = start(hubs[0]) if len(hubs) == 1 else self._grid_balancer(hubs).create_session(start)
+        if browser.capabilities.get("browserName") == "chrome":
+            try:
+                block_in_chrome(browser, self.config.block_urls)
+            except WebDriverException as exc:
+                log.warning(f"The selenium hub did not forward request blocking to chrome: {exc}")
+        return PyleniumDriver(self.config, browser)
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.clear()
+                self._pool = None
+            self._balancer = None
+
+    def _connection_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = build_connection_pool(self.config)
+            return self._pool
+
+    def _grid_balancer(self, hubs) -> GridBalancer:
+        pool = self._connection_pool()
+        with self._pool_lock:
+            if self._balancer is None:
+                self._balancer = GridBalancer(
+                    hubs,
+                    pool,
+                    status_ttl=self.config.grid_status_ttl,
+                    queue_timeout=self.config.grid_queue_timeout,
+                    status_timeout=self.config.remote_connect_timeout,
+                )
+            return self._balancer
+
+    def _command_executor(self, hub_url: str):
+        if not self.config.remote_keep_alive:
+            return hub_url
+        return PooledRemoteConnection(hub_url, self._connection_pool())
@@ -0,0 +1,200 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from pylenium.driver.process_reaper import (
+    TrackedProcess,
+    descendants,
+    kill_processes,
+    optional_psutil,
+    process_identity,
+)
+from pylenium.driver.request_blocking import CDP_EXECUTE
+from pylenium.logging.log import log
+
+
+@dataclass
+class DriverHealth:
+    """
+    What a driver has been through since it was launched
+    """
+
+    created_at: float = field(default_factory=time.monotonic)
+    tests: int = 0
+
+    def age(self, now: float = None) -> float:
+        return (time.monotonic() if now is None else now) - self.created_at
+
+
+class DriverHealthMonitor:
+    """
+    Decides when a reused driver has degraded enough to be replaced: after max_tests tests, max_age seconds or
+    once its browser uses more than max_memory megabytes, 0 switches a threshold off. Before a driver is reset
+    for the next test a cheap command is sent to it, if that does not come back within liveness_timeout seconds
+    the session is considered hung
+    n.b -> the probe costs a round trip per test so it only runs when a liveness_timeout is given
+    """
+
+    def __init__(
+        self, max_tests: int = 0, max_age: float = 0.0, max_memory: float = 0.0, liveness_timeout: float = 0.0
+    ):
+        self.max_tests = max_tests
+        self.max_age = max_age
+        self.max_memory = max_memory
+        self.liveness_timeout = liveness_timeout
+        self._health: Dict[int, DriverHealth] = {}
+        self._lock = threading.Lock()
+
+    def watch(self, driver) -> DriverHealth:
+        with self._lock:
+            return self._health.setdefault(id(driver), DriverHealth())
+
+    def forget(self, driver):
+        with self._lock:
+            self._health.pop(id(driver), None)
+
+    def finished_test(self, driver) -> Optional[str]:
+        """
+        Counts another test against driver
+        :return: why the driver should be recycled or None while it is still healthy
+        """
+        health = self.watch(driver)
+        health.tests += 1
+        if self.max_tests and health.tests >= self.max_tests:
+            return f"it ran {health.tests} tests"
+        if self.max_age and health.age() >= self.max_age:
+            return f"it has been running for {health.age():.0f}s"
+        if self.max_memory:
+            memory = browser_memory(driver.browser)
+            if memory is not None and memory >= self.max_memory:
+                return f"its browser is using {memory:.0f}MB"
+        return None
+
+    def responsive(self, driver) -> bool:
+        """
+        Asks the driver for its current url on a separate thread so a hung session cannot hang the caller
+        :return: False if the command failed or did not complete within liveness_timeout seconds
+        """
+        if not self.liveness_timeout:
+            return True
+        outcome = []
+
+        def probe():
+            try:
+                driver.browser.execute(Command.GET_CURRENT_URL)
+                outcome.append(True)
+            except Exception as exc:
+                log.debug(f"Liveness probe failed: {exc}")
+
+        thread = threading.Thread(target=probe, name="pylenium-liveness", daemon=True)
+        thread.start()
+        thread.join(self.liveness_timeout)
+        return bool(outcome)
+
+
+def browser_process_ids(browser) -> List[int]:
+    """
+    :return: the pids of the local browser process behind browser and everything it spawned (renderers, gpu
+    process etc), empty for remote browsers. Chrome's browser process is found below the chromedriver service
+    by the user data directory the session was started with
+    """
+    browser = getattr(browser, "wrapped_driver", browser)
+    process = getattr(getattr(browser, "service", None), "process", None)
+    if process is None:
+        return []
+    capabilities = browser.capabilities or {}
+    if capabilities.get("moz:processID"):
+        root = int(capabilities["moz:processID"])
+        return [root, *descendants(root)]
+    user_data_dir = capabilities.get("chrome", {}).get("userDataDir")
+    if not user_data_dir:
+        return []
+    for pid in descendants(process.pid):
+        if user_data_dir in _command_line(pid):
+            return [pid, *descendants(pid)]
+    return []
+
+
+def browser_memory(browser) -> Optional[float]:
+    """
+    :return: the resident memory in MB of the local browser process tree, or for a remote chrome the size of its
+    javascript heap as reported by the DevTools protocol (an underestimate), None when neither is available
+    """
+    pids = browser_process_ids(browser)
+    if pids:
+        return sum(_resident_memory(pid) for pid in pids) / (1024 * 1024)
+    browser = getattr(browser, "wrapped_driver", browser)
+    if (browser.capabilities or {}).get("browserName") != "chrome":
+        return None
+    try:
+        browser.command_executor._commands.setdefault("executeCdpCommand", CDP_EXECUTE)
+        browser.execute("executeCdpCommand", {"cmd": "Performance.enable", "params": {}})
+        metrics = browser.execute("executeCdpCommand", {"cmd": "Performance.getMetrics", "params": {}})["value"]
+    except WebDriverException as exc:
+        log.debug(f"Unable to read browser memory through the DevTools protocol: {exc}")
+        return None
+    sizes = {metric["name"]: metric["value"] for metric in (metrics or {}).get("metrics", [])}
+    return sizes["JSHeapTotalSize"] / (1024 * 1024) if "JSHeapTotalSize" in sizes else None
+
+
+def kill_browser(browser):
+    """
+    Kills the local browser process tree behind a hung session, its driver service is left running
+    """
+    processes = [TrackedProcess(pid, process_identity(pid)) for pid in browser_process_ids(browser)]
+    kill_processes([process for process in processes if process.identity is not None])
+
+
+def _command_line(pid: int) -> str:
+    psutil = optional_psutil()
+    if psutil is not None:
+        try:
+            return " ".join(psutil.Process(pid).cmdline())
+        except psutil.Error:
+            return ""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as cmdline:
+            return cmdline.read().replace(b"\0", b" ").decode(errors="replace")
+    except OSError:
+        return ""
+
+
+def _resident_memory(pid: int) -> int:
+    """
+    :return: the resident set size of the process in bytes, 0 if it has gone
+    """
+    psutil = optional_psutil()
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
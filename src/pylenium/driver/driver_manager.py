@@ -0,0 +1,312 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from pylenium.constants.string_globals import CHROME, FIREFOX, REMOTE, DRIVER_REUSE_SESSION
+from pylenium.driver.binary_resolver import DriverBinaryResolver
+from pylenium.driver.process_reaper import ProcessReaper, driver_process_ids
+from pylenium.exceptions.custom_exceptions import PyleniumArgumentException
+from pylenium.logging.log import log
+from pylenium.reporting.command_timings import CommandTimingRecorder
+
+if TYPE_CHECKING:
+    from pylenium.driver.pylenium_driver import PyleniumDriver
+
+MAX_SHUTDOWN_THREADS = 16
+
+
+class DriverRegistry:
+    """
+    One driver slot per thread behind a lock, drivers can be claimed and handed back from any thread while the
+    session keeps a view of every driver still alive
+    """
+
+    def __init__(self):
+        self._drivers: Dict[int, "PyleniumDriver"] = {}
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: int = None) -> Optional["PyleniumDriver"]:
+        with self._lock:
+            return self._drivers.get(thread_id or threading.get_ident())
+
+    def put(self, driver: "PyleniumDriver", thread_id: int = None):
+        with self._lock:
+            self._drivers[thread_id or threading.get_ident()] = driver
+
+    def pop(self, thread_id: int = None) -> Optional["PyleniumDriver"]:
+        with self._lock:
+            return self._drivers.pop(thread_id or threading.get_ident(), None)
+
+    def drain(self) -> List["PyleniumDriver"]:
+        """
+        Empties the registry
+        :return: every driver it held
+        """
+        with self._lock:
+            drivers = list(self._drivers.values())
+            self._drivers.clear()
+            return drivers
+
+    def __len__(self):
+        with self._lock:
+            return len(self._drivers)
+
+
+def quit_concurrently(drivers: list):
+    """
+    Quits every driver at once on a short lived thread pool, as each quit is a round trip to a driver (and often
+    a browser shutdown) this takes about as long as the slowest driver rather than the sum of them all
+    n.b -> failures are logged and never stop the remaining drivers from being quit
+    """
+    if not drivers:
+        return
+    workers = min(len(drivers), MAX_SHUTDOWN_THREADS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pylenium-quit") as pool:
+        list(pool.map(_quit_quietly, drivers))
+
+
+def _quit_quietly(driver):
+    try:
+        driver.quit()
+    except Exception as exc:
+        log.warning(f"Unable to quit driver cleanly at the end of the session: {exc}")
+
+
+class ThreadLocalDriverManager:
+    """
+    Couples a driver to each thread which asks for one; the driver factories (and with them selenium and the
+    webdriver manager) are only imported once the first driver is actually needed
+    """
+
+    def __init__(self, config, command_recorder: CommandTimingRecorder = None, reaper: ProcessReaper = None):
+        self.drivers = DriverRegistry()
+        self.config = config
+        self.command_recorder = command_recorder
+        self.reaper = reaper
+        self.binary_resolver = DriverBinaryResolver(config)
+        self._warm_drivers = queue.Queue()
+        self._prewarm_pool = None
+        self._factories = None
+        self._supported_drivers = None
+        self._factories_lock = threading.Lock()
+        self._context_pool = None
+        self._health_monitor = None
+
+    @property
+    def factories(self) -> dict:
+        with self._factories_lock:
+            if self._factories is None:
+                from pylenium.driver.driver_factories import (
+                    ChromeDriverFactory,
+                    FireFoxDriverFactory,
+                    RemoteWebDriverFactory,
+                )
+
+                self._factories = {
+                    CHROME: ChromeDriverFactory(self.config, self.binary_resolver),
+                    FIREFOX: FireFoxDriverFactory(self.config, self.binary_resolver),
+                    REMOTE: RemoteWebDriverFactory(self.config),
+                }
+            return self._factories
+
+    @property
+    def context_pool(self):
+        """
+        :return: the pool packing several tests into each browser, None unless --contexts-per-browser > 1
+        """
+        if self._context_pool is None and self.config.contexts_per_browser > 1:
+            from pylenium.driver.browser_contexts import BrowserContextPool
+
+            self._context_pool = BrowserContextPool(self.config, self.config.contexts_per_browser)
+        return self._context_pool
+
+    @property
+    def health_monitor(self):
+        """
+        :return: the monitor deciding when a reused driver is recycled, None unless --driver-reuse=session
+        """
+        if self._health_monitor is None and self.config.driver_reuse == DRIVER_REUSE_SESSION:
+            from pylenium.driver.driver_health import DriverHealthMonitor
+
+            self._health_monitor = DriverHealthMonitor(
+                max_tests=self.config.driver_max_tests,
+                max_age=self.config.driver_max_age,
+                max_memory=self.config.driver_max_memory,
+                liveness_timeout=self.config.driver_liveness_timeout,
+            )
+        return self._health_monitor
+
+    @property
+    def supported_drivers(self) -> dict:
+        if self._supported_drivers is None:
+            self._supported_drivers = {browser: factory.get_driver for browser, factory in self.factories.items()}
+        return self._supported_drivers
+
+    @supported_drivers.setter
+    def supported_drivers(self, drivers: dict):
+        self._supported_drivers = drivers
+
+    def get_driver(self):
+        """
+        Spawns a new thread local driver or returns the already instantiated one if such a driver exists
+        for the given thread
+        :return: an instance of PyleniumDriver
+        """
+        driver = self._resolve_driver_from_config()
+        return driver
+
+    def peek_driver(self):
+        """
+        :return: the driver coupled to the calling thread, without creating one if it does not exist
+        """
+        return self.drivers.get()
+
+    def release_driver(self):
+        """
+        Hands back the driver coupled to the calling thread once a test has finished with it.
+        With --driver-reuse=session the driver is reset and kept alive for the next test on this thread, unless it
+        has crossed one of the --driver-max-* thresholds or does not respond to the opt-in liveness probe. Otherwise (or
+        if the reset fails) it is quit and a fresh driver will be created on the next request.
+        With --contexts-per-browser the test's window is always closed, the browser itself stays up
+        """
+        driver = self.drivers.get()
+        if driver is None:
+            return
+        if self.context_pool is not None:
+            self.drivers.pop()
+            self.context_pool.release(driver)
+            return
+        if self.config.driver_reuse == DRIVER_REUSE_SESSION:
+            if not self.health_monitor.responsive(driver):
+                log.warning("Driver did not respond to the liveness probe, it will be replaced")
+                self.drivers.pop()
+                self._abandon(driver)
+                return
+            reason = self.health_monitor.finished_test(driver)
+            if reason is None:
+                try:
+                    driver.reset()
+                    return
+                except WebDriverException as exc:
+                    log.warning(f"Unable to reset driver for reuse, it will be replaced: {exc}")
+            else:
+                log.info(f"Recycling driver as {reason}")
+            self.health_monitor.forget(driver)
+        self.drivers.pop()
+        driver.quit()
+
+    def quit_all(self):
+        """
+        Quits every driver still being held by the manager in parallel, called when the test session is over
+        """
+        drivers = self.drivers.drain()
+        if self._context_pool is not None:
+            # every registered driver is then a context of a pooled browser, quitting the browsers closes them all
+            drivers = self._context_pool.drain()
+        if self._prewarm_pool is not None:
+            self._prewarm_pool.shutdown(wait=True)
+            drivers.extend(driver for driver in iter(self._take_warm_driver, None))
+        quit_concurrently(drivers)
+
+    def shutdown(self):
+        """
+        Quits every remaining driver and then shuts down the factories, e.g stopping a shared driver service.
+        Any driver or browser process which is still running after that is killed
+        """
+        self.quit_all()
+        for factory in (self._factories or {}).values():
+            factory.shutdown()
+        if self.reaper is not None:
+            killed = self.reaper.reap()
+            if killed:
+                log.warning(f"Killed {killed} driver / browser processes which outlived their session")
+
+    def prewarm(self, count: int):
+        """
+        Begins creating drivers on a background thread pool, they are handed out in the order they were
+        requested to the first threads which ask for a driver
+        :param count: the number of drivers to launch ahead of time
+        """
+        self._prewarm_pool = ThreadPoolExecutor(max_workers=count, thread_name_prefix="pylenium-prewarm")
+        for _ in range(count):
+            self._warm_drivers.put(self._prewarm_pool.submit(self._create_driver))
+
+    def _take_warm_driver(self):
+        """
+        Claims the next pre-warmed driver, waiting on it if it is still launching as that is never slower
+        than starting a new one; drivers which failed to launch are skipped
+        :return: an instance of PyleniumDriver or None if no pre-warmed drivers remain
+        """
+        while True:
+            try:
+                future = self._warm_drivers.get_nowait()
+            except queue.Empty:
+                return None
+            try:
+                return future.result()
+            except Exception as exc:
+                log.warning(f"A pre-warmed driver failed to launch: {exc}")
+
+    def _resolve_driver_from_config(self) -> "PyleniumDriver":
+        driver = self.drivers.get()
+        if driver:
+            return driver
+        if self.context_pool is not None:
+            driver = self.context_pool.acquire(self._launch_driver)
+        else:
+            driver = self._launch_driver()
+        self.drivers.put(driver)
+        return driver
+
+    def _abandon(self, driver: "PyleniumDriver"):
+        """
+        Gives up on a hung driver: its local browser is killed and the session is quit in the background, as
+        quitting it here could block for as long as the session is hung
+        """
+        from pylenium.driver.driver_health import kill_browser
+
+        self.health_monitor.forget(driver)
+        try:
+            kill_browser(driver.browser)
+        except Exception as exc:
+            log.warning(f"Unable to kill the browser of a hung driver: {exc}")
+        threading.Thread(target=_quit_quietly, args=(driver,), name="pylenium-abandon", daemon=True).start()
+
+    def _launch_driver(self) -> "PyleniumDriver":
+        return self._take_warm_driver() or self._create_driver()
+
+    def _create_driver(self) -> "PyleniumDriver":
+        runtime_browser = REMOTE if self.config.remote else self.config.browser
+
+        if runtime_browser not in self.supported_drivers.keys():
+            raise PyleniumArgumentException(
+                f"Unsupported --browser option, selection was {runtime_browser}"
+            )
+        driver = self.supported_drivers.get(runtime_browser)()
+        if self.reaper is not None and runtime_browser != REMOTE:
+            self.reaper.track(driver_process_ids(driver.browser))
+        if self.command_recorder is not None:
+            self.command_recorder.instrument(driver.browser)
+        if self.health_monitor is not None:
+            self.health_monitor.watch(driver)
+        return driver
@@ -0,0 +1,173 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import urllib3
+from selenium.common.exceptions import InvalidArgumentException, SessionNotCreatedException, WebDriverException
+
+from pylenium.exceptions.custom_exceptions import PyleniumGridException
+from pylenium.logging.log import log
+
+#: Hints that a hub refused a session because it is busy, rather than because it can never start it
+CAPACITY_ERRORS = ("timed out", "timeout", "queue", "capacity", "slot", "busy")
+
+
+def parse_hub_urls(servers: str, default_port: int) -> List[str]:
+    """
+    Splits the comma separated --server value into hub base urls, hubs without an explicit port use --server_port
+    :param servers: e.g 'http://hub-a,http://hub-b:5555'
+    :param default_port: the port for hubs which do not name one
+    :return: a list of hub urls without the /wd/hub suffix
+    """
+    hubs = []
+    for server in (part.strip().rstrip("/") for part in servers.split(",")):
+        if not server:
+            continue
+        if "://" not in server:
+            server = f"http://{server}"
+        hubs.append(server if urlparse(server).port else f"{server}:{default_port}")
+    return hubs
+
+
+@dataclass
+class HubStatus:
+    url: str
+    ready: bool
+    free_slots: Optional[int] = None
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_payload(cls, url: str, payload: dict) -> "HubStatus":
+        """
+        Reads a /status payload; grid 4 reports its node slots so free capacity is known, grid 3 only reports ready
+        """
+        value = payload.get("value", {}) or {}
+        nodes = value.get("nodes")
+        free_slots = None
+        if nodes is not None:
+            free_slots = sum(
+                1 for node in nodes for slot in node.get("slots", []) if slot.get("session") is None
+            )
+        return cls(url, bool(value.get("ready", True)), free_slots, time.monotonic())
+
+    def saturated(self) -> bool:
+        return not self.ready or self.free_slots == 0
+
+
+def retryable(error: Exception) -> bool:
+    """
+    :return: False when no hub will accept the session either, e.g a SessionNotCreatedException for invalid
+    capabilities; only refusals which look like a full hub or session queue are worth another hub
+    """
+    if isinstance(error, InvalidArgumentException):
+        return False
+    if isinstance(error, SessionNotCreatedException):
+        message = (error.msg or "").lower()
+        return any(hint in message for hint in CAPACITY_ERRORS)
+    return True
+
+
+class GridBalancer:
+    """
+    Spreads new sessions over several selenium hubs; each hub's status endpoint is polled (waiting at most
+    status_timeout seconds) and cached for status_ttl seconds, new sessions go to the hub with the most free slots
+    (less the sessions this worker is still starting on it), and when every hub is saturated session requests wait
+    until one frees up or queue_timeout passes
+    """
+
+    def __init__(
+        self,
+        hubs: List[str],
+        pool: urllib3.PoolManager,
+        status_ttl: float = 2.0,
+        queue_timeout: float = 300.0,
+        poll_interval: float = 0.5,
+        status_timeout: float = 2.0,
+    ):
+        self.hubs = hubs
+        self.pool = pool
+        self.status_ttl = status_ttl
+        self.status_timeout = status_timeout
+        self.queue_timeout = queue_timeout
+        self.poll_interval = poll_interval
+        self._statuses: Dict[str, HubStatus] = {}
+        self._starting: Dict[str, int] = {hub: 0 for hub in hubs}
+        self._lock = threading.Lock()
+
+    def status(self, hub: str) -> HubStatus:
+        with self._lock:
+            cached = self._statuses.get(hub)
+        if cached and time.monotonic() - cached.fetched_at < self.status_ttl:
+            return cached
+        try:
+            response = self.pool.request("GET", f"{hub}/wd/hub/status", timeout=self.status_timeout, retries=False)
+            status = HubStatus.from_payload(hub, json.loads(response.data.decode("utf-8")))
+        except (urllib3.exceptions.HTTPError, ValueError, OSError) as error:
+            log.warning(f"Selenium hub: {hub} did not report its status: {error}")
+            status = HubStatus(hub, False, fetched_at=time.monotonic())
+        with self._lock:
+            self._statuses[hub] = status
+        return status
+
+    def candidates(self) -> List[str]:
+        """
+        Hubs with capacity, the least loaded first
+        :return: an empty list when every hub is saturated
+        """
+        statuses = [self.status(hub) for hub in self.hubs]
+        with self._lock:
+            available = [
+                (status, (status.free_slots if status.free_slots is not None else 1) - self._starting[status.url])
+                for status in statuses
+                if not status.saturated()
+            ]
+        return [status.url for status, capacity in sorted(available, key=lambda item: -item[1])]
+
+    def create_session(self, start: Callable[[str], object]):
+        """
+        Starts a session on the least loaded hub, a hub refusing the session is marked saturated and the next is tried
+        :param start: starts and returns a session given a hub url
+        :return: whatever start returned
+        n.b -> errors which are not retryable, i.e invalid capabilities, are raised straight away
+        """
+        deadline = time.monotonic() + self.queue_timeout
+        while True:
+            for hub in self.candidates():
+                with self._lock:
+                    self._starting[hub] += 1
+                try:
+                    return start(hub)
+                except (WebDriverException, urllib3.exceptions.HTTPError, OSError) as error:
+                    if not retryable(error):
+                        raise
+                    log.warning(f"Selenium hub: {hub} refused a new session, trying another: {error}")
+                    with self._lock:
+                        self._statuses[hub] = HubStatus(hub, False, fetched_at=time.monotonic())
+                finally:
+                    with self._lock:
+                        self._starting[hub] -= 1
+            if time.monotonic() >= deadline:
+                raise PyleniumGridException(
+                    f"No selenium hub of {self.hubs} accepted a session within {self.queue_timeout} seconds"
+                )
+            time.sleep(self.poll_interval)
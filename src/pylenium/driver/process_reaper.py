@@ -0,0 +1,251 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import glob
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from pylenium.constants.string_globals import PYTEST_XDIST_WORKER
+from pylenium.logging.log import log
+
+PID_DIRECTORY = os.path.join(tempfile.gettempdir(), "pylenium-pids")
+TERMINATE_GRACE_PERIOD = 3.0
+
+
+def optional_psutil():
+    """
+    :return: the psutil module when it is installed, pylenium falls back to /proc and os.kill without it
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil
+
+
+@dataclass(frozen=True)
+class TrackedProcess:
+    """
+    A process pylenium launched, identity is its start time so a recycled pid is never mistaken for it
+    """
+
+    pid: int
+    identity: Optional[str]
+
+    def alive(self) -> bool:
+        if self.identity is None:
+            return _pid_exists(self.pid)
+        return process_identity(self.pid) == self.identity
+
+
+def process_identity(pid: int) -> Optional[str]:
+    """
+    :return: the start time of the process (via psutil, or /proc on linux) or None if it cannot be determined
+    n.b -> a zombie has already exited and is only waiting to be collected by its parent, so it has no identity
+    """
+    psutil = optional_psutil()
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            return None if process.status() == psutil.STATUS_ZOMBIE else str(process.create_time())
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            # the command name may contain spaces, the fields after it are fixed; starttime is the 22nd field
+            fields = stat.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return None if fields[0] == "Z" else fields[19]
+
+
+def descendants(pid: int) -> List[int]:
+    """
+    :return: the pids of every process below pid, e.g the browser processes started by a driver binary
+    """
+    psutil = optional_psutil()
+    if psutil is not None:
+        try:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+        except psutil.Error:
+            return []
+    parents = {}
+    for stat_path in glob.glob("/proc/[0-9]*/stat"):
+        try:
+            with open(stat_path) as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(stat_path.split("/")[2]))
+        except (OSError, IndexError, ValueError):
+            continue
+    found, pending = [], [pid]
+    while pending:
+        children = parents.get(pending.pop(), [])
+        found.extend(children)
+        pending.extend(children)
+    return found
+
+
+def driver_process_ids(browser) -> List[int]:
+    """
+    :return: the pids of the driver service and browser started on this machine for browser
+    """
+    browser = getattr(browser, "wrapped_driver", browser)
+    pids = []
+    process = getattr(getattr(browser, "service", None), "process", None)
+    if process is not None:
+        pids.append(process.pid)
+    browser_pid = (getattr(browser, "capabilities", None) or {}).get("moz:processID")
+    if browser_pid:
+        pids.append(int(browser_pid))
+    return pids
+
+
+def worker_pid_file(directory: str = PID_DIRECTORY) -> str:
+    """
+    :return: the pid file of this process, named after the xdist worker running it
+    """
+    worker = os.environ.get(PYTEST_XDIST_WORKER, "main")
+    return os.path.join(directory, f"{worker}-{os.getpid()}.json")
+
+
+class ProcessReaper:
+    """
+    Keeps track of every driver and browser process launched by this worker, anything still alive once the
+    drivers have been quit is killed. The tracked pids are mirrored to a pid file so that if the worker itself
+    crashes another process can reap them with reap_orphans
+    """
+
+    def __init__(self, pid_file: str = None):
+        self.pid_file = pid_file
+        self._tracked: Dict[int, TrackedProcess] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def tracked(self) -> List[TrackedProcess]:
+        with self._lock:
+            return list(self._tracked.values())
+
+    def track(self, pids: Iterable[int]):
+        """
+        Tracks each process along with everything it has spawned so far
+        """
+        with self._lock:
+            for pid in pids:
+                for process_id in [pid, *descendants(pid)]:
+                    identity = process_identity(process_id)
+                    if identity is not None or not _identity_supported():
+                        self._tracked[process_id] = TrackedProcess(process_id, identity)
+            self._tracked = {pid: process for pid, process in self._tracked.items() if process.alive()}
+            self._write_pid_file()
+
+    def reap(self) -> int:
+        """
+        Kills every tracked process which is still running and removes the pid file
+        :return: the number of processes killed
+        """
+        with self._lock:
+            processes, self._tracked = list(self._tracked.values()), {}
+            if self.pid_file is not None and os.path.exists(self.pid_file):
+                os.remove(self.pid_file)
+        return kill_processes(processes)
+
+    @staticmethod
+    def reap_orphans(directory: str = PID_DIRECTORY) -> int:
+        """
+        Kills the processes recorded in every pid file whose owning worker is no longer running
+        n.b -> processes whose start time could not be recorded are left alone, their pid may have been recycled
+        :return: the number of processes killed
+        """
+        killed = 0
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            try:
+                with open(path) as pid_file:
+                    record = json.load(pid_file)
+            except (OSError, ValueError):
+                continue
+            if TrackedProcess(record["owner"], record.get("owner_identity")).alive():
+                continue
+            processes = [TrackedProcess(pid, identity) for pid, identity in record.get("processes", []) if identity]
+            killed += kill_processes(processes)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if killed:
+            log.warning(f"Killed {killed} orphaned driver / browser processes left behind by a crashed worker")
+        return killed
+
+    def _write_pid_file(self):
+        if self.pid_file is None:
+            return
+        record = {
+            "owner": os.getpid(),
+            "owner_identity": process_identity(os.getpid()),
+            "processes": [[process.pid, process.identity] for process in self._tracked.values()],
+        }
+        os.makedirs(os.path.dirname(self.pid_file), exist_ok=True)
+        temporary = f"{self.pid_file}.tmp"
+        with open(temporary, "w") as pid_file:
+            json.dump(record, pid_file)
+        os.replace(temporary, self.pid_file)
+
+
+def kill_processes(processes: List[TrackedProcess]) -> int:
+    """
+    Asks every live process to terminate then kills whatever is still running after the grace period
+    :return: the number of processes which were alive
+    """
+    alive = [process for process in processes if process.alive()]
+    for process in alive:
+        _signal(process.pid, signal.SIGTERM)
+    deadline = time.monotonic() + TERMINATE_GRACE_PERIOD
+    while time.monotonic() < deadline and any(process.alive() for process in alive):
+        time.sleep(0.05)
+    for process in alive:
+        if process.alive():
+            _signal(process.pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    return len(alive)
+
+
+def _signal(pid: int, signum: int):
+    try:
+        os.kill(pid, signum)
+    except OSError:
+        pass
+
+
+def _identity_supported() -> bool:
+    return optional_psutil() is not None or os.path.isdir("/proc")
+
+
+def _pid_exists(pid: int) -> bool:
+    psutil = optional_psutil()
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
@@ -15,11 +15,30 @@
 #  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
 #  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+from typing import Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.event_firing_webdriver import EventFiringWebDriver
 
+from pylenium.commands.commander import Commander
+from pylenium.constants.javascript import (
+    CLEAR_WEB_STORAGE,
+    CAPTURE_WEB_STORAGE,
+    PAGE_READY,
+    RESTORE_WEB_STORAGE,
+    TRACK_NETWORK,
+    TRACK_NETWORK_ON_NEW_DOCUMENT,
+)
+from pylenium.driver.request_blocking import CDP_EXECUTE, count_blocked_requests
+from pylenium.driver.session_snapshot import SessionSnapshot
+from pylenium.logging.log import log
 from pylenium.utilities.plugin_utility import get_instance_of_listener_from_path
 from pylenium.elements.pylenium_wait import PyleniumWait
 from pylenium.elements.pylenium_element import PyleniumElement
+from pylenium.elements.pylenium_elements import PyleniumElements
+
+SELECTORS = {"css": By.CSS_SELECTOR, "id": By.ID}
 
 
 class PyleniumDriver:
@@ -28,8 +47,13 @@ class PyleniumDriver:
         self.browser = browser
         self.browser._web_element_cls = PyleniumElement
         self.wait = PyleniumWait(
-            self.config.explicit_wait, self.config.polling_interval
+            self.browser,
+            self.config.explicit_wait,
+            self.config.polling_interval,
+            polling_strategy=self.config.polling_strategy,
+            wait_mode=self.config.wait_mode,
         )
+        self._tracks_new_documents = None
 
     @property
     def browser(self):
@@ -46,15 +70,149 @@ class PyleniumDriver:
 
     # Navigational capabilities
     def get(self, url):
+        self._track_new_documents()
         self.browser.get(url)
+        self.wait_until_ready()
+        return self
+
+    def wait_until_ready(self):
+        """
+        Waits for the page to be as loaded as the --page-load-strategy asks for: slow waits for the load event and
+        a quiet network, normal for the load event and fast only for the DOM (DOMContentLoaded)
+        n.b -> when the browser's own pageLoadStrategy already guarantees this no extra round trip is made
+        """
+        strategy = self.config.page_load_strategy
+        if strategy.browser_waits:
+            return self
+        self.wait.until(
+            lambda browser: browser.execute_script(PAGE_READY, list(strategy.ready_states), strategy.network_quiet_ms),
+            f"Page was not ready under the {strategy}",
+        )
         return self
 
+    def track_network(self):
+        """
+        Starts counting the fetch / XMLHttpRequest requests of the loaded page straight away instead of at the first
+        network idle wait, call it straight after navigating when requests fire early in the page's life
+        n.b -> chrome already counts them from the start of every page pylenium navigated to
+        """
+        self.browser.execute_script(TRACK_NETWORK)
+        return self
+
+    def _track_new_documents(self):
+        """
+        Registers the network tracker with chrome, once per driver before its first navigation, so it runs ahead of
+        the scripts of every document and requests fired while the page loads are counted too
+        n.b -> other browsers have no such hook, their tracker is installed by the first readiness or idle check
+        """
+        if self._tracks_new_documents is not None:
+            return
+        self._tracks_new_documents = False
+        browser = getattr(self.browser, "wrapped_driver", self.browser)
+        if browser.capabilities.get("browserName") != "chrome":
+            return
+        try:
+            browser.command_executor._commands.setdefault("executeCdpCommand", CDP_EXECUTE)
+            browser.execute(
+                "executeCdpCommand",
+                {"cmd": "Page.addScriptToEvaluateOnNewDocument", "params": {"source": TRACK_NETWORK_ON_NEW_DOCUMENT}},
+            )
+            self._tracks_new_documents = True
+        except WebDriverException as exc:
+            log.debug(f"Unable to track the network from the start of each page: {exc}")
+
+    def wait_for_network_idle(self, quiet_period: float = None):
+        """
+        Waits until no fetch or XMLHttpRequest has been in flight for quiet_period seconds, a drop in replacement
+        for a fixed sleep while a single page app loads its data
+        :param quiet_period: seconds, defaults to --network-quiet-period
+        """
+        self.wait.until_network_idle(self.config.network_quiet_period if quiet_period is None else quiet_period)
+        return self
+
+    def blocked_requests(self) -> Optional[int]:
+        """
+        :return: how many requests matching --block-urls were blocked since this was last called, or None when the
+        browser cannot report it (only chrome can)
+        """
+        if not self.config.block_urls or self.browser.capabilities.get("browserName") != "chrome":
+            return None
+        return count_blocked_requests(self.browser)
+
     def quit(self):
-        self.browser.close()
+        """
+        Ends the webdriver session, closing every window and shutting the browser down
+        """
+        self.browser.quit()
+
+    def reset(self):
+        """
+        Restores the browser to a blank state so it can be handed to the next test without a restart:
+        closes any extra windows, clears local / session storage and cookies then navigates to about:blank
+        n.b -> cookies can only be deleted for the domain currently loaded in the browser
+        """
+        handles = self.browser.window_handles
+        for handle in handles[1:]:
+            self.browser.switch_to.window(handle)
+            self.browser.close()
+        self.browser.switch_to.window(handles[0])
+        self.browser.execute_script(CLEAR_WEB_STORAGE)
+        self.browser.delete_all_cookies()
+        self.browser.get("about:blank")
+        return self
+
+    def snapshot_session(self) -> SessionSnapshot:
+        """
+        Captures the cookies, local and session storage of the page currently loaded, e.g straight after logging in
+        :return: a snapshot which restore_session can load into any other driver
+        """
+        storage = self.browser.execute_script(CAPTURE_WEB_STORAGE)
+        return SessionSnapshot(
+            url=self.browser.current_url,
+            cookies=self.browser.get_cookies(),
+            local_storage=storage["local"],
+            session_storage=storage["session"],
+        )
+
+    def restore_session(self, snapshot: SessionSnapshot):
+        """
+        Loads a snapshot into this browser so it is logged in without going through the login page
+        n.b -> navigates to the snapshot's origin first, cookies and storage can only be written for the loaded site
+        so cookies of other domains (e.g a single sign on provider) are skipped
+        """
+        self.browser.get(snapshot.origin)
+        skipped = [cookie.get("name") for cookie in snapshot.cookies if not snapshot.sets_cookie(cookie)]
+        if skipped:
+            log.debug(f"Not restoring cookies {skipped}, they do not belong to {snapshot.origin}")
+        for cookie in snapshot.restorable_cookies():
+            self.browser.add_cookie(cookie)
+        self.browser.execute_script(RESTORE_WEB_STORAGE, snapshot.local_storage, snapshot.session_storage)
+        return self
 
     @property
     def title(self):
         return self.browser.title
 
+    def commander(self) -> Commander:
+        """
+        :return: a Commander which executes everything queued on it against this browser in a single round trip
+        """
+        return Commander(self.browser)
+
     def xpath(self, expression: str) -> PyleniumElement:
         return self.browser.find_element_by_xpath(expression)
+
+    def find(self, locator: str, by: str = None) -> PyleniumElement:
+        """
+        :param by: the selenium By strategy to use, defaults to the --default-selector
+        """
+        return self.browser.find_element(by or SELECTORS[self.config.default_selector], locator)
+
+    def find_all(self, locator: str, by: str = None) -> PyleniumElements:
+        """
+        :param by: the selenium By strategy to use, defaults to the --default-selector
+        :return: a PyleniumElements collection which reads its elements in bulk
+        """
+        return PyleniumElements(
+            self.browser, self.browser.find_elements(by or SELECTORS[self.config.default_selector], locator)
+        )
@@ -0,0 +1,52 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import urllib3
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+
+def build_connection_pool(config) -> urllib3.PoolManager:
+    """
+    Builds the keep-alive connection pool shared by every remote session in this worker; connection errors and
+    idempotent requests are retried, pooled connections dropped by the hub while idle are detected and reopened by
+    urllib3 before reuse, commands which may have reached the hub (e.g a POST click) are never replayed
+    """
+    return urllib3.PoolManager(
+        maxsize=config.remote_pool_size,
+        block=False,
+        timeout=urllib3.Timeout(connect=config.remote_connect_timeout, read=config.remote_read_timeout),
+        retries=urllib3.Retry(
+            total=config.remote_retries,
+            connect=config.remote_retries,
+            read=config.remote_retries,
+            status=0,
+            redirect=0,
+            backoff_factor=0.1,
+            raise_on_redirect=False,
+        ),
+    )
+
+
+class PooledRemoteConnection(RemoteConnection):
+    """
+    A RemoteConnection which sends its commands over a shared keep-alive connection pool rather than one of its
+    own, so sessions against the same hub reuse warm TCP connections instead of negotiating new ones
+    """
+
+    def __init__(self, remote_server_addr: str, pool: urllib3.PoolManager):
+        super().__init__(remote_server_addr, keep_alive=True, resolve_ip=False)
+        self._conn = pool
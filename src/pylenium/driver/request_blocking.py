@@ -0,0 +1,106 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+from typing import Dict, List
+from urllib.parse import quote
+
+# Chrome reports requests stopped by Network.setBlockedURLs as failed with this blocked reason
+BLOCKED_BY_DEVTOOLS = "inspector"
+CDP_EXECUTE = ("POST", "/session/$sessionId/goog/cdp/execute")
+# Firefox sends requests the blocking PAC script matches to this port, where nothing listens, so they fail at once
+UNROUTABLE_PROXY = "PROXY 127.0.0.1:1"
+
+
+def chrome_capabilities(patterns: List[str]) -> dict:
+    """
+    Performance logging lets blocked requests be counted after each test
+    """
+    return {"goog:loggingPrefs": {"performance": "ALL"}} if patterns else {}
+
+
+def with_blocking(capabilities: dict, patterns: List[str]) -> dict:
+    """
+    Adds what blocking needs to a remote session's capabilities, anything the capabilities already set wins
+    """
+    if not patterns:
+        return capabilities
+    name = capabilities.get("browserName")
+    if name == "chrome":
+        return {**chrome_capabilities(patterns), **capabilities}
+    if name == "firefox":
+        options = dict(capabilities.get("moz:firefoxOptions", {}))
+        options["prefs"] = {**firefox_preferences(patterns), **options.get("prefs", {})}
+        return {**capabilities, "moz:firefoxOptions": options}
+    return capabilities
+
+
+def block_in_chrome(browser, patterns: List[str]):
+    """
+    Blocks every request whose url matches one of patterns (* is a wildcard) through the DevTools protocol
+    n.b -> applies to the tab the driver controls, windows opened later are not blocked
+    """
+    if not patterns:
+        return
+    commands = browser.command_executor._commands
+    commands.setdefault("executeCdpCommand", CDP_EXECUTE)
+    browser.execute("executeCdpCommand", {"cmd": "Network.enable", "params": {}})
+    browser.execute("executeCdpCommand", {"cmd": "Network.setBlockedURLs", "params": {"urls": list(patterns)}})
+
+
+def firefox_preferences(patterns: List[str], proxy: str = None) -> Dict[str, object]:
+    """
+    Firefox has no url blocking preference, so a proxy auto config script routes matching requests to a dead
+    proxy and sends everything else to proxy (host:port) when given, or directly
+    """
+    route = f"PROXY {proxy}" if proxy else "DIRECT"
+    if not patterns:
+        return _manual_proxy_preferences(proxy) if proxy else {}
+    conditions = " || ".join(f"shExpMatch(url, {json.dumps(pattern)})" for pattern in patterns)
+    pac = f"function FindProxyForURL(url, host) {{ return ({conditions}) ? '{UNROUTABLE_PROXY}' : '{route}'; }}"
+    return {
+        "network.proxy.type": 2,
+        "network.proxy.autoconfig_url": f"data:text/javascript,{quote(pac)}",
+        "network.proxy.autoconfig_url.include_path": True,
+    }
+
+
+def _manual_proxy_preferences(proxy: str) -> Dict[str, object]:
+    host, _, port = proxy.rpartition(":")
+    return {
+        "network.proxy.type": 1,
+        "network.proxy.http": host,
+        "network.proxy.http_port": int(port),
+        "network.proxy.ssl": host,
+        "network.proxy.ssl_port": int(port),
+        "network.proxy.allow_hijacking_localhost": False,
+    }
+
+
+def count_blocked_requests(browser) -> int:
+    """
+    Counts the requests chrome blocked since the performance log was last read, reading it empties it
+    """
+    blocked = 0
+    for entry in browser.get_log("performance"):
+        message = json.loads(entry["message"]).get("message", {})
+        if (
+            message.get("method") == "Network.loadingFailed"
+            and message.get("params", {}).get("blockedReason") == BLOCKED_BY_DEVTOOLS
+        ):
+            blocked += 1
+    return blocked
@@ -0,0 +1,125 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+@dataclass
+class SessionSnapshot:
+    """
+    The cookies and web storage of a logged in browser, captured from the page at url
+    """
+
+    url: str
+    cookies: List[dict] = field(default_factory=list)
+    local_storage: Dict[str, str] = field(default_factory=dict)
+    session_storage: Dict[str, str] = field(default_factory=dict)
+    captured_at: float = field(default_factory=time.time)
+
+    @property
+    def origin(self) -> str:
+        """
+        :return: the root of the site the snapshot was captured on, cookies and storage can only be restored there
+        """
+        parts = urlsplit(self.url)
+        return f"{parts.scheme}://{parts.netloc}/"
+
+    def restorable_cookies(self) -> List[dict]:
+        """
+        :return: the captured cookies the snapshot's site may set, trimmed to the fields add_cookie accepts
+        """
+        return [
+            {key: cookie[key] for key in COOKIE_FIELDS if key in cookie}
+            for cookie in self.cookies
+            if self.sets_cookie(cookie)
+        ]
+
+    def sets_cookie(self, cookie: dict) -> bool:
+        """
+        Browsers refuse cookies for any domain but the loaded site's, or a parent domain of it, e.g a snapshot of
+        app.test can restore cookies for app.test and .app.test but not for sso.test
+        """
+        domain = (cookie.get("domain") or "").lstrip(".").lower()
+        host = (urlsplit(self.url).hostname or "").lower()
+        return not domain or host == domain or host.endswith(f".{domain}")
+
+    def expired(self, ttl: float, now: float = None) -> bool:
+        """
+        A snapshot is stale once it is older than ttl seconds or any of its cookies has expired
+        """
+        now = time.time() if now is None else now
+        if now - self.captured_at >= ttl:
+            return True
+        return any(cookie.get("expiry") is not None and cookie["expiry"] <= now for cookie in self.cookies)
+
+
+class SessionStore:
+    """
+    Keeps one snapshot per user role for this worker, the login steps for a role run once and every later test
+    (in any thread) restores the snapshot until it is older than ttl seconds
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._snapshots: Dict[str, SessionSnapshot] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str) -> Optional[SessionSnapshot]:
+        with self._lock:
+            snapshot = self._snapshots.get(role)
+            if snapshot is not None and snapshot.expired(self.ttl):
+                del self._snapshots[role]
+                return None
+            return snapshot
+
+    def put(self, role: str, snapshot: SessionSnapshot):
+        with self._lock:
+            self._snapshots[role] = snapshot
+
+    def invalidate(self, role: str = None):
+        """
+        Forgets the snapshot for role, or every snapshot when no role is given, e.g after a password change
+        """
+        with self._lock:
+            if role is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(role, None)
+
+    def login(self, role: str, driver, login: Callable) -> SessionSnapshot:
+        """
+        Logs driver in as role, restoring the stored snapshot or running login(driver) and snapshotting the result
+        n.b -> concurrent logins for the same role wait for the first one rather than all logging in
+        """
+        with self._lock:
+            role_lock = self._locks.setdefault(role, threading.Lock())
+        with role_lock:
+            snapshot = self.get(role)
+            if snapshot is not None:
+                driver.restore_session(snapshot)
+                return snapshot
+            login(driver)
+            snapshot = driver.snapshot_session()
+            self.put(role, snapshot)
+            return snapshot
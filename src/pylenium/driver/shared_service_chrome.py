@@ -0,0 +1,45 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.webdriver import WebDriver as ChromeWebDriver
+from selenium.webdriver.remote.webdriver import WebDriver as RemoteWebDriver
+
+
+class SharedServiceChrome(ChromeWebDriver):
+    """
+    A chrome driver which opens its session against an already running chromedriver service instead of
+    spawning a service process of its own; quitting it ends the browser session but leaves the service
+    running for the next session
+    """
+
+    def __init__(self, service: Service, options=None, desired_capabilities=None):
+        if desired_capabilities is None:
+            desired_capabilities = (options or self.create_options()).to_capabilities()
+        elif options is not None:
+            desired_capabilities.update(options.to_capabilities())
+        self.service = service
+        RemoteWebDriver.__init__(
+            self,
+            command_executor=ChromeRemoteConnection(remote_server_addr=service.service_url),
+            desired_capabilities=desired_capabilities,
+        )
+        self._is_remote = False
+
+    def quit(self):
+        RemoteWebDriver.quit(self)
@@ -0,0 +1,66 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+from typing import List, Optional, Tuple, Iterable
+
+from pylenium.constants.javascript import READ_ELEMENTS
+
+
+class PyleniumElements(list):
+    """
+    The elements returned by find_all, reading text, attributes or visibility fetches the value for every element
+    in the collection in a single script call; results are cached on the collection until refresh() is called
+
+    n.b -> attributes prefer the elements property when it is a primitive, as selenium does for e.g value / checked
+    """
+
+    def __init__(self, browser, elements: Iterable):
+        super().__init__(elements)
+        self.browser = browser
+        self._cache = {}
+
+    def texts(self) -> List[str]:
+        return self._read(("text",))
+
+    def attributes(self, name: str) -> List[Optional[str]]:
+        return self._read(("attribute", name))
+
+    def visibility(self) -> List[bool]:
+        return self._read(("visible",))
+
+    def prefetch(self, text: bool = True, visible: bool = True, attributes: Tuple[str, ...] = ()):
+        """
+        Warms the cache with every requested read in a single round trip, e.g before asserting over a large grid
+        """
+        reads = [("text",)] * text + [("visible",)] * visible + [("attribute", name) for name in attributes]
+        self._fetch([read for read in reads if read not in self._cache])
+        return self
+
+    def refresh(self):
+        self._cache.clear()
+        return self
+
+    def _read(self, read: Tuple[str, ...]) -> list:
+        if read not in self._cache:
+            self._fetch([read])
+        return self._cache[read]
+
+    def _fetch(self, reads: List[Tuple[str, ...]]):
+        if not reads:
+            return
+        results = self.browser.execute_script(READ_ELEMENTS, list(self), reads) if self else [[] for _ in reads]
+        self._cache.update(zip(reads, results))
@@ -15,11 +15,214 @@
 #  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
 #  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple, Any
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.support import expected_conditions
 from selenium.webdriver.support.wait import WebDriverWait, POLL_FREQUENCY
 
+from pylenium.constants.javascript import NETWORK_IDLE, OBSERVE_LOCATOR
+from pylenium.constants.string_globals import WAIT_MODE_POLL, WAIT_MODE_OBSERVER
+from pylenium.logging.log import log
+from pylenium.strategies.polling_strategy import PollingStrategy, FixedPollingStrategy
+
+GET_TIMEOUTS = ("GET", "/session/$sessionId/timeouts")
+# The w3c script timeout of a new session, assumed when the driver can not report its own
+DEFAULT_SCRIPT_TIMEOUT_MS = 30000
+
+# How each locator strategy is expressed to the in page observer: css selectors or xpath
+_OBSERVABLE_LOCATORS = {
+    By.CSS_SELECTOR: lambda value: ("css", value),
+    By.ID: lambda value: ("css", f'[id="{_escape_attribute(value)}"]'),
+    By.NAME: lambda value: ("css", f'[name="{_escape_attribute(value)}"]'),
+    By.CLASS_NAME: lambda value: ("css", f'[class~="{_escape_attribute(value)}"]'),
+    By.TAG_NAME: lambda value: ("css", value),
+    By.XPATH: lambda value: ("xpath", value),
+}
+
+
+@dataclass
+class ConditionStatistics:
+    waits: int = 0
+    polls: int = 0
+    timeouts: int = 0
+    max_polls: int = 0
+    total_seconds: float = 0.0
+
+    def record(self, polls: int, seconds: float, timed_out: bool):
+        self.waits += 1
+        self.polls += polls
+        self.timeouts += timed_out
+        self.max_polls = max(self.max_polls, polls)
+        self.total_seconds += seconds
+
+    @property
+    def mean_polls(self) -> float:
+        return self.polls / self.waits if self.waits else 0.0
+
 
 class PyleniumWait(WebDriverWait):
+    """
+    WebDriverWait which sleeps between polls according to a PollingStrategy rather than a fixed frequency,
+    recording how many polls each wait took in last_poll_count and per condition totals in statistics
+
+    With the observer wait mode, until_located resolves inside the page with a single asynchronous script
+    instead of polling the driver, falling back to polling whenever the script cannot be used
+    """
+
     def __init__(
-        self, driver, timeout, poll_frequency=POLL_FREQUENCY, ignored_exceptions=None
+        self,
+        driver,
+        timeout,
+        poll_frequency=POLL_FREQUENCY,
+        ignored_exceptions=None,
+        polling_strategy: PollingStrategy = None,
+        wait_mode: str = WAIT_MODE_POLL,
     ):
         super().__init__(driver, timeout, poll_frequency, ignored_exceptions)
+        self.polling_strategy = polling_strategy or FixedPollingStrategy(self._poll)
+        self.wait_mode = wait_mode
+        self.statistics: Dict[str, ConditionStatistics] = {}
+        self.last_poll_count = 0
+
+    def until(self, method, message=""):
+        return self._wait(method, message, negate=False)
+
+    def until_not(self, method, message=""):
+        return self._wait(method, message, negate=True)
+
+    def until_located(self, locator: Tuple[str, str], condition: str = "present", expected: Any = None, message=""):
+        """
+        Waits for the element found by locator to meet a condition
+        :param locator: a (By, value) tuple
+        :param condition: one of present, visible, enabled, text (expected is the text) or count (expected is
+        the number of elements)
+        :return: the element, or the list of elements for the count condition
+        """
+        if self.wait_mode == WAIT_MODE_OBSERVER and locator[0] in _OBSERVABLE_LOCATORS:
+            try:
+                return self._observe(locator, condition, expected, message)
+            except TimeoutException:
+                raise
+            except WebDriverException as exc:
+                log.debug(f"Observer wait unavailable, falling back to polling: {exc}")
+        return self.until(_POLLING_CONDITIONS[condition](locator, expected), message)
+
+    def until_network_idle(self, quiet_period: float = 0.5, message=""):
+        """
+        Waits until the page has had no fetch or XMLHttpRequest in flight for quiet_period seconds
+        n.b -> requests are tracked by wrapping fetch and XMLHttpRequest, chrome installs the tracking before the page's
+        own scripts run when pylenium navigated there. Elsewhere the first check after a navigation installs it, so
+        requests already in flight at that point are only seen once they finish
+        """
+        quiet_ms = int(quiet_period * 1000)
+
+        def network_is_idle(driver):
+            return driver.execute_script(NETWORK_IDLE, quiet_ms)
+
+        return self.until(network_is_idle, message or f"The network was not idle for {quiet_period} seconds")
+
+    def _observe(self, locator: Tuple[str, str], condition: str, expected: Any, message: str):
+        """
+        n.b -> the session script timeout is raised to cover the wait and restored to its previous value afterwards
+        """
+        using, value = _OBSERVABLE_LOCATORS[locator[0]](locator[1])
+        start = time.monotonic()
+        previous = self._script_timeout()
+        self._driver.set_script_timeout(self._timeout + 5)
+        try:
+            result = self._driver.execute_async_script(
+                OBSERVE_LOCATOR, using, value, condition, expected, int(self._timeout * 1000)
+            ) or {}
+        finally:
+            self._restore_script_timeout(previous)
+        if "error" in result:
+            raise WebDriverException(result["error"])
+        timed_out = "value" not in result
+        self._record(f"observe_{condition}", 1, time.monotonic() - start, timed_out)
+        if timed_out:
+            raise TimeoutException(message)
+        return result["value"]
+
+    def _script_timeout(self):
+        """
+        :return: the session script timeout in milliseconds (None means no timeout), or the w3c default when the
+        driver can not report it
+        """
+        driver = getattr(self._driver, "wrapped_driver", self._driver)
+        try:
+            driver.command_executor._commands.setdefault("getTimeouts", GET_TIMEOUTS)
+            return driver.execute("getTimeouts")["value"]["script"]
+        except (WebDriverException, AttributeError, KeyError, TypeError):
+            return DEFAULT_SCRIPT_TIMEOUT_MS
+
+    def _restore_script_timeout(self, previous):
+        if previous is None:
+            driver = getattr(self._driver, "wrapped_driver", self._driver)
+            driver.execute(Command.SET_TIMEOUTS, {"script": None})
+        else:
+            self._driver.set_script_timeout(previous / 1000)
+
+    def _wait(self, method, message, negate):
+        screen, stacktrace = None, None
+        delays = self.polling_strategy.delays()
+        polls, timed_out = 0, False
+        start = time.monotonic()
+        end_time = start + self._timeout
+        try:
+            while True:
+                polls += 1
+                try:
+                    value = method(self._driver)
+                    if negate and not value:
+                        return True
+                    if not negate and value:
+                        return value
+                except self._ignored_exceptions as exc:
+                    if negate:
+                        return True
+                    screen = getattr(exc, "screen", None)
+                    stacktrace = getattr(exc, "stacktrace", None)
+                remaining = end_time - time.monotonic()
+                if remaining <= 0:
+                    timed_out = True
+                    break
+                time.sleep(min(next(delays), remaining))
+        finally:
+            self._record(getattr(method, "__name__", type(method).__name__), polls, time.monotonic() - start, timed_out)
+        raise TimeoutException(message, screen, stacktrace)
+
+    def _record(self, name: str, polls: int, seconds: float, timed_out: bool):
+        self.statistics.setdefault(name, ConditionStatistics()).record(polls, seconds, timed_out)
+        self.last_poll_count = polls
+
+
+def _escape_attribute(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _text_in_element(locator, expected):
+    def text_in_element(driver):
+        element = driver.find_element(*locator)
+        return element if expected in element.text else False
+    return text_in_element
+
+
+def _number_of_elements(locator, expected):
+    def number_of_elements(driver):
+        elements = driver.find_elements(*locator)
+        return elements if len(elements) == expected else False
+    return number_of_elements
+
+
+_POLLING_CONDITIONS = {
+    "present": lambda locator, expected: expected_conditions.presence_of_element_located(locator),
+    "visible": lambda locator, expected: expected_conditions.visibility_of_element_located(locator),
+    "enabled": lambda locator, expected: expected_conditions.element_to_be_clickable(locator),
+    "text": _text_in_element,
+    "count": _number_of_elements,
+}
@@ -71,3 +71,11 @@ class PyleniumEventFiringWrapperException(Exception):
 
 class PyleniumCommandLineArgException(Exception):
     pass
+
+
+class PyleniumCommandException(Exception):
+    pass
+
+
+class PyleniumGridException(Exception):
+    pass
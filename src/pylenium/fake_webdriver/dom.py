@@ -0,0 +1,329 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Callable, Iterator, List, Optional
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+}
+BOOLEAN_ATTRIBUTES = {"checked", "disabled", "hidden", "multiple", "readonly", "required", "selected"}
+INVISIBLE_ELEMENTS = {"head", "script", "style", "template", "title", "noscript"}
+
+
+class InvalidSelector(Exception):
+    pass
+
+
+class Node:
+    """
+    An element or text node of the in memory document; text nodes have no tag and carry their text in data
+    """
+
+    __slots__ = ("tag", "attributes", "children", "parent", "data")
+
+    def __init__(self, tag: Optional[str] = None, attributes: dict = None, data: str = ""):
+        self.tag = tag
+        self.attributes = attributes or {}
+        self.children: List["Node"] = []
+        self.parent: Optional["Node"] = None
+        self.data = data
+
+    def append(self, child: "Node") -> "Node":
+        child.parent = self
+        self.children.append(child)
+        return child
+
+    @property
+    def elements(self) -> List["Node"]:
+        return [child for child in self.children if child.tag]
+
+    def descendants(self) -> Iterator["Node"]:
+        for child in self.children:
+            if child.tag:
+                yield child
+                yield from child.descendants()
+
+    def root(self) -> "Node":
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def classes(self) -> List[str]:
+        return self.attributes.get("class", "").split()
+
+    def text_content(self) -> str:
+        return self.data if not self.tag else "".join(child.text_content() for child in self.children)
+
+    def visible_text(self) -> str:
+        """
+        The rendered text of the node: hidden descendants are skipped and whitespace is collapsed
+        """
+        return " ".join(self._visible_parts()).strip() if self.displayed() else ""
+
+    def _visible_parts(self) -> List[str]:
+        if not self.tag:
+            return self.data.split()
+        if self.tag in INVISIBLE_ELEMENTS or self._hidden():
+            return []
+        parts = []
+        for child in self.children:
+            parts.extend(child._visible_parts())
+        return parts
+
+    def displayed(self) -> bool:
+        node = self
+        while node is not None and node.tag != "#document":
+            if node.tag in INVISIBLE_ELEMENTS or node._hidden():
+                return False
+            node = node.parent
+        return True
+
+    def _hidden(self) -> bool:
+        if "hidden" in self.attributes or (self.tag == "input" and self.attributes.get("type") == "hidden"):
+            return True
+        style = self.attributes.get("style", "").replace(" ", "").lower()
+        return "display:none" in style or "visibility:hidden" in style
+
+    def enabled(self) -> bool:
+        return "disabled" not in self.attributes
+
+    def outer_html(self) -> str:
+        if not self.tag:
+            return escape(self.data, quote=False)
+        if self.tag == "#document":
+            return self.inner_html()
+        attributes = "".join(f' {name}="{escape(value)}"' for name, value in self.attributes.items())
+        if self.tag in VOID_ELEMENTS:
+            return f"<{self.tag}{attributes}>"
+        return f"<{self.tag}{attributes}>{self.inner_html()}</{self.tag}>"
+
+    def inner_html(self) -> str:
+        return "".join(child.outer_html() for child in self.children)
+
+    def find(self, predicate: Callable[["Node"], bool]) -> Optional["Node"]:
+        return next((node for node in self.descendants() if predicate(node)), None)
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.document = Node("#document")
+        self.stack = [self.document]
+
+    def handle_starttag(self, tag, attrs):
+        node = self.stack[-1].append(Node(tag, {name: value or "" for name, value in attrs}))
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].append(Node(tag, {name: value or "" for name, value in attrs}))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].append(Node(data=data))
+
+
+def parse(html: str) -> Node:
+    """
+    Parses html into a document node; unclosed elements are closed by the nearest matching end tag
+    """
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+# CSS selectors: type, universal, #id, .class and [attribute] selectors joined by descendant or child combinators
+_COMPOUND = re.compile(
+    r"""(?P<tag>[a-zA-Z][\w-]*|\*)?(?P<rest>(?:\#[\w-]+|\.[\w-]+|\[[^\]]+\])*)"""
+)
+_SIMPLE = re.compile(r"""\#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[(?P<attribute>[^\]]+)\]""")
+_ATTRIBUTE = re.compile(
+    r"""^\s*(?P<name>[\w:-]+)\s*(?:(?P<operator>[~^$*|]?=)\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s"']+)))?\s*$"""
+)
+_ATTRIBUTE_OPERATORS = {
+    "=": lambda actual, expected: actual == expected,
+    "~=": lambda actual, expected: expected in actual.split(),
+    "^=": lambda actual, expected: actual.startswith(expected),
+    "$=": lambda actual, expected: actual.endswith(expected),
+    "*=": lambda actual, expected: expected in actual,
+    "|=": lambda actual, expected: actual == expected or actual.startswith(f"{expected}-"),
+}
+
+
+def _split_outside_brackets(selector: str, separator: str) -> List[str]:
+    parts, depth, quote, current = [], 0, None, ""
+    for char in selector:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _compile_compound(compound: str) -> Callable[[Node], bool]:
+    match = _COMPOUND.fullmatch(compound)
+    if not compound or not match:
+        raise InvalidSelector(f"Unsupported css selector: {compound}")
+    checks = []
+    tag = match.group("tag")
+    if tag and tag != "*":
+        checks.append(lambda node, tag=tag.lower(): node.tag == tag)
+    for simple in _SIMPLE.finditer(match.group("rest")):
+        if simple.group("id"):
+            checks.append(lambda node, value=simple.group("id"): node.attributes.get("id") == value)
+        elif simple.group("cls"):
+            checks.append(lambda node, value=simple.group("cls"): value in node.classes())
+        else:
+            attribute = _ATTRIBUTE.match(simple.group("attribute"))
+            if not attribute:
+                raise InvalidSelector(f"Unsupported attribute selector: [{simple.group('attribute')}]")
+            name, operator = attribute.group("name"), attribute.group("operator")
+            if not operator:
+                checks.append(lambda node, name=name: name in node.attributes)
+            else:
+                expected = next(value for value in attribute.group("dq", "sq", "bare") if value is not None)
+                checks.append(
+                    lambda node, name=name, test=_ATTRIBUTE_OPERATORS[operator], expected=expected: (
+                        name in node.attributes and test(node.attributes[name], expected)
+                    )
+                )
+    return lambda node: all(check(node) for check in checks)
+
+
+def _compile_complex(selector: str) -> Callable[[Node], bool]:
+    tokens = re.sub(r"\s*>\s*", " > ", selector.strip()).split()
+    if not tokens or tokens[0] == ">" or tokens[-1] == ">" or any(token in "+~" for token in tokens):
+        raise InvalidSelector(f"Unsupported css selector: {selector}")
+    steps, combinator = [], " "
+    for token in tokens:
+        if token == ">":
+            combinator = ">"
+            continue
+        steps.append((combinator, _compile_compound(token)))
+        combinator = " "
+
+    def matches(node: Node, index: int = len(steps) - 1) -> bool:
+        combinator, check = steps[index]
+        if not check(node):
+            return False
+        if index == 0:
+            return True
+        ancestor = node.parent
+        while ancestor is not None and ancestor.tag != "#document":
+            if matches(ancestor, index - 1):
+                return True
+            if combinator == ">":
+                return False
+            ancestor = ancestor.parent
+        return False
+
+    return matches
+
+
+def select(context: Node, selector: str) -> List[Node]:
+    """
+    Finds the descendants of context matching a css selector, in document order
+    """
+    groups = [_compile_complex(group) for group in _split_outside_brackets(selector, ",")]
+    return [node for node in context.descendants() if any(group(node) for group in groups)]
+
+
+# XPath: absolute or relative location paths of name tests with @attribute, text() and contains() predicates
+_XPATH_STEP = re.compile(r"(?P<axis>//|/)(?P<name>[\w-]+|\*)(?P<predicates>(?:\[[^\]]+\])*)")
+_XPATH_PREDICATE = re.compile(
+    r"""^(?:(?P<index>\d+)|@(?P<has>[\w-]+)|(?P<target>@[\w-]+|text\(\)|\.)\s*=\s*(?P<q1>["'])(?P<equals>.*?)(?P=q1)"""
+    r"""|contains\(\s*(?P<ctarget>@[\w-]+|text\(\)|\.)\s*,\s*(?P<q2>["'])(?P<contains>.*?)(?P=q2)\s*\))$"""
+)
+
+
+def _xpath_value(node: Node, target: str) -> Optional[str]:
+    if target.startswith("@"):
+        return node.attributes.get(target[1:])
+    if target == "text()":
+        return "".join(child.data for child in node.children if not child.tag)
+    return node.text_content()
+
+
+def _xpath_predicate(predicate: str) -> Callable[[Node, int], bool]:
+    match = _XPATH_PREDICATE.match(predicate.strip())
+    if not match:
+        raise InvalidSelector(f"Unsupported xpath predicate: [{predicate}]")
+    if match.group("index"):
+        return lambda node, position, index=int(match.group("index")): position == index
+    if match.group("has"):
+        return lambda node, position, name=match.group("has"): name in node.attributes
+    if match.group("target"):
+        return lambda node, position, target=match.group("target"), value=match.group("equals"): (
+            _xpath_value(node, target) == value
+        )
+    return lambda node, position, target=match.group("ctarget"), value=match.group("contains"): (
+        value in (_xpath_value(node, target) or "")
+    )
+
+
+def xpath(context: Node, expression: str) -> List[Node]:
+    """
+    Evaluates the subset of xpath pylenium's locators use against context, in document order
+    """
+    expression = expression.strip()
+    if expression.startswith("."):
+        expression = expression[1:]
+    elif context.tag != "#document":
+        context = context.root()
+    position, steps = 0, []
+    for match in _XPATH_STEP.finditer(expression):
+        if match.start() != position:
+            break
+        position = match.end()
+        steps.append(match)
+    if not steps or position != len(expression):
+        raise InvalidSelector(f"Unsupported xpath: {expression}")
+
+    nodes = [context]
+    for step in steps:
+        name = step.group("name").lower()
+        predicates = [_xpath_predicate(predicate) for predicate in re.findall(r"\[([^\]]+)\]", step.group("predicates"))]
+        found = []
+        for node in nodes:
+            candidates = node.descendants() if step.group("axis") == "//" else node.elements
+            matched = [candidate for candidate in candidates if name == "*" or candidate.tag == name]
+            for index, candidate in enumerate(matched, start=1):
+                if all(predicate(candidate, index) for predicate in predicates) and candidate not in found:
+                    found.append(candidate)
+        nodes = found
+    order = {id(node): index for index, node in enumerate(context.root().descendants())}
+    return sorted(nodes, key=lambda node: order.get(id(node), 0))
@@ -0,0 +1,576 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import base64
+import itertools
+import json
+import pkgutil
+import re
+import threading
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import unquote, unquote_to_bytes, urljoin, urlsplit
+from urllib.request import urlopen
+
+from pylenium.constants.javascript import (
+    CAPTURE_WEB_STORAGE,
+    CLEAR_WEB_STORAGE,
+    NETWORK_IDLE,
+    PAGE_READY,
+    READ_ELEMENTS,
+    RESTORE_WEB_STORAGE,
+    TRACK_NETWORK,
+)
+from pylenium.fake_webdriver.dom import BOOLEAN_ATTRIBUTES, InvalidSelector, Node, parse, select, xpath
+
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+BLANK = "about:blank"
+# 1x1 transparent png
+SCREENSHOT = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class WebDriverError(Exception):
+    """
+    Raised by a command handler, answered as a W3C error response
+    """
+
+    def __init__(self, error: str, message: str = "", status: int = 404):
+        super().__init__(message)
+        self.error = error
+        self.status = status
+
+
+def _selenium_atom(name: str) -> str:
+    return "return (%s).apply(null, arguments);" % pkgutil.get_data("selenium", f"webdriver/remote/{name}").decode()
+
+
+@dataclass
+class Window:
+    handle: str
+    url: str = BLANK
+    document: Node = field(default_factory=lambda: parse(""))
+    history: List[str] = field(default_factory=lambda: [BLANK])
+    position: int = 0
+
+
+class Session:
+    """
+    The state of one fake browser: its windows, cookies, timeouts and the element references handed to the client
+    """
+
+    def __init__(self, server: "FakeWebDriverServer", capabilities: dict):
+        self.server = server
+        self.id = uuid.uuid4().hex
+        self.capabilities = capabilities
+        self.windows: Dict[str, Window] = {}
+        self.window = self.open_window()
+        self.cookies: Dict[str, dict] = {}
+        self._storage: Dict[str, Dict[str, dict]] = {}
+        self.timeouts = {"implicit": 0, "pageLoad": 300000, "script": 30000}
+        self.lock = threading.Lock()
+        self._elements: Dict[str, Node] = {}
+        self._references: Dict[int, str] = {}
+        self._retired = set()
+        self._ids = itertools.count()
+
+    def open_window(self) -> Window:
+        window = Window(uuid.uuid4().hex)
+        self.windows[window.handle] = window
+        return window
+
+    def navigate(self, url: str, record: bool = True):
+        url = urljoin(self.window.url, url) if self.window.url != BLANK else url
+        self.window.document = parse(self.server.load(url))
+        self.window.url = url
+        self._retired.update(self._elements)
+        self._elements.clear()
+        self._references.clear()
+        if record:
+            del self.window.history[self.window.position + 1:]
+            self.window.history.append(url)
+            self.window.position += 1
+
+    def storage(self) -> Dict[str, dict]:
+        """
+        :return: the local and session storage of the loaded page's origin
+        """
+        parts = urlsplit(self.window.url)
+        return self._storage.setdefault(f"{parts.scheme}://{parts.netloc}", {"local": {}, "session": {}})
+
+    def reference(self, node: Node) -> dict:
+        reference = self._references.get(id(node))
+        if reference is None:
+            reference = f"{self.id[:8]}-{next(self._ids)}"
+            self._references[id(node)] = reference
+            self._elements[reference] = node
+        return {ELEMENT_KEY: reference}
+
+    def element(self, reference: str) -> Node:
+        node = self._elements.get(reference)
+        if node is None and reference in self._retired:
+            raise WebDriverError("stale element reference", "The element belongs to a page which has been unloaded")
+        if node is None:
+            raise WebDriverError("no such element", f"Unknown element reference: {reference}")
+        if node.root() is not self.window.document:
+            raise WebDriverError("stale element reference", "The element is no longer attached to the document")
+        return node
+
+    def locate(self, context: Node, using: str, value: str) -> List[Node]:
+        try:
+            if using == "css selector":
+                return select(context, value)
+            if using == "xpath":
+                return xpath(context, value)
+            if using == "tag name":
+                return select(context, value)
+            if using in ("link text", "partial link text"):
+                links = select(context, "a")
+                if using == "link text":
+                    return [link for link in links if link.visible_text() == value]
+                return [link for link in links if value in link.visible_text()]
+        except InvalidSelector as error:
+            raise WebDriverError("invalid selector", str(error), 400)
+        raise WebDriverError("invalid argument", f"Unsupported locator strategy: {using}", 400)
+
+    def wrap(self, value):
+        if isinstance(value, Node):
+            return self.reference(value)
+        if isinstance(value, (list, tuple)):
+            return [self.wrap(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.wrap(item) for key, item in value.items()}
+        return value
+
+    def unwrap(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return self.element(value[ELEMENT_KEY])
+            return {key: self.unwrap(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.unwrap(item) for item in value]
+        return value
+
+
+def attribute(node: Node, name: str) -> Optional[str]:
+    """
+    Mirrors selenium's getAttribute atom: boolean attributes read as 'true' or None and form values are live
+    """
+    if name in BOOLEAN_ATTRIBUTES:
+        return "true" if name in node.attributes else None
+    if name == "value" and node.tag == "textarea":
+        return node.attributes.get("value", node.text_content())
+    return node.attributes.get(name)
+
+
+def _read_elements(session: Session, elements: List[Node], reads: List[list]):
+    def read(node, operation):
+        if operation[0] == "text":
+            return node.visible_text()
+        if operation[0] == "visible":
+            return node.displayed()
+        return attribute(node, operation[1])
+
+    return [[read(node, operation) for node in elements] for operation in reads]
+
+
+def _clear_storage(session: Session):
+    for entries in session.storage().values():
+        entries.clear()
+
+
+def _capture_storage(session: Session):
+    return {area: dict(entries) for area, entries in session.storage().items()}
+
+
+def _restore_storage(session: Session, local: dict, session_storage: dict):
+    session.storage()["local"].update(local)
+    session.storage()["session"].update(session_storage)
+
+
+class FakeWebDriverServer:
+    """
+    An in process stand in for a W3C WebDriver endpoint backed by an in memory DOM, so the driver lifecycle can be
+    exercised without a browser; point the remote factory at it with --remote --server=<url> --server_port=<port>
+    or use --fake-webdriver
+    n.b -> no javascript is run: only the scripts registered with register_script are answered, anything else fails
+    with 'unsupported operation' (PyleniumWait's observer mode falls back to polling)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.sessions: Dict[str, Session] = {}
+        self.pages: Dict[str, str] = {}
+        self.sessions_created = 0
+        self._scripts: Dict[str, Callable] = {
+            _selenium_atom("getAttribute.js"): lambda session, node, name: attribute(node, name),
+            _selenium_atom("isDisplayed.js"): lambda session, node: node.displayed(),
+            CLEAR_WEB_STORAGE: _clear_storage,
+            CAPTURE_WEB_STORAGE: _capture_storage,
+            RESTORE_WEB_STORAGE: _restore_storage,
+            READ_ELEMENTS: _read_elements,
+            "return document.readyState": lambda session: "complete",
+            "return document.readyState;": lambda session: "complete",
+            PAGE_READY: lambda session, states, quiet_period: "complete" in states,
+            NETWORK_IDLE: lambda session, quiet_period: True,
+            TRACK_NETWORK: lambda session: None,
+        }
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeWebDriverServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="pylenium-fake-webdriver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeWebDriverServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def add_page(self, url: str, html: str):
+        """
+        Serves html for url without touching the network
+        """
+        self.pages[url] = html
+
+    def register_script(self, script: str, handler: Callable):
+        """
+        Answers execute_script(script, *args) with handler(session, *args); elements arrive as dom nodes
+        """
+        self._scripts[script] = handler
+
+    def load(self, url: str) -> str:
+        if url in self.pages:
+            return self.pages[url]
+        if url == BLANK:
+            return ""
+        if url.startswith("data:"):
+            header, _, data = url[5:].partition(",")
+            return unquote_to_bytes(data).decode() if ";base64" not in header else base64.b64decode(data).decode()
+        try:
+            with urlopen(url, timeout=10) as response:
+                return response.read().decode(response.headers.get_content_charset() or "utf-8", "replace")
+        except (OSError, ValueError) as error:
+            raise WebDriverError("unknown error", f"Reached error page: {url}: {error}", 500)
+
+    def dispatch(self, method: str, path: str, body: dict):
+        path = re.sub(r"^/wd/hub", "", path.rstrip("/")) or "/"
+        for route_method, pattern, handler in _ROUTES:
+            match = pattern.fullmatch(path)
+            if match and route_method == method:
+                arguments = match.groupdict()
+                if "session" not in arguments:
+                    return handler(self, body, **arguments)
+                session = self.sessions.get(arguments.pop("session"))
+                if session is None:
+                    raise WebDriverError("invalid session id", "No active session with that id")
+                with session.lock:
+                    return handler(self, session, body, **arguments)
+        raise WebDriverError("unknown command", f"{method} {path}")
+
+    # commands
+    def status(self, body):
+        # no nodes are reported, an empty list would read as a grid 4 hub without a free slot
+        return {"ready": True, "message": "pylenium fake webdriver"}
+
+    def new_session(self, body):
+        requested = body.get("capabilities", {}).get("alwaysMatch") or body.get("desiredCapabilities") or {}
+        capabilities = {
+            "browserName": requested.get("browserName", "fake"),
+            "browserVersion": "1.0",
+            "platformName": "any",
+            "acceptInsecureCerts": False,
+            "pageLoadStrategy": requested.get("pageLoadStrategy", "normal"),
+        }
+        session = Session(self, capabilities)
+        with self._lock:
+            self.sessions[session.id] = session
+            self.sessions_created += 1
+        return {"sessionId": session.id, "capabilities": capabilities}
+
+    def delete_session(self, session, body):
+        with self._lock:
+            self.sessions.pop(session.id, None)
+
+    def execute_script(self, session, body):
+        handler = self._scripts.get(body.get("script", "").strip()) or self._scripts.get(body.get("script", ""))
+        if handler is None:
+            raise WebDriverError("unsupported operation", "The fake webdriver does not run arbitrary javascript", 500)
+        return session.wrap(handler(session, *session.unwrap(body.get("args", []))))
+
+    def execute_async_script(self, session, body):
+        return self.execute_script(session, body)
+
+
+def _url(server, session, body):
+    if "url" in body:
+        return session.navigate(body["url"])
+    return session.window.url
+
+
+def _history(step):
+    def move(server, session, body):
+        window = session.window
+        position = min(max(window.position + step, 0), len(window.history) - 1)
+        if step == 0 or position != window.position:
+            window.position = position
+            session.navigate(window.history[position], record=False)
+
+    return move
+
+
+def _find(multiple):
+    def find(server, session, body, element=None):
+        context = session.element(element) if element else session.window.document
+        found = session.locate(context, body.get("using"), body.get("value"))
+        if multiple:
+            return session.wrap(found)
+        if not found:
+            raise WebDriverError("no such element", f"Unable to locate element: {body.get('value')}")
+        return session.wrap(found[0])
+
+    return find
+
+
+def _element(read):
+    def handler(server, session, body, element, **arguments):
+        return read(session, session.element(element), body, **arguments)
+
+    return handler
+
+
+def _click(session, node, body):
+    if not node.displayed():
+        raise WebDriverError("element not interactable", "Element is not displayed", 400)
+    if node.tag == "input" and node.attributes.get("type") in ("checkbox", "radio"):
+        if "checked" in node.attributes and node.attributes.get("type") == "checkbox":
+            del node.attributes["checked"]
+        else:
+            node.attributes["checked"] = ""
+    link = node if node.tag == "a" else None
+    while link is None and node.parent is not None:
+        node = node.parent
+        link = node if node.tag == "a" else None
+    if link is not None and link.attributes.get("href"):
+        session.navigate(link.attributes["href"])
+
+
+def _send_keys(session, node, body):
+    if not node.enabled():
+        raise WebDriverError("element not interactable", "Element is disabled", 400)
+    node.attributes["value"] = node.attributes.get("value", "") + body.get("text", "")
+
+
+def _clear(session, node, body):
+    node.attributes["value"] = ""
+
+
+def _property(session, node, body, name):
+    if name in BOOLEAN_ATTRIBUTES:
+        return name in node.attributes
+    if name in ("textContent", "innerText"):
+        return node.text_content() if name == "textContent" else node.visible_text()
+    if name == "innerHTML":
+        return node.inner_html()
+    if name == "outerHTML":
+        return node.outer_html()
+    return node.attributes.get(name)
+
+
+def _title(server, session, body):
+    title = session.window.document.find(lambda node: node.tag == "title")
+    return title.text_content().strip() if title else ""
+
+
+def _window(server, session, body):
+    return session.window.handle
+
+
+def _switch_window(server, session, body):
+    handle = body.get("handle") or body.get("name")
+    if handle not in session.windows:
+        raise WebDriverError("no such window", f"No window with handle {handle}")
+    session.window = session.windows[handle]
+
+
+def _close_window(server, session, body):
+    session.windows.pop(session.window.handle, None)
+    return list(session.windows)
+
+
+def _new_window(server, session, body):
+    return {"handle": session.open_window().handle, "type": "tab"}
+
+
+def _cookies(server, session, body, name=None):
+    if name:
+        if name not in session.cookies:
+            raise WebDriverError("no such cookie", f"No cookie named {name}")
+        return session.cookies[name]
+    return list(session.cookies.values())
+
+
+def _add_cookie(server, session, body):
+    cookie = body.get("cookie", {})
+    session.cookies[cookie.get("name")] = cookie
+
+
+def _delete_cookies(server, session, body, name=None):
+    if name:
+        session.cookies.pop(name, None)
+    else:
+        session.cookies.clear()
+
+
+def _timeouts(server, session, body):
+    if body:
+        session.timeouts.update({key: value for key, value in body.items() if key in session.timeouts})
+    return session.timeouts
+
+
+def _rect(server, session, body):
+    return {"x": 0, "y": 0, "width": body.get("width") or 1366, "height": body.get("height") or 768}
+
+
+def _route(method: str, path: str, handler: Callable):
+    pattern = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path)
+    return method, re.compile(pattern), handler
+
+
+def _ignore(server, session, body, **arguments):
+    return None
+
+
+_ROUTES = [
+    _route("GET", "/status", FakeWebDriverServer.status),
+    _route("POST", "/session", FakeWebDriverServer.new_session),
+    _route("DELETE", "/session/{session}", FakeWebDriverServer.delete_session),
+    _route("POST", "/session/{session}/timeouts", _timeouts),
+    _route("GET", "/session/{session}/timeouts", _timeouts),
+    _route("POST", "/session/{session}/url", _url),
+    _route("GET", "/session/{session}/url", _url),
+    _route("POST", "/session/{session}/back", _history(-1)),
+    _route("POST", "/session/{session}/forward", _history(1)),
+    _route("POST", "/session/{session}/refresh", _history(0)),
+    _route("GET", "/session/{session}/title", _title),
+    _route("GET", "/session/{session}/source", lambda server, session, body: session.window.document.outer_html()),
+    _route("GET", "/session/{session}/window", _window),
+    _route("POST", "/session/{session}/window", _switch_window),
+    _route("DELETE", "/session/{session}/window", _close_window),
+    _route("POST", "/session/{session}/window/new", _new_window),
+    _route("GET", "/session/{session}/window/handles", lambda server, session, body: list(session.windows)),
+    _route("GET", "/session/{session}/window/rect", _rect),
+    _route("POST", "/session/{session}/window/rect", _rect),
+    _route("POST", "/session/{session}/window/maximize", _rect),
+    _route("POST", "/session/{session}/window/minimize", _rect),
+    _route("POST", "/session/{session}/window/fullscreen", _rect),
+    _route("POST", "/session/{session}/element", _find(False)),
+    _route("POST", "/session/{session}/elements", _find(True)),
+    _route("POST", "/session/{session}/element/{element}/element", _find(False)),
+    _route("POST", "/session/{session}/element/{element}/elements", _find(True)),
+    _route("GET", "/session/{session}/element/active", lambda server, session, body: session.wrap(
+        session.window.document.find(lambda node: node.tag == "body"))),
+    _route("GET", "/session/{session}/element/{element}/text", _element(lambda session, node, body: node.visible_text())),
+    _route("GET", "/session/{session}/element/{element}/name", _element(lambda session, node, body: node.tag)),
+    _route("GET", "/session/{session}/element/{element}/enabled", _element(lambda session, node, body: node.enabled())),
+    _route("GET", "/session/{session}/element/{element}/selected", _element(
+        lambda session, node, body: "checked" in node.attributes or "selected" in node.attributes)),
+    _route("GET", "/session/{session}/element/{element}/displayed", _element(
+        lambda session, node, body: node.displayed())),
+    _route("GET", "/session/{session}/element/{element}/attribute/{name}", _element(
+        lambda session, node, body, name: attribute(node, name))),
+    _route("GET", "/session/{session}/element/{element}/property/{name}", _element(_property)),
+    _route("GET", "/session/{session}/element/{element}/css/{name}", _element(lambda session, node, body, name: "")),
+    _route("GET", "/session/{session}/element/{element}/rect", _element(
+        lambda session, node, body: {"x": 0, "y": 0, "width": 100, "height": 20})),
+    _route("POST", "/session/{session}/element/{element}/click", _element(_click)),
+    _route("POST", "/session/{session}/element/{element}/value", _element(_send_keys)),
+    _route("POST", "/session/{session}/element/{element}/clear", _element(_clear)),
+    _route("GET", "/session/{session}/element/{element}/screenshot", _element(lambda session, node, body: SCREENSHOT)),
+    _route("POST", "/session/{session}/execute/sync", FakeWebDriverServer.execute_script),
+    _route("POST", "/session/{session}/execute/async", FakeWebDriverServer.execute_async_script),
+    _route("GET", "/session/{session}/cookie", _cookies),
+    _route("GET", "/session/{session}/cookie/{name}", _cookies),
+    _route("POST", "/session/{session}/cookie", _add_cookie),
+    _route("DELETE", "/session/{session}/cookie", _delete_cookies),
+    _route("DELETE", "/session/{session}/cookie/{name}", _delete_cookies),
+    _route("GET", "/session/{session}/screenshot", lambda server, session, body: SCREENSHOT),
+    _route("POST", "/session/{session}/log", lambda server, session, body: []),
+    _route("POST", "/session/{session}/se/log", lambda server, session, body: []),
+    _route("POST", "/session/{session}/goog/cdp/execute", lambda server, session, body: {}),
+    _route("POST", "/session/{session}/actions", _ignore),
+    _route("DELETE", "/session/{session}/actions", _ignore),
+]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, without this keep alive responses stall on delayed acks
+    disable_nagle_algorithm = True
+
+    def _respond(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            status, payload = 200, {"value": self.server.fake.dispatch(method, unquote(self.path), body)}
+        except WebDriverError as error:
+            status, payload = error.status, {
+                "value": {"error": error.error, "message": str(error), "stacktrace": ""}
+            }
+        except ValueError as error:
+            status, payload = 400, {"value": {"error": "invalid argument", "message": str(error), "stacktrace": ""}}
+        except Exception as error:
+            status, payload = 500, {"value": {"error": "unknown error", "message": repr(error), "stacktrace": ""}}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def do_DELETE(self):
+        self._respond("DELETE")
+
+    def log_message(self, *args):
+        pass
@@ -15,11 +15,35 @@
 #  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
 #  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
-from loguru import logger
-
-log = logger
-info = logger.info
-warning = logger.warning
-error = logger.error
-critical = logger.critical
-debug = logger.debug
+class _LazyLogger:
+    """
+    Stands in for the loguru logger, which is only imported the first time something is actually logged
+    """
+
+    def __getattr__(self, name):
+        from loguru import logger
+
+        return getattr(logger, name)
+
+
+log = _LazyLogger()
+
+
+def info(*args, **kwargs):
+    log.info(*args, **kwargs)
+
+
+def warning(*args, **kwargs):
+    log.warning(*args, **kwargs)
+
+
+def error(*args, **kwargs):
+    log.error(*args, **kwargs)
+
+
+def critical(*args, **kwargs):
+    log.critical(*args, **kwargs)
+
+
+def debug(*args, **kwargs):
+    log.debug(*args, **kwargs)
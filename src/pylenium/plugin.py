@@ -1,18 +1,14 @@
 from __future__ import annotations
 
-import threading
-from abc import ABC, abstractmethod
-from functools import partial
+import inspect
+from typing import TYPE_CHECKING
 
 import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
+from selenium.common.exceptions import WebDriverException
 
 from pylenium.ascii.ascii import ASCII
 from pylenium.configuration.pylenium_config import PyleniumConfig
-from pylenium.exceptions.custom_exceptions import PyleniumArgumentException, PyleniumCommandLineArgException
+from pylenium.exceptions.custom_exceptions import PyleniumCommandLineArgException
 from pylenium.logging.log import log
 from pylenium.strategies.page_loading_strategy import (
     SlowLoadingPageStrategy,
@@ -25,15 +21,39 @@ from pylenium.constants.string_globals import (
     EXEC_STARTED,
     RELEASE_INFO,
     GRATITUDE_MSG,
-    REMOTE,
-    FIREFOX,
+    DRIVER_REUSE_TEST,
+    DRIVER_REUSE_SESSION,
+    WAIT_MODE_POLL,
+    WAIT_MODE_OBSERVER,
+    ASYNC_PLUGIN_MARKERS,
 )
-from pylenium.utilities.plugin_utility import plugin_log_seperate, plugin_log_message
-from pylenium.driver.pylenium_driver import PyleniumDriver
-from pylenium.elements.pylenium_element import PyleniumElement
+from pylenium.driver.driver_manager import ThreadLocalDriverManager
+from pylenium.driver.process_reaper import ProcessReaper, worker_pid_file
+from pylenium.driver.session_snapshot import SessionStore
+from pylenium.reporting.artifacts import ArtifactWriter, artifact_name
+from pylenium.reporting.command_timings import CommandTimingRecorder
+from pylenium.utilities.plugin_utility import (
+    plugin_log_seperate,
+    plugin_log_message,
+    is_master_process,
+    is_xdist_controller,
+)
+from pylenium.utilities.thread_runner import ThreadRunner, serialised
+
+# Anything importing selenium.webdriver, webdriver_manager, yaml or loguru is deferred until a driver or config
+# actually needs it, so collecting tests which never use a browser does not pay for them
+if TYPE_CHECKING:
+    from pylenium.elements.pylenium_element import PyleniumElement
+    from pylenium.elements.pylenium_elements import PyleniumElements
 
 thread_local_drivers = None
 configuration = None
+artifact_writer = None
+command_recorder = None
+fake_webdriver_server = None
+session_snapshots = None
+caching_proxy_server = None
+thread_runner = None
 
 
 def pytest_addoption(parser):
@@ -69,7 +89,7 @@ def pytest_addoption(parser):
         action="store",
         dest="server",
         default="http://localhost",
-        help="Specify the selenium hub server url",
+        help="Specify the selenium hub server url, or a comma separated list of hubs to balance sessions over",
     )
 
     group.addoption(
@@ -81,6 +101,68 @@ def pytest_addoption(parser):
         help="Specify the selenium hub port",
     )
 
+    group.addoption(
+        "--remote-pool-size",
+        action="store",
+        type=int,
+        default=10,
+        dest="remote_pool_size",
+        help="How many keep-alive connections to the selenium hub each worker keeps open",
+    )
+
+    group.addoption(
+        "--no-remote-keep-alive",
+        action="store_false",
+        default=True,
+        dest="remote_keep_alive",
+        help="Open a new connection to the selenium hub for every command instead of sharing a keep-alive pool",
+    )
+
+    group.addoption(
+        "--remote-connect-timeout",
+        action="store",
+        type=float,
+        default=10.0,
+        dest="remote_connect_timeout",
+        help="Seconds to wait when connecting to the selenium hub",
+    )
+
+    group.addoption(
+        "--remote-read-timeout",
+        action="store",
+        type=float,
+        default=300.0,
+        dest="remote_read_timeout",
+        help="Seconds to wait for the selenium hub to answer a command",
+    )
+
+    group.addoption(
+        "--remote-retries",
+        action="store",
+        type=int,
+        default=2,
+        dest="remote_retries",
+        help="How many times a failed connection to the selenium hub is retried",
+    )
+
+    group.addoption(
+        "--grid-status-ttl",
+        action="store",
+        type=float,
+        default=2.0,
+        dest="grid_status_ttl",
+        help="Seconds a selenium hub's reported load is trusted before it is polled again",
+    )
+
+    group.addoption(
+        "--grid-queue-timeout",
+        action="store",
+        type=float,
+        default=300.0,
+        dest="grid_queue_timeout",
+        help="Seconds a new session waits for a free slot when every selenium hub is saturated",
+    )
+
     group.addoption(
         "--browser-resolution",
         action="store",
@@ -133,7 +215,18 @@ def pytest_addoption(parser):
             NormalLoadingPageStrategy,
             FastLoadingPageStrategy,
         ],
-        help="Specify the page loading strategy",
+        help="Specify the page loading strategy: slow (load event and a quiet network), normal (load event) or fast "
+        "(DOM ready, the browser loads pages eagerly)",
+    )
+
+    group.addoption(
+        "--network-quiet-period",
+        action="store",
+        type=float,
+        default=0.5,
+        dest="network_quiet_period",
+        help="Seconds without a fetch / XMLHttpRequest in flight before the network counts as idle, used by "
+        "wait_for_network_idle and the slow page load strategy",
     )
 
     group.addoption(
@@ -169,6 +262,34 @@ def pytest_addoption(parser):
         help="Specify how long pylenium should poll during explicit waiting conditions",
     )
 
+    group.addoption(
+        "--polling-strategy",
+        action="store",
+        default="fixed",
+        dest="polling_strategy",
+        choices=["fixed", "backoff"],
+        help="Poll explicit waits at a fixed --polling-interval or back off exponentially up to --polling-max-interval",
+    )
+
+    group.addoption(
+        "--polling-max-interval",
+        action="store",
+        type=float,
+        default=1.0,
+        dest="polling_max_interval",
+        help="The longest pylenium should sleep between polls when using --polling-strategy=backoff",
+    )
+
+    group.addoption(
+        "--wait-mode",
+        action="store",
+        default=WAIT_MODE_POLL,
+        dest="wait_mode",
+        choices=[WAIT_MODE_POLL, WAIT_MODE_OBSERVER],
+        help="Wait for elements by polling the driver or with a single in page MutationObserver script, only "
+        "driver.wait.until_located waits use the observer, find / find_all look elements up once without waiting",
+    )
+
     group.addoption(
         "--page-source-on-fail",
         action="store_true",
@@ -193,6 +314,48 @@ def pytest_addoption(parser):
         help="Store stack trace info for each test in the event of failures",
     )
 
+    group.addoption(
+        "--artifacts-dir",
+        action="store",
+        default="pylenium-artifacts",
+        dest="artifacts_dir",
+        help="Directory failure artifacts (screenshot, page source, stack trace) are written to",
+    )
+
+    group.addoption(
+        "--artifact-compression",
+        action="store",
+        default="gzip",
+        dest="artifact_compression",
+        choices=["gzip", "zstd", "none"],
+        help="How failure artifacts are compressed on disk, zstd requires the zstandard package",
+    )
+
+    group.addoption(
+        "--artifact-max-mb",
+        action="store",
+        type=int,
+        default=512,
+        dest="artifact_max_mb",
+        help="The most failure artifacts may take up on disk in a single session, later artifacts are dropped",
+    )
+
+    group.addoption(
+        "--command-timings",
+        action="store_true",
+        default=False,
+        dest="command_timings",
+        help="Time every WebDriver command and report percentiles per command at the end of the run",
+    )
+
+    group.addoption(
+        "--command-timings-json",
+        action="store",
+        default=None,
+        dest="command_timings_json",
+        help="Also write the command timings report to this json file (implies --command-timings)",
+    )
+
     group.addoption(
         "--click-with-js",
         action="store_true",
@@ -242,10 +405,332 @@ def pytest_addoption(parser):
         default=[]
     )
 
+    group.addoption(
+        "--block-urls",
+        type=lambda option: [pattern for pattern in option.strip().split(",") if pattern],
+        dest="block_urls",
+        help="delimited list of url patterns (* is a wildcard) the browser should never request, e.g analytics",
+        default=[]
+    )
+
+    group.addoption(
+        "--caching-proxy",
+        action="store_true",
+        default=False,
+        dest="caching_proxy",
+        help="Send local browsers through a proxy which caches static assets on disk for every browser and worker",
+    )
+
+    group.addoption(
+        "--proxy-cache-dir",
+        action="store",
+        default="~/.pylenium/proxy-cache",
+        dest="proxy_cache_dir",
+        help="Directory the caching proxy keeps its assets in, shared by workers and runs",
+    )
+
+    group.addoption(
+        "--driver-reuse",
+        action="store",
+        default=DRIVER_REUSE_TEST,
+        dest="driver_reuse",
+        choices=[DRIVER_REUSE_TEST, DRIVER_REUSE_SESSION],
+        help="Quit the driver after every test (test) or keep it alive and reset it between tests (session)",
+    )
+
+    group.addoption(
+        "--driver-max-tests",
+        action="store",
+        type=int,
+        default=0,
+        dest="driver_max_tests",
+        help="With --driver-reuse=session, replace a driver once it has run this many tests (0 never)",
+    )
+
+    group.addoption(
+        "--driver-max-age",
+        action="store",
+        type=float,
+        default=0.0,
+        dest="driver_max_age",
+        help="With --driver-reuse=session, replace a driver once it has been running for this many seconds (0 never)",
+    )
+
+    group.addoption(
+        "--driver-max-memory",
+        action="store",
+        type=float,
+        default=0.0,
+        dest="driver_max_memory",
+        help="With --driver-reuse=session, replace a driver once its browser uses this many megabytes (0 never)",
+    )
+
+    group.addoption(
+        "--driver-liveness-timeout",
+        action="store",
+        type=float,
+        default=0.0,
+        dest="driver_liveness_timeout",
+        help="Seconds a reused driver has to answer a liveness probe between tests before it is replaced (0 is off)",
+    )
+
+    group.addoption(
+        "--prewarm-drivers",
+        action="store",
+        type=int,
+        default=0,
+        dest="prewarm_drivers",
+        help="Number of drivers to start in the background while tests are being collected",
+    )
+
+    group.addoption(
+        "--contexts-per-browser",
+        action="store",
+        type=int,
+        default=1,
+        dest="contexts_per_browser",
+        help="Number of tests which may share one browser at once, each running in its own window",
+    )
+
+    group.addoption(
+        "--pylenium-threads",
+        action="store",
+        type=int,
+        default=1,
+        dest="pylenium_threads",
+        help="Number of threads to run tests on within a single process, an alternative to xdist's processes",
+    )
+
+    group.addoption(
+        "--session-snapshot-ttl",
+        action="store",
+        type=float,
+        default=900.0,
+        dest="session_snapshot_ttl",
+        help="Seconds a login captured by the login_as fixture is restored into new drivers before logging in again",
+    )
+
+    group.addoption(
+        "--fake-webdriver",
+        action="store_true",
+        default=False,
+        dest="fake_webdriver",
+        help="Run against pyleniums in process fake webdriver server instead of a real browser",
+    )
+
 
 def pytest_configure(config):
     _resolve_config_from_parseargs(config)
+    _start_fake_webdriver()
+    _start_caching_proxy(config)
+    _init_command_recorder()
+    _reap_orphaned_processes()
     _init_thread_local_drivers()
+    _init_artifact_writer()
+    _init_session_snapshots()
+    _prewarm_drivers(config)
+
+
+def pytest_unconfigure(config):
+    global artifact_writer, fake_webdriver_server, caching_proxy_server
+    if thread_local_drivers is not None:
+        thread_local_drivers.shutdown()
+    if fake_webdriver_server is not None:
+        fake_webdriver_server.stop()
+        fake_webdriver_server = None
+    if caching_proxy_server is not None:
+        caching_proxy_server.stop()
+        caching_proxy_server = None
+    if artifact_writer is not None:
+        artifact_writer.close()
+        artifact_writer = None
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    global thread_runner
+    if not _runs_on_threads(session):
+        return None
+    thread_runner = ThreadRunner(session, configuration.pylenium_threads)
+    try:
+        thread_runner.run()
+    finally:
+        thread_runner = None
+    return True
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    """
+    Runs async def tests which use the async driver fixtures on an event loop of their own, unless an async
+    plugin (pytest-asyncio, anyio, trio) has been asked to run them
+    """
+    pool = pyfuncitem.funcargs.get("async_drivers")
+    if pool is None or not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    if any(pyfuncitem.get_closest_marker(name) for name in ASYNC_PLUGIN_MARKERS):
+        return None
+    import asyncio
+
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(_run_async_test(pyfuncitem.obj, arguments, pool))
+    return True
+
+
+async def _run_async_test(test, arguments, pool):
+    # the sessions are quit on the loop their connections belong to, rather than by the fixture afterwards
+    try:
+        await test(**arguments)
+    finally:
+        await pool.quit_all()
+
+
+@pytest.hookimpl(hookwrapper=True, tryfirst=True)
+def pytest_runtest_logstart(nodeid, location):
+    with serialised(thread_runner, "report_lock"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True, tryfirst=True)
+def pytest_runtest_logreport(report):
+    with serialised(thread_runner, "report_lock"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True, tryfirst=True)
+def pytest_runtest_logfinish(nodeid, location):
+    with serialised(thread_runner, "report_lock"):
+        yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    if command_recorder is not None:
+        command_recorder.start_test(item.nodeid)
+    yield
+    if command_recorder is not None:
+        command_recorder.finish_test()
+
+
+def pytest_sessionfinish(session):
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if command_recorder is not None and workeroutput is not None:
+        workeroutput["pylenium_command_timings"] = command_recorder.to_dict()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    if configuration.proxy_address:
+        node.workerinput["pylenium_proxy"] = configuration.proxy_address
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    if error:
+        ProcessReaper.reap_orphans()
+    if command_recorder is not None:
+        command_recorder.merge(getattr(node, "workeroutput", {}).get("pylenium_command_timings", {}))
+
+
+def pytest_terminal_summary(terminalreporter):
+    if hasattr(terminalreporter.config, "workerinput"):
+        return
+    _write_blocked_requests(terminalreporter)
+    _write_caching_proxy(terminalreporter)
+    _write_command_timings(terminalreporter)
+
+
+def _write_caching_proxy(terminalreporter):
+    if caching_proxy_server is None:
+        return
+    statistics = caching_proxy_server.statistics
+    terminalreporter.write_sep("=", "pylenium caching proxy")
+    terminalreporter.write_line(
+        f"{statistics.hits} hits ({statistics.revalidated} revalidated), {statistics.misses} misses, "
+        f"{statistics.bytes_from_cache / (1024 * 1024):.1f} MB served from cache"
+    )
+
+
+def _write_blocked_requests(terminalreporter):
+    blocked = [
+        value
+        for reports in terminalreporter.stats.values()
+        for report in reports
+        if getattr(report, "when", None) == "call"
+        for name, value in getattr(report, "user_properties", ())
+        if name == "pylenium_blocked_requests"
+    ]
+    if blocked:
+        terminalreporter.write_sep("=", "pylenium request blocking")
+        terminalreporter.write_line(f"{sum(blocked)} requests blocked across {len(blocked)} tests")
+
+
+def _write_command_timings(terminalreporter):
+    if command_recorder is None or not command_recorder:
+        return
+    terminalreporter.write_sep("=", "pylenium command timings")
+    for line in command_recorder.report_lines():
+        terminalreporter.write_line(line)
+    if configuration.command_timings_json:
+        command_recorder.write_json(configuration.command_timings_json)
+        terminalreporter.write_line(f"command timings written to {configuration.command_timings_json}")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call" and configuration.block_urls:
+        _record_blocked_requests(item, report)
+    if report.when == "call" and report.failed and artifact_writer is not None:
+        _capture_failure_artifacts(item, report)
+
+
+def _record_blocked_requests(item, report):
+    """
+    Attaches how many --block-urls requests the test's browser blocked to its report, as pylenium_blocked_requests
+    """
+    driver = thread_local_drivers.peek_driver()
+    if driver is None:
+        return
+    try:
+        blocked = driver.blocked_requests()
+    except WebDriverException as exc:
+        log.warning(f"Unable to count blocked requests for {item.nodeid}: {exc}")
+        return
+    if blocked is not None:
+        item.user_properties.append(("pylenium_blocked_requests", blocked))
+        report.user_properties.append(("pylenium_blocked_requests", blocked))
+
+
+def _capture_failure_artifacts(item, report):
+    """
+    Grabs the raw failure artifacts from the driver coupled to this thread (if the test used one) and hands them
+    to the background artifact writer, so the test does not wait on encoding, compression or disk writes
+    n.b -> the paths are attached to the failing report as pylenium_artifact, dropped artifacts are left out
+    """
+    paths = []
+    if configuration.stack_trace_on_fail:
+        paths.append(artifact_writer.submit(artifact_name(item.nodeid, ".txt"), report.longreprtext))
+    driver = thread_local_drivers.peek_driver()
+    if driver is not None:
+        try:
+            if configuration.screenshot_on_fail:
+                paths.append(
+                    artifact_writer.submit(
+                        artifact_name(item.nodeid, ".png"),
+                        driver.browser.get_screenshot_as_base64(),
+                        base64_encoded=True,
+                        compress=False,
+                    )
+                )
+            if configuration.page_source_on_fail:
+                paths.append(artifact_writer.submit(artifact_name(item.nodeid, ".html"), driver.browser.page_source))
+        except WebDriverException as exc:
+            log.warning(f"Unable to capture failure artifacts for {item.nodeid}: {exc}")
+    for path in filter(None, paths):
+        item.user_properties.append(("pylenium_artifact", path))
+        report.user_properties.append(("pylenium_artifact", path))
 
 
 def _resolve_config_from_parseargs(config):
@@ -257,9 +742,90 @@ def _resolve_config_from_parseargs(config):
     configuration = PyleniumConfig(config)
 
 
+def _start_fake_webdriver():
+    """
+    Starts the in process fake webdriver server and points the remote driver factory at it
+    """
+    global fake_webdriver_server
+    if not configuration.fake_webdriver:
+        return
+    from pylenium.fake_webdriver.server import FakeWebDriverServer
+
+    fake_webdriver_server = FakeWebDriverServer().start()
+    configuration.remote = True
+    configuration.server = f"http://{fake_webdriver_server.host}"
+    configuration.server_port = fake_webdriver_server.port
+
+
+def _start_caching_proxy(config):
+    """
+    Starts the caching proxy once per run: xdist workers use the controller's proxy, so every browser shares
+    one set of downloads
+    """
+    global caching_proxy_server
+    if not configuration.caching_proxy:
+        return
+    shared = getattr(config, "workerinput", {}).get("pylenium_proxy")
+    if shared:
+        configuration.proxy_address = shared
+        return
+    from pylenium.proxy.caching_proxy import CachingProxy
+
+    caching_proxy_server = CachingProxy(configuration.proxy_cache_dir).start()
+    configuration.proxy_address = caching_proxy_server.address
+
+
 def _init_thread_local_drivers():
     global thread_local_drivers
-    thread_local_drivers = ThreadLocalDriverManager(configuration)
+    thread_local_drivers = ThreadLocalDriverManager(configuration, command_recorder, ProcessReaper(worker_pid_file()))
+
+
+def _reap_orphaned_processes():
+    """
+    Kills browsers and drivers left running by earlier sessions whose worker crashed before it could quit them
+    """
+    if is_master_process():
+        ProcessReaper.reap_orphans()
+
+
+def _init_command_recorder():
+    global command_recorder
+    command_recorder = CommandTimingRecorder() if configuration.command_timings else None
+
+
+def _init_artifact_writer():
+    global artifact_writer
+    if configuration.screenshot_on_fail or configuration.page_source_on_fail or configuration.stack_trace_on_fail:
+        artifact_writer = ArtifactWriter(
+            configuration.artifacts_dir, configuration.artifact_compression, configuration.artifact_max_bytes
+        )
+
+
+def _init_session_snapshots():
+    global session_snapshots
+    session_snapshots = SessionStore(configuration.session_snapshot_ttl)
+
+
+def _prewarm_drivers(config):
+    """
+    Starts launching browsers in the background so they are ready by the time collection has finished
+    n.b -> the xdist controller never runs tests, so only the workers pre-warm
+    """
+    if not configuration.prewarm_drivers or config.option.collectonly or is_xdist_controller(config):
+        return
+    thread_local_drivers.prewarm(configuration.prewarm_drivers)
+
+
+def _runs_on_threads(session) -> bool:
+    """
+    Tests only run on threads when asked to, with something to run and outside of xdist which runs its own loop
+    """
+    config = session.config
+    if configuration is None or configuration.pylenium_threads <= 1 or config.option.collectonly:
+        return False
+    if session.testsfailed and not config.option.continue_on_collection_errors:
+        return False
+    return not (hasattr(config, "workerinput") or is_xdist_controller(config))
 
 
 def _configure_metadata():
@@ -283,12 +849,12 @@ def get_configuration():
     return configuration
 
 
-def find(locator):
-    pass
+def find(locator, by=None) -> PyleniumElement:
+    return get_webdriver().find(locator, by)
 
 
-def find_all(locator):
-    pass
+def find_all(locator, by=None) -> PyleniumElements:
+    return get_webdriver().find_all(locator, by)
 
 
 def XPATH(selector) -> PyleniumElement:
@@ -320,6 +886,41 @@ def server_port(request):
     return request.config.getoption("server_port")
 
 
+@pytest.fixture
+def remote_pool_size(request):
+    return request.config.getoption("remote_pool_size")
+
+
+@pytest.fixture
+def remote_keep_alive(request):
+    return request.config.getoption("remote_keep_alive")
+
+
+@pytest.fixture
+def remote_connect_timeout(request):
+    return request.config.getoption("remote_connect_timeout")
+
+
+@pytest.fixture
+def remote_read_timeout(request):
+    return request.config.getoption("remote_read_timeout")
+
+
+@pytest.fixture
+def remote_retries(request):
+    return request.config.getoption("remote_retries")
+
+
+@pytest.fixture
+def grid_status_ttl(request):
+    return request.config.getoption("grid_status_ttl")
+
+
+@pytest.fixture
+def grid_queue_timeout(request):
+    return request.config.getoption("grid_queue_timeout")
+
+
 @pytest.fixture
 def browser_resolution(request):
     return request.config.getoption("browser_resolution")
@@ -345,6 +946,11 @@ def page_load_strategy(request):
     return request.config.getoption("page_load_strategy")
 
 
+@pytest.fixture
+def network_quiet_period(request):
+    return request.config.getoption("network_quiet_period")
+
+
 @pytest.fixture
 def base_url(request):
     return request.config.getoption("base_url")
@@ -360,6 +966,21 @@ def polling_interval(request):
     return request.config.getoption("polling_interval")
 
 
+@pytest.fixture
+def polling_strategy(request):
+    return request.config.getoption("polling_strategy")
+
+
+@pytest.fixture
+def polling_max_interval(request):
+    return request.config.getoption("polling_max_interval")
+
+
+@pytest.fixture
+def wait_mode(request):
+    return request.config.getoption("wait_mode")
+
+
 @pytest.fixture
 def browser_capabilities_file(request):
     return request.config.getoption("browser_capabilities")
@@ -380,6 +1001,31 @@ def store_stack_trace_on_fail(request):
     return request.config.getoption("store_stack_trace")
 
 
+@pytest.fixture
+def artifacts_dir(request):
+    return request.config.getoption("artifacts_dir")
+
+
+@pytest.fixture
+def artifact_compression(request):
+    return request.config.getoption("artifact_compression")
+
+
+@pytest.fixture
+def artifact_max_mb(request):
+    return request.config.getoption("artifact_max_mb")
+
+
+@pytest.fixture
+def command_timings(request):
+    return request.config.getoption("command_timings")
+
+
+@pytest.fixture
+def command_timings_json(request):
+    return request.config.getoption("command_timings_json")
+
+
 @pytest.fixture
 def click_with_js(request):
     return request.config.getoption("click_with_js")
@@ -415,6 +1061,74 @@ def chrome_switches(request, browser):
     return chrome_switches
 
 
+@pytest.fixture
+def block_urls(request):
+    return request.config.getoption("block_urls")
+
+
+@pytest.fixture
+def caching_proxy(request):
+    return request.config.getoption("caching_proxy")
+
+
+@pytest.fixture
+def proxy_cache_dir(request):
+    return request.config.getoption("proxy_cache_dir")
+
+
+@pytest.fixture
+def driver_reuse(request):
+    return request.config.getoption("driver_reuse")
+
+
+@pytest.fixture
+def driver_max_tests(request):
+    return request.config.getoption("driver_max_tests")
+
+
+@pytest.fixture
+def driver_max_age(request):
+    return request.config.getoption("driver_max_age")
+
+
+@pytest.fixture
+def driver_max_memory(request):
+    return request.config.getoption("driver_max_memory")
+
+
+@pytest.fixture
+def driver_liveness_timeout(request):
+    return request.config.getoption("driver_liveness_timeout")
+
+
+@pytest.fixture
+def prewarm_drivers(request):
+    return request.config.getoption("prewarm_drivers")
+
+
+@pytest.fixture
+def contexts_per_browser(request):
+    return request.config.getoption("contexts_per_browser")
+
+
+@pytest.fixture
+def pylenium_threads(request):
+    return request.config.getoption("pylenium_threads")
+
+
+@pytest.fixture
+def session_snapshot_ttl(request):
+    return request.config.getoption("session_snapshot_ttl")
+
+
+@pytest.fixture
+def fake_webdriver():
+    """
+    The running fake webdriver server when --fake-webdriver is given, use it to serve pages with add_page
+    """
+    return fake_webdriver_server
+
+
 @pytest.fixture
 def pylenium_config():
     return configuration
@@ -425,100 +1139,43 @@ def driver(pylenium_config):
     return get_webdriver()
 
 
-@pytest.fixture(autouse=True)
-def destroy_drivers(request):
-    def finalizer():
-        driver = thread_local_drivers.threaded_drivers.drivers.pop(threading.get_ident(), None)
-        if driver is not None:
-            driver.quit()
-    request.addfinalizer(finalizer)
-
-
-# Driver management
-class ThreadLocalDriverManager:
-    def __init__(self, config):
-        self.threaded_drivers = threading.local()
-        self.threaded_drivers.drivers = {}
-        self.config = config
-        self.supported_drivers = {
-            CHROME: partial(ChromeDriverFactory().get_driver),
-            FIREFOX: partial(FireFoxDriverFactory().get_driver),
-            REMOTE: partial(RemoteWebDriverFactory().get_driver),
-        }
-
-    def get_driver(self):
-        """
-        Spawns a new thread local driver or returns the already instantiated one if such a driver exists
-        for the given thread
-        :return: an instance of PyleniumDriver
-        """
-        driver = self._resolve_driver_from_config()
-        return driver
-
-    def _resolve_driver_from_config(self) -> PyleniumDriver:
-        thread_id = threading.get_ident()
-        driver = self.threaded_drivers.drivers.get(thread_id, None)
-        if driver:
-            return driver
-
-        runtime_browser = self.config.browser
-
-        if runtime_browser not in self.supported_drivers.keys():
-            raise PyleniumArgumentException(
-                f"Unsupported --browser option, selection was {runtime_browser}"
-            )
-        else:
-            self.threaded_drivers.drivers[thread_id] = self.supported_drivers.get(
-                runtime_browser
-            )()
-            return self.threaded_drivers.drivers.get(thread_id)
-
-
-class AbstractDriverFactory(ABC):
-    @abstractmethod
-    def get_driver(self):
-        pass
-
-    @abstractmethod
-    def resolve_capabilities(self):
-        pass
-
-
-class ChromeDriverFactory(AbstractDriverFactory):
-    def resolve_capabilities(self) -> Options:
-        pylenium_chrome_opts = Options()
-        for switch in configuration.chrome_switches:
-            pylenium_chrome_opts.add_argument(switch)
-        return pylenium_chrome_opts
-
-    def get_driver(self):
-        return PyleniumDriver(
-            configuration,
-            webdriver.Chrome(
-                ChromeDriverManager().install(), options=self.resolve_capabilities()
-            ),
-        )
+@pytest.fixture
+def async_drivers(pylenium_config):
+    """
+    Starts asynchronous drivers against the --server / --server_port hub, every session is quit after the test:
+        async def test_chat(async_drivers):
+            alice, bob = await async_drivers.start(2)
+            await asyncio.gather(alice.get(CHAT_URL), bob.get(CHAT_URL))
+    """
+    from pylenium.driver.async_driver import AsyncDriverPool
 
+    pool = AsyncDriverPool(pylenium_config)
+    yield pool
+    pool.close()
 
-class FireFoxDriverFactory(AbstractDriverFactory):
-    def resolve_capabilities(self) -> Options:
-        pass
 
-    def get_driver(self):
-        return PyleniumDriver(
-            configuration, webdriver.Firefox(GeckoDriverManager().install())
-        )
+@pytest.fixture
+def async_driver(async_drivers):
+    """
+    An AsyncPyleniumDriver, its session is started on the first command it sends
+    """
+    return async_drivers.driver()
 
 
-class RemoteWebDriverFactory(AbstractDriverFactory):
-    def resolve_capabilities(self) -> Options:
-        pass
+@pytest.fixture
+def login_as(driver):
+    """
+    Logs the driver in as a user role, the login steps run once per worker and later tests restore the captured
+    cookies and web storage instead, until --session-snapshot-ttl passes:
+        login_as("admin", lambda driver: LoginPage(driver).login("admin", "secret"))
+    """
 
-    def get_driver(self):
-        return PyleniumDriver(
-            configuration,
-            webdriver.Remote(
-                command_executor=f"{pylenium_config.server}:{pylenium_config.server_port}/wd/hub",
-                desired_capabilities=pylenium_config.browser_capabilities,
-            ),
-        )
+    def _login_as(role: str, login):
+        return session_snapshots.login(role, driver, login)
+
+    return _login_as
+
+
+@pytest.fixture(autouse=True)
+def destroy_drivers(request):
+    request.addfinalizer(thread_local_drivers.release_driver)
@@ -0,0 +1,396 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import hashlib
+import json
+import os
+import re
+import select
+import socket
+import tempfile
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import urllib3
+
+from pylenium.exceptions.custom_exceptions import PyleniumProxyException
+from pylenium.logging.log import log
+
+STATIC_CONTENT_TYPES = ("javascript", "ecmascript", "text/css", "font/", "image/", "application/wasm", "application/font")
+STATIC_EXTENSIONS = re.compile(r"\.(js|mjs|css|woff2?|ttf|otf|eot|png|jpe?g|gif|webp|avif|svg|ico|wasm|map)$", re.I)
+HOP_BY_HOP = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "proxy-connection", "te", "trailers",
+    "transfer-encoding", "upgrade",
+}
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    status: int
+    headers: Dict[str, str]
+    stored_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def fresh(self, now: float = None) -> bool:
+        """
+        Fresh entries are served without asking the origin: immutable assets, or ones still inside their max-age
+        """
+        cache_control = self.headers.get("cache-control", "").lower()
+        if "immutable" in cache_control:
+            return True
+        match = re.search(r"max-age=(\d+)", cache_control)
+        now = time.time() if now is None else now
+        return bool(match) and now - self.stored_at < int(match.group(1))
+
+
+@dataclass
+class ProxyStatistics:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bytes_from_cache: int = 0
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class AssetCache:
+    """
+    Static assets on disk keyed by url, shared by every proxy (every worker, every run) using the same directory;
+    a body and its metadata are written to temporary files and moved into place so readers never see half an entry
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as error:
+            raise PyleniumProxyException(f"Unable to create the proxy cache directory {self.directory}: {error}")
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = os.path.join(self.directory, hashlib.sha256(url.encode("utf-8")).hexdigest())
+        return f"{key}.json", f"{key}.body"
+
+    def get(self, url: str) -> Optional[Tuple[CacheEntry, bytes]]:
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as meta, open(body_path, "rb") as body:
+                entry = CacheEntry(**json.load(meta))
+                content = body.read()
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.url != url or str(len(content)) != entry.headers.get("content-length", str(len(content))):
+            return None
+        return entry, content
+
+    def put(self, entry: CacheEntry, content: bytes):
+        meta_path, body_path = self._paths(entry.url)
+        self._write(body_path, content)
+        self._write(meta_path, json.dumps(entry.__dict__).encode("utf-8"))
+
+    def touch(self, entry: CacheEntry):
+        """
+        Restarts an entry's freshness after the origin confirmed it has not changed
+        """
+        entry.stored_at = time.time()
+        self._write(self._paths(entry.url)[0], json.dumps(entry.__dict__).encode("utf-8"))
+
+    def _write(self, path: str, content: bytes):
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, prefix=".pending-")
+        try:
+            with os.fdopen(descriptor, "wb") as handle:
+                handle.write(content)
+            os.replace(temporary, path)
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+
+def cacheable_request(method: str, url: str, headers) -> bool:
+    return method == "GET" and url.startswith("http://") and "authorization" not in {k.lower() for k in headers}
+
+
+def cacheable_response(url: str, status: int, headers: Dict[str, str]) -> bool:
+    """
+    Only successful static assets which are safe to share between browsers are kept
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if status != 200 or "set-cookie" in headers or "no-store" in cache_control or "private" in cache_control:
+        return False
+    if headers.get("vary", "").lower().replace(" ", "") not in ("", "accept-encoding"):
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return any(kind in content_type for kind in STATIC_CONTENT_TYPES) or bool(
+        STATIC_EXTENSIONS.search(url.split("?")[0])
+    )
+
+
+class CachingProxy:
+    """
+    A local forward proxy for the browsers pylenium starts: static assets fetched over http are cached on disk by
+    url and ETag and served to every browser from there, revalidating with the origin (If-None-Match /
+    If-Modified-Since) once they are no longer fresh
+    n.b -> https traffic and upgraded connections (websockets) are tunnelled through untouched, https can not be
+    cached without intercepting tls. Responses which are not cached are streamed to the browser as they arrive
+    """
+
+    def __init__(self, cache_dir: str, host: str = "127.0.0.1", port: int = 0, timeout: float = 30.0):
+        self.cache = AssetCache(cache_dir)
+        self.statistics = ProxyStatistics()
+        self.timeout = timeout
+        self.upstream = urllib3.PoolManager(maxsize=16, timeout=urllib3.Timeout(connect=timeout, read=timeout))
+        # url -> [lock, number of fetches holding or waiting on it], only urls being fetched right now
+        self._fetch_locks: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        try:
+            self._httpd = ThreadingHTTPServer((host, port), _ProxyHandler)
+        except OSError as error:
+            raise PyleniumProxyException(f"Unable to start the caching proxy on {host}:{port}: {error}")
+        self._httpd.daemon_threads = True
+        self._httpd.proxy = self
+
+    @property
+    def address(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> "CachingProxy":
+        threading.Thread(
+            target=self._httpd.serve_forever, args=(0.1,), name="pylenium-caching-proxy", daemon=True
+        ).start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self.upstream.clear()
+
+    def fetch(self, method: str, url: str, headers: Dict[str, str], body: bytes = None):
+        """
+        :return: (status, headers, body) served from the cache where possible, otherwise from the origin. The body is
+        bytes when it was cached or the origin's urllib3 response, still to be streamed, when it was not
+        """
+        if not cacheable_request(method, url, headers):
+            return self._forward(method, url, headers, body)
+        # parallel browsers asking for the same asset wait for one download instead of all downloading it
+        with self._fetching(url):
+            cached = self.cache.get(url)
+            if cached and cached[0].fresh():
+                return self._hit(cached, revalidated=False)
+            conditional = dict(headers)
+            if cached and cached[0].etag:
+                conditional["If-None-Match"] = cached[0].etag
+            if cached and cached[0].last_modified:
+                conditional["If-Modified-Since"] = cached[0].last_modified
+            status, response_headers, response = self._forward(method, url, conditional, body)
+            if status == 304 and cached:
+                response.drain_conn()
+                response.release_conn()
+                self.cache.touch(cached[0])
+                return self._hit(cached, revalidated=True)
+            with self._lock:
+                self.statistics.misses += 1
+            if not cacheable_response(url, status, response_headers):
+                return status, response_headers, response
+            try:
+                content = response.read(decode_content=False)
+            finally:
+                response.release_conn()
+            self.cache.put(CacheEntry(url, status, {**response_headers, "content-length": str(len(content))}), content)
+            return status, response_headers, content
+
+    @contextmanager
+    def _fetching(self, url: str):
+        """
+        Holds the fetch lock of url, the lock is forgotten once no other fetch of url is waiting on it
+        """
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(url, [threading.Lock(), 0])
+            fetch_lock[1] += 1
+        try:
+            with fetch_lock[0]:
+                yield
+        finally:
+            with self._lock:
+                fetch_lock[1] -= 1
+                if not fetch_lock[1]:
+                    del self._fetch_locks[url]
+
+    def _hit(self, cached: Tuple[CacheEntry, bytes], revalidated: bool):
+        entry, content = cached
+        with self._lock:
+            self.statistics.hits += 1
+            self.statistics.revalidated += revalidated
+            self.statistics.bytes_from_cache += len(content)
+        return entry.status, dict(entry.headers), content
+
+    def _forward(self, method: str, url: str, headers: Dict[str, str], body: bytes = None):
+        headers = {name: value for name, value in headers.items() if name.lower() not in HOP_BY_HOP}
+        response = self.upstream.request(
+            method,
+            url,
+            body=body,
+            headers=headers,
+            redirect=False,
+            retries=False,
+            decode_content=False,
+            preload_content=False,
+        )
+        response_headers = {
+            name.lower(): value for name, value in response.headers.items() if name.lower() not in HOP_BY_HOP
+        }
+        return response.status, response_headers, response
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _proxy(self):
+        if self.headers.get("Upgrade") and "upgrade" in self.headers.get("Connection", "").lower():
+            self._upgrade()
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        try:
+            status, headers, content = self.server.proxy.fetch(self.command, self.path, dict(self.headers), body)
+        except (urllib3.exceptions.HTTPError, OSError, ValueError) as error:
+            log.debug(f"Caching proxy could not fetch {self.path}: {error}")
+            status, headers, content = 502, {"content-type": "text/plain"}, str(error).encode("utf-8")
+        if not isinstance(content, bytes):
+            self._stream(status, headers, content)
+            return
+        self.send_response(status)
+        for name, value in headers.items():
+            if name != "content-length":
+                self.send_header(name, value)
+        if self.command == "HEAD":
+            self.send_header("Content-Length", headers.get("content-length", "0"))
+            self.end_headers()
+            return
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _stream(self, status: int, headers: Dict[str, str], response):
+        """
+        Relays a response which is not cached chunk by chunk instead of holding all of it in memory, chunked when the
+        origin did not say how long it is
+        """
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if self.command == "HEAD" or status in (204, 304) or status < 200:
+                self.end_headers()
+                return
+            chunked = "content-length" not in headers and self.request_version == "HTTP/1.1"
+            if chunked:
+                self.send_header("Transfer-Encoding", "chunked")
+            elif "content-length" not in headers:
+                self.close_connection = True
+            self.end_headers()
+            for chunk in response.stream(65536, decode_content=False):
+                if not chunk:
+                    continue
+                self.wfile.write(b"%x\r\n%b\r\n" % (len(chunk), chunk) if chunked else chunk)
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except (urllib3.exceptions.HTTPError, OSError) as error:
+            log.debug(f"Caching proxy could not stream {self.path}: {error}")
+            self.close_connection = True
+        finally:
+            response.release_conn()
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = _proxy
+
+    def do_CONNECT(self):
+        host, _, port = self.path.rpartition(":")
+        try:
+            upstream = socket.create_connection((host, int(port)), timeout=self.server.proxy.timeout)
+        except (OSError, ValueError) as error:
+            self.send_error(502, str(error))
+            return
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self._tunnel(upstream)
+
+    def _upgrade(self):
+        """
+        Hands a request asking to switch protocols (websockets) to the origin as is and tunnels the connection from
+        there on, like CONNECT, as the proxy can not speak the protocol it is upgraded to
+        """
+        parts = urllib.parse.urlsplit(self.path)
+        if parts.scheme != "http" or not parts.hostname:
+            self.send_error(400, f"Unable to upgrade the connection to {self.path}")
+            return
+        try:
+            upstream = socket.create_connection((parts.hostname, parts.port or 80), timeout=self.server.proxy.timeout)
+        except (OSError, ValueError) as error:
+            self.send_error(502, str(error))
+            return
+        target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        lines = [f"{self.command} {target} {self.request_version}"] + [
+            f"{name}: {value}"
+            for name, value in self.headers.items()
+            if name.lower() not in ("proxy-connection", "proxy-authorization")
+        ]
+        try:
+            upstream.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        except OSError as error:
+            upstream.close()
+            self.send_error(502, str(error))
+            return
+        self._tunnel(upstream)
+
+    def _tunnel(self, upstream: socket.socket):
+        """
+        Relays bytes both ways between the browser and upstream until either side closes or goes quiet
+        """
+        self.close_connection = True
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, failed = select.select(sockets, [], sockets, self.server.proxy.timeout)
+                if failed or not readable:
+                    return
+                for source in readable:
+                    data = source.recv(65536)
+                    if not data:
+                        return
+                    (upstream if source is self.connection else self.connection).sendall(data)
+        except OSError:
+            return
+        finally:
+            upstream.close()
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,165 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import base64
+import gzip
+import os
+import queue
+import re
+import threading
+from typing import Union
+
+from pylenium.logging.log import log
+
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+#: Bytes gzip / zstd may add to incompressible data, on top of roughly 1% of its size
+COMPRESSION_OVERHEAD = 64
+_STOP = object()
+
+
+def _zstandard_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def artifact_name(nodeid: str, suffix: str) -> str:
+    """
+    :return: a file name for an artifact of the given test, safe to use on any file system
+    """
+    return f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', nodeid).strip('_')}{suffix}"
+
+
+class ArtifactWriter:
+    """
+    Encodes, compresses and writes failure artifacts on a single background thread so a failing test only pays
+    for grabbing the raw data from the driver; the queue is bounded and anything which cannot be queued in time,
+    or which could take the session past max_bytes on disk, is dropped rather than blocking the next test
+    n.b -> queued artifacts reserve the most they can take up on disk, so the limit is decided when they are submitted
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        compression: str = "gzip",
+        max_bytes: int = 512 * 1024 * 1024,
+        queue_size: int = 32,
+        put_timeout: float = 1.0,
+    ):
+        if compression == "zstd" and not _zstandard_available():
+            log.warning("zstandard is not installed, failure artifacts will be gzip compressed instead")
+            compression = "gzip"
+        self.directory = directory
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.put_timeout = put_timeout
+        self.bytes_written = 0
+        self.bytes_reserved = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, name="pylenium-artifacts", daemon=True)
+        self._thread.start()
+
+    def submit(self, name: str, payload: Union[str, bytes], base64_encoded: bool = False, compress: bool = True):
+        """
+        Queues an artifact to be written in the background
+        :param name: file name of the artifact, the compression extension is appended when compressed
+        :param payload: the raw artifact, str payloads are utf-8 encoded
+        :param base64_encoded: the payload is base64 (e.g a screenshot straight from the driver) and must be decoded
+        :param compress: false for payloads which are already compressed, e.g png screenshots
+        :return: the path the artifact will be written to, or None if it was dropped
+        """
+        extension = COMPRESSION_EXTENSIONS[self.compression] if compress else ""
+        path = os.path.join(self.directory, f"{name}{extension}")
+        reserved = self._upper_bound(payload, base64_encoded, compress and self.compression != "none")
+        with self._lock:
+            if self.bytes_written + self.bytes_reserved + reserved > self.max_bytes:
+                return self._drop(name, "the session artifact limit has been reached")
+            self.bytes_reserved += reserved
+        try:
+            self._queue.put((path, payload, base64_encoded, compress, reserved), timeout=self.put_timeout)
+        except queue.Full:
+            self._release(reserved)
+            return self._drop(name, "the artifact writer is backed up")
+        return path
+
+    def close(self):
+        """
+        Waits for every queued artifact to be written, then stops the writer thread
+        """
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            path, payload, base64_encoded, compress, reserved = job
+            written = 0
+            try:
+                written = self._write(path, payload, base64_encoded, compress)
+            except Exception as exc:
+                log.warning(f"Unable to write failure artifact {path}: {exc}")
+            finally:
+                self._release(reserved, written)
+
+    def _write(self, path: str, payload: Union[str, bytes], base64_encoded: bool, compress: bool) -> int:
+        data = base64.b64decode(payload) if base64_encoded else payload
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if compress:
+            data = self._compress(data)
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "wb") as artifact:
+            artifact.write(data)
+        return len(data)
+
+    def _release(self, reserved: int, written: int = 0):
+        with self._lock:
+            self.bytes_reserved -= reserved
+            self.bytes_written += written
+
+    @staticmethod
+    def _upper_bound(payload: Union[str, bytes], base64_encoded: bool, compress: bool) -> int:
+        """
+        :return: the most bytes the payload can take up on disk, without encoding or compressing it
+        """
+        if base64_encoded:
+            size = len(payload) * 3 // 4
+        elif isinstance(payload, str):
+            size = len(payload) if payload.isascii() else len(payload.encode("utf-8"))
+        else:
+            size = len(payload)
+        return size + size // 100 + COMPRESSION_OVERHEAD if compress else size
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=6)
+        if self.compression == "zstd":
+            import zstandard
+
+            return zstandard.ZstdCompressor().compress(data)
+        return data
+
+    def _drop(self, name: str, reason: str):
+        self.dropped += 1
+        log.warning(f"Dropped failure artifact {name} because {reason}")
+        return None
@@ -0,0 +1,148 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+NO_TEST = "<outside of a test>"
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """
+    Nearest rank percentile of an already sorted list of samples
+    """
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class CommandTimingRecorder:
+    """
+    Records the wall time of every WebDriver command sent by an instrumented browser, keyed by the command
+    (e.g findElement, clickElement, get) and by the test running on the thread which sent it
+    """
+
+    def __init__(self, slowest: int = 10):
+        self.slowest = slowest
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._tests: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._current = threading.local()
+
+    def instrument(self, browser):
+        """
+        Times every command the browser sends by wrapping its execute method, any EventFiringWebDriver is
+        unwrapped first so the real driver (which elements also send their commands through) is timed
+        """
+        target = getattr(browser, "wrapped_driver", browser)
+        if getattr(target, "_pylenium_timed", False):
+            return browser
+        execute = target.execute
+
+        def timed_execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                self.record(driver_command, time.perf_counter() - start)
+
+        target.execute = timed_execute
+        target._pylenium_timed = True
+        return browser
+
+    def start_test(self, nodeid: str):
+        self._current.nodeid = nodeid
+
+    def finish_test(self):
+        self._current.nodeid = None
+
+    def record(self, command: str, seconds: float):
+        nodeid = getattr(self._current, "nodeid", None) or NO_TEST
+        with self._lock:
+            self._samples[command].append(seconds)
+            test = self._tests[nodeid]
+            test["commands"] += 1
+            test["seconds"] += seconds
+
+    def __bool__(self):
+        return bool(self._samples)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        :return: count, total, p50, p95, p99 and max seconds per command, slowest commands in total first
+        """
+        with self._lock:
+            samples = {command: sorted(durations) for command, durations in self._samples.items()}
+        summary = {
+            command: {
+                "count": len(ordered),
+                "total": sum(ordered),
+                "p50": percentile(ordered, 0.50),
+                "p95": percentile(ordered, 0.95),
+                "p99": percentile(ordered, 0.99),
+                "max": ordered[-1],
+            }
+            for command, ordered in samples.items()
+        }
+        return dict(sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True))
+
+    def top_tests(self) -> List[Dict]:
+        """
+        :return: the tests which spent the longest waiting on WebDriver commands
+        """
+        with self._lock:
+            tests = [{"nodeid": nodeid, **dict(totals)} for nodeid, totals in self._tests.items()]
+        return sorted(tests, key=lambda test: test["seconds"], reverse=True)[: self.slowest]
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "samples": {command: list(durations) for command, durations in self._samples.items()},
+                "tests": {nodeid: dict(totals) for nodeid, totals in self._tests.items()},
+            }
+
+    def merge(self, recorded: Dict):
+        """
+        Folds in the timings recorded by another process, e.g an xdist worker
+        """
+        with self._lock:
+            for command, durations in recorded.get("samples", {}).items():
+                self._samples[command].extend(durations)
+            for nodeid, totals in recorded.get("tests", {}).items():
+                for key, value in totals.items():
+                    self._tests[nodeid][key] += value
+
+    def write_json(self, path: str):
+        with open(path, "w") as report:
+            json.dump({"commands": self.summary(), "slowest_tests": self.top_tests()}, report, indent=2)
+
+    def report_lines(self) -> List[str]:
+        lines = [f"{'command':<32}{'count':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for command, stats in self.summary().items():
+            lines.append(
+                f"{command:<32}{stats['count']:>8}{stats['total']:>10.2f}{stats['p50'] * 1000:>10.1f}"
+                f"{stats['p95'] * 1000:>10.1f}{stats['p99'] * 1000:>10.1f}{stats['max'] * 1000:>10.1f}"
+            )
+        lines.append("")
+        lines.append("slowest tests by time spent in WebDriver commands:")
+        for test in self.top_tests():
+            lines.append(f"{test['seconds']:>8.2f}s {int(test['commands']):>6} commands  {test['nodeid']}")
+        return lines
@@ -16,16 +16,37 @@
 #  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 #  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 from dataclasses import dataclass
-from typing import Union
+from typing import Optional, Tuple, Union
+
+# document.readyState values the browser itself waits for under each W3C pageLoadStrategy
+GUARANTEED_READY_STATES = {"normal": {"complete"}, "eager": {"interactive", "complete"}, "none": set()}
 
 
 @dataclass(frozen=True, eq=True)
 class PageLoadingStrategy:
-    pass
+    """
+    How the browser loads pages and when PyleniumDriver.get hands control back:
+        capability: the W3C pageLoadStrategy the browser is started with (normal, eager or none)
+        ready_states: the document.readyState values which count as ready
+        network_quiet_ms: if set, also wait until no request has finished for this many milliseconds
+    """
+
+    capability: str = "normal"
+    ready_states: Tuple[str, ...] = ("complete",)
+    network_quiet_ms: Optional[int] = None
+
+    @property
+    def browser_waits(self) -> bool:
+        """
+        :return: True when the browser's own page load already guarantees readiness, so get needs no extra check
+        """
+        guaranteed = GUARANTEED_READY_STATES.get(self.capability, set())
+        return self.network_quiet_ms is None and bool(guaranteed & set(self.ready_states))
 
 
 @dataclass(frozen=True, eq=True)
 class SlowLoadingPageStrategy(PageLoadingStrategy):
+    network_quiet_ms: Optional[int] = 500
     name: str = "slow"
 
     def __str__(self):
@@ -42,6 +63,8 @@ class NormalLoadingPageStrategy(PageLoadingStrategy):
 
 @dataclass(frozen=True, eq=True)
 class FastLoadingPageStrategy(PageLoadingStrategy):
+    capability: str = "eager"
+    ready_states: Tuple[str, ...] = ("interactive", "complete")
     name: str = "fast"
 
     def __str__(self):
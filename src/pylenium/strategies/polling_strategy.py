@@ -0,0 +1,68 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator
+
+
+@dataclass(frozen=True, eq=True)
+class PollingStrategy(ABC):
+    @abstractmethod
+    def delays(self) -> Iterator[float]:
+        """
+        :return: an endless iterator of how long to sleep between each poll of a wait condition
+        """
+        pass
+
+
+@dataclass(frozen=True, eq=True)
+class FixedPollingStrategy(PollingStrategy):
+    interval: float = 0.25
+    name: str = "fixed"
+
+    def delays(self) -> Iterator[float]:
+        while True:
+            yield self.interval
+
+    def __str__(self):
+        return f"polling: fixed every {self.interval}s"
+
+
+@dataclass(frozen=True, eq=True)
+class BackoffPollingStrategy(PollingStrategy):
+    """
+    Polls quickly at first so conditions which are met almost immediately return almost immediately, then
+    backs off exponentially up to maximum so slow conditions do not flood the (possibly remote) driver;
+    each delay is randomised by +/- jitter to stop parallel waits from polling in lock step
+    """
+
+    initial: float = 0.01
+    factor: float = 2.0
+    maximum: float = 1.0
+    jitter: float = 0.1
+    name: str = "backoff"
+
+    def delays(self) -> Iterator[float]:
+        delay = self.initial
+        while True:
+            yield min(delay, self.maximum) * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay *= self.factor
+
+    def __str__(self):
+        return f"polling: backoff from {self.initial}s to {self.maximum}s"
@@ -17,6 +17,15 @@ def is_master_process():
     return not os.environ.get(PYTEST_XDIST_WORKER)
 
 
+def is_xdist_controller(config) -> bool:
+    """
+    Determines if the currently executing process is the xdist controller distributing tests to workers
+    :param config: the pytest config object
+    :return: bool indicating if this process will never run tests itself
+    """
+    return is_master_process() and bool(getattr(config.option, "numprocesses", None))
+
+
 def plugin_log_seperate(number_of_stars: int = 30):
     log.info("*****" * number_of_stars)
 
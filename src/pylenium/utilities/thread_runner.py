@@ -0,0 +1,298 @@
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import List
+
+import _pytest.runner
+import pytest
+from _pytest.fixtures import FixtureDef
+from _pytest.runner import SetupState
+
+#: pytest releases (from, up to but excluding) whose SetupState and FixtureDef internals the runner relies on
+SUPPORTED_PYTEST = ((7, 0), (10, 0))
+
+
+class ThreadLocalSetupState:
+    """
+    Stands in for the session's SetupState, handing every runner thread a SetupState of its own so each thread
+    keeps its own stack of set up collectors and fixture finalizers
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._states: List[SetupState] = []
+        self._lock = threading.Lock()
+
+    @property
+    def current(self) -> SetupState:
+        state = getattr(self._local, "state", None)
+        if state is None:
+            state = self._local.state = SetupState()
+            with self._lock:
+                self._states.append(state)
+        return state
+
+    def __getattr__(self, name):
+        return getattr(self.current, name)
+
+    def teardown_all(self):
+        """
+        Tears down whatever every thread left set up, i.e session scoped fixtures, once all threads are done
+        """
+        errors = []
+        for state in self._states:
+            try:
+                state.teardown_exact(None)
+            except Exception as exc:
+                errors.append(exc)
+        if errors:
+            raise errors[0]
+
+
+class ThreadLocalFixtureAttribute:
+    """
+    Installed on FixtureDef while the runner is active, so the cached value and finalizers of every fixture below
+    session scope are kept per thread. Without it a thread finds the function scoped fixture value another thread
+    just set up and runs its finalizers when tearing down its own test
+    """
+
+    def __init__(self, name: str, default):
+        self.name = name
+        self.default = default
+        self._local = threading.local()
+
+    def __get__(self, fixturedef, owner=None):
+        if fixturedef is None:
+            return self
+        if fixturedef.scope == "session":
+            return fixturedef.__dict__[self.name]
+        values = self._values()
+        if fixturedef not in values:
+            values[fixturedef] = self.default()
+        return values[fixturedef]
+
+    def __set__(self, fixturedef, value):
+        if fixturedef.scope == "session":
+            fixturedef.__dict__[self.name] = value
+        else:
+            self._values()[fixturedef] = value
+
+    def _values(self) -> dict:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = self._local.values = {}
+        return values
+
+
+class CollectorBoundary:
+    """
+    Passed as the next item to tear down everything a thread set up below the given chain of collectors, while the
+    collectors in the chain (and the fixtures they hold) stay up for other threads
+    """
+
+    def __init__(self, chain: list):
+        self._chain = list(chain)
+        self.nodeid = ""
+
+    def listchain(self) -> list:
+        return list(self._chain)
+
+
+class NextModuleBoundary:
+    """
+    Passed as the next item after the last test of a module, the module to run next is only taken off the queue when
+    that test is torn down so idle threads can still pick it up meanwhile. Only the module is torn down when there is
+    one, otherwise everything the thread set up but the session
+    """
+
+    def __init__(self, runner: "ThreadRunner", item: pytest.Item):
+        self.runner = runner
+        self.item = item
+        self.following = None
+        self._chain = None
+        self.nodeid = ""
+
+    def listchain(self) -> list:
+        if self._chain is None:
+            self.following = self.runner.next_module()
+            chain = self.item.listchain()
+            module = self.item.getparent(pytest.Module)
+            if self.following is None:
+                self._chain = chain[:1]
+            else:
+                self._chain = chain[: chain.index(module)] if module in chain else chain[:1]
+        return list(self._chain)
+
+    @property
+    def resolved(self) -> bool:
+        return self._chain is not None
+
+
+class ThreadRunner:
+    """
+    Runs the collected tests on a pool of threads instead of one after another, each thread takes a whole module
+    at a time so module and class scoped fixtures behave as usual. Only session scoped fixtures and reporting are
+    serialised, everything else (launching and quitting browsers included) overlaps between threads
+    n.b -> session scoped fixtures are shared by every thread, fixtures of any narrower scope are set up per thread
+    """
+
+    THREAD_LOCAL_ATTRIBUTES = {"cached_result": lambda: None, "_finalizers": list}
+
+    def __init__(self, session: pytest.Session, threads: int):
+        check_pytest_supported()
+        self.session = session
+        self.threads = threads
+        self.fixture_lock = threading.RLock()
+        self.report_lock = threading.RLock()
+        self._modules = queue.Queue()
+        for items in group_by_module(session.items):
+            self._modules.put(items)
+
+    def run(self):
+        setup_state = ThreadLocalSetupState()
+        original, self.session._setupstate = self.session._setupstate, setup_state
+        patches = {
+            name: ThreadLocalFixtureAttribute(name, default) for name, default in self.THREAD_LOCAL_ATTRIBUTES.items()
+        }
+        patches["execute"] = self._serialise_session_fixtures(FixtureDef.execute)
+        replaced = {name: FixtureDef.__dict__.get(name) for name in patches}
+        for name, attribute in patches.items():
+            setattr(FixtureDef, name, attribute)
+        update_current_test = _pytest.runner._update_current_test_var
+        _pytest.runner._update_current_test_var = self._serialise_current_test(update_current_test)
+        try:
+            with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="pylenium-runner") as pool:
+                futures = [pool.submit(self._work) for _ in range(self.threads)]
+                for future in futures:
+                    future.result()
+        finally:
+            self.session._setupstate = original
+            with self.fixture_lock:
+                setup_state.teardown_all()
+            _pytest.runner._update_current_test_var = update_current_test
+            for name, attribute in replaced.items():
+                if attribute is None:
+                    delattr(FixtureDef, name)
+                else:
+                    setattr(FixtureDef, name, attribute)
+        if self.session.shouldfail:
+            raise self.session.Failed(self.session.shouldfail)
+        if self.session.shouldstop:
+            raise self.session.Interrupted(self.session.shouldstop)
+
+    def _serialise_session_fixtures(self, execute):
+        """
+        Session scoped fixtures are shared, so only one thread may check their cached value and set them up
+        """
+        lock = self.fixture_lock
+
+        def serialised_execute(fixturedef, request):
+            if fixturedef.scope != "session":
+                return execute(fixturedef, request)
+            with lock:
+                return execute(fixturedef, request)
+
+        return serialised_execute
+
+    def _serialise_current_test(self, update):
+        """
+        PYTEST_CURRENT_TEST is a single environment variable, threads take turns to set it and whichever thread
+        finishes first removes it
+        """
+        lock = self.fixture_lock
+
+        def serialised_update(item, when):
+            with lock:
+                if when is None:
+                    os.environ.pop("PYTEST_CURRENT_TEST", None)
+                else:
+                    update(item, when)
+
+        return serialised_update
+
+    def _work(self):
+        """
+        Runs modules until none are left, the last test a thread runs tears down everything but the session so
+        fixtures held per thread are finalized on the thread that set them up
+        n.b -> anything still set up when the run stops early is torn down before the thread exits
+        """
+        try:
+            items = self.next_module()
+            while items is not None and not self._stopping():
+                boundary = NextModuleBoundary(self, items[-1])
+                for index, item in enumerate(items):
+                    nextitem = items[index + 1] if index + 1 < len(items) else boundary
+                    item.config.hook.pytest_runtest_protocol(item=item, nextitem=nextitem)
+                    if self._stopping():
+                        return
+                items = boundary.following if boundary.resolved else self.next_module()
+        finally:
+            self.session._setupstate.teardown_exact(CollectorBoundary([self.session]))
+
+    def next_module(self):
+        """
+        :return: the items of the next module nobody is running yet or None once every module was taken
+        """
+        try:
+            return self._modules.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _stopping(self) -> bool:
+        return bool(self.session.shouldfail or self.session.shouldstop)
+
+
+def check_pytest_supported(version: str = pytest.__version__):
+    """
+    The runner swaps pytest internals (session._setupstate, FixtureDef.cached_result / _finalizers / execute), rather
+    than running tests on threads against internals it does not know it fails loudly
+    :raises pytest.UsageError: for a pytest release outside of SUPPORTED_PYTEST
+    """
+    release = tuple(int(part) for part in re.findall(r"\d+", version)[:2])
+    (lowest, highest) = SUPPORTED_PYTEST
+    if not lowest <= release < highest:
+        raise pytest.UsageError(
+            f"--pylenium-threads supports pytest {'.'.join(map(str, lowest))} up to (excluding) "
+            f"{'.'.join(map(str, highest))}, not {version}"
+        )
+
+
+def group_by_module(items: List[pytest.Item]) -> List[List[pytest.Item]]:
+    """
+    :return: the items split into runs of consecutive items from the same module, in collection order
+    """
+    groups = []
+    for item in items:
+        module = item.getparent(pytest.Module)
+        if groups and groups[-1][0].getparent(pytest.Module) is module:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+    return groups
+
+
+def serialised(runner: ThreadRunner, lock_name: str):
+    """
+    :return: the named lock of runner or a no op context manager when tests are not running on threads
+    """
+    return getattr(runner, lock_name) if runner is not None else nullcontext()
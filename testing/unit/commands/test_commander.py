@@ -0,0 +1,74 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from pylenium.commands.commander import Commander
+from pylenium.commands.commands import GetTextCommand
+from pylenium.exceptions.custom_exceptions import PyleniumCommandException
+
+
+class FakeBrowser:
+    def __init__(self, outcomes):
+        self.outcomes = outcomes
+        self.calls = []
+
+    def execute_script(self, script, batch):
+        self.calls.append((script, batch))
+        if isinstance(self.outcomes, Exception):
+            raise self.outcomes
+        return self.outcomes
+
+
+def test_queued_commands_run_in_one_round_trip():
+    browser = FakeBrowser([{"ok": True, "value": "Simon"}, {"ok": True, "value": None}])
+    with Commander(browser) as batch:
+        name = batch.get_value("username")
+        click = batch.click("submit")
+    assert len(browser.calls) == 1
+    assert browser.calls[0][1] == [["username"], ["submit"]]
+    assert name.value == "Simon"
+    assert click.done
+
+
+def test_failed_command_and_later_commands_raise():
+    browser = FakeBrowser([{"ok": False, "error": "TypeError: args[0] is null"}])
+    with Commander(browser) as batch:
+        failed = batch.get_text(None)
+        skipped = batch.click("submit")
+    with pytest.raises(PyleniumCommandException, match="is null"):
+        failed.value
+    with pytest.raises(PyleniumCommandException, match="Not executed"):
+        skipped.value
+
+
+def test_failed_round_trip_settles_every_result():
+    commander = Commander(FakeBrowser(WebDriverException("session deleted")))
+    results = [commander.get_text("element"), commander.click("submit")]
+    with pytest.raises(WebDriverException):
+        commander.flush()
+    for result in results:
+        assert result.done
+        with pytest.raises(PyleniumCommandException, match="batch failed to execute: .*session deleted"):
+            result.value
+
+
+def test_value_before_flush_raises():
+    result = Commander(FakeBrowser([])).get_text("element")
+    with pytest.raises(PyleniumCommandException, match="not been executed"):
+        result.value
+
+
+def test_empty_flush_makes_no_calls():
+    browser = FakeBrowser([])
+    assert Commander(browser).flush() == []
+    assert not browser.calls
+
+
+def test_unknown_command():
+    with pytest.raises(AttributeError):
+        Commander(FakeBrowser([])).hover("element")
+
+
+def test_command_executes_alone():
+    browser = FakeBrowser("Sign in")
+    assert GetTextCommand("element").execute(browser) == "Sign in"
+    assert browser.calls[0][1] == ["element"]
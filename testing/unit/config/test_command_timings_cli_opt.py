@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+def test_default(testdir):
+    testdir.makepyfile(
+        """
+        def test_default(command_timings, command_timings_json):
+            assert not command_timings
+            assert command_timings_json is None
+    """
+    )
+    result = testdir.runpytest("-v")
+    result.stdout.fnmatch_lines(
+        ["*::test_default PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_json_implies_timings(testdir):
+    testdir.makepyfile(
+        """
+        def test_override(pylenium_config):
+            assert pylenium_config.command_timings
+            assert pylenium_config.command_timings_json == "timings.json"
+    """
+    )
+    result = testdir.runpytest("--command-timings-json=timings.json", "-v")
+    result.stdout.fnmatch_lines(
+        ["*::test_override PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_terminal_summary(testdir):
+    testdir.makepyfile(
+        """
+        from pylenium import plugin
+
+        def test_records():
+            plugin.command_recorder.record("findElement", 0.02)
+            plugin.command_recorder.record("findElement", 0.04)
+    """
+    )
+    result = testdir.runpytest("--command-timings-json=timings.json")
+    result.stdout.fnmatch_lines(
+        ["*pylenium command timings*", "findElement*2*", "*test_records*"]
+    )
+    assert testdir.tmpdir.join("timings.json").check()
+    assert result.ret == 0
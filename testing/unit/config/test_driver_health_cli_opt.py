@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+def test_default(testdir):
+    testdir.makepyfile(
+        """
+        def test_default(driver_max_tests, driver_max_age, driver_max_memory, driver_liveness_timeout):
+            assert (driver_max_tests, driver_max_age, driver_max_memory) == (0, 0.0, 0.0)
+            assert driver_liveness_timeout == 0.0
+    """
+    )
+    result = testdir.runpytest("-v")
+    result.stdout.fnmatch_lines(
+        ["*::test_default PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_override(testdir):
+    testdir.makepyfile(
+        """
+        def test_override(pylenium_config):
+            assert pylenium_config.driver_max_tests == 200
+            assert pylenium_config.driver_max_age == 1800.0
+            assert pylenium_config.driver_max_memory == 1536.0
+            assert pylenium_config.driver_liveness_timeout == 2.5
+    """
+    )
+    result = testdir.runpytest(
+        "--driver-max-tests=200",
+        "--driver-max-age=1800",
+        "--driver-max-memory=1536",
+        "--driver-liveness-timeout=2.5",
+        "-v",
+    )
+    result.stdout.fnmatch_lines(
+        ["*::test_override PASSED*",]
+    )
+    assert result.ret == 0
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+def test_default(testdir):
+    testdir.makepyfile(
+        """
+        def test_default(artifacts_dir, artifact_compression, artifact_max_mb):
+            assert artifacts_dir == "pylenium-artifacts"
+            assert artifact_compression == "gzip"
+            assert artifact_max_mb == 512
+    """
+    )
+    result = testdir.runpytest("-v")
+    result.stdout.fnmatch_lines(
+        ["*::test_default PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_override(testdir):
+    testdir.makepyfile(
+        """
+        def test_override(artifacts_dir, artifact_compression, pylenium_config):
+            assert artifacts_dir == "failures"
+            assert artifact_compression == "none"
+            assert pylenium_config.artifact_max_bytes == 10 * 1024 * 1024
+    """
+    )
+    result = testdir.runpytest(
+        "--artifacts-dir=failures", "--artifact-compression=none", "--artifact-max-mb=10", "-v"
+    )
+    result.stdout.fnmatch_lines(
+        ["*::test_override PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_stack_trace_is_written_on_failure(testdir):
+    testdir.makepyfile(
+        """
+        def test_failing():
+            assert 1 == 2
+    """
+    )
+    result = testdir.runpytest("--stack-trace-on-fail", "--artifacts-dir=failures")
+    assert result.ret == 1
+    written = testdir.tmpdir.join("failures").listdir()
+    assert [path.basename for path in written] == ["test_stack_trace_is_written_on_failure.py_test_failing.txt.gz"]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+
+def test_default(testdir):
+    testdir.makepyfile(
+        """
+        def test_default(remote_pool_size, remote_keep_alive, remote_connect_timeout, remote_read_timeout, remote_retries):
+            assert remote_pool_size == 10
+            assert remote_keep_alive is True
+            assert remote_connect_timeout == 10.0
+            assert remote_read_timeout == 300.0
+            assert remote_retries == 2
+    """
+    )
+    result = testdir.runpytest("-v")
+    result.stdout.fnmatch_lines(
+        ["*::test_default PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_override(testdir):
+    testdir.makepyfile(
+        """
+        def test_override(pylenium_config):
+            assert pylenium_config.remote_pool_size == 4
+            assert pylenium_config.remote_keep_alive is False
+            assert pylenium_config.remote_connect_timeout == 2.5
+            assert pylenium_config.remote_read_timeout == 60.0
+            assert pylenium_config.remote_retries == 0
+    """
+    )
+    result = testdir.runpytest(
+        "--remote-pool-size=4",
+        "--no-remote-keep-alive",
+        "--remote-connect-timeout=2.5",
+        "--remote-read-timeout=60",
+        "--remote-retries=0",
+        "-v",
+    )
+    result.stdout.fnmatch_lines(
+        ["*::test_override PASSED*",]
+    )
+    assert result.ret == 0
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from pylenium.driver.async_driver import AsyncDriverPool, AsyncPyleniumDriver
+from pylenium.fake_webdriver.server import FakeWebDriverServer
+from pylenium.strategies.page_loading_strategy import FastLoadingPageStrategy, NormalLoadingPageStrategy
+from pylenium.strategies.polling_strategy import FixedPollingStrategy, PollingStrategy
+
+PAGE = """
+<title>Chat</title>
+<form><input name="message" id="message"><button class="send">Send</button></form>
+<ul><li>hello</li><li>world</li></ul>
+"""
+
+
+@dataclass(frozen=True, eq=True)
+class FinitePollingStrategy(PollingStrategy):
+    def delays(self):
+        yield from (0.01, 0.01)
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeWebDriverServer() as fake:
+        fake.add_page("http://app.test/", PAGE)
+        yield fake
+
+
+@pytest.fixture
+def config(server):
+    return SimpleNamespace(
+        server=f"http://{server.host}",
+        server_port=server.port,
+        browser="chrome",
+        browser_capabilities=None,
+        block_urls=[],
+        remote_connect_timeout=2.0,
+        remote_read_timeout=5.0,
+        remote_pool_size=4,
+        explicit_wait=1,
+        polling_strategy=FixedPollingStrategy(0.01),
+        page_load_strategy=NormalLoadingPageStrategy(),
+        default_selector="css",
+    )
+
+
+def test_driving_a_page(server, config):
+    async def scenario():
+        async with AsyncPyleniumDriver(config) as driver:
+            assert driver.session_id in server.sessions
+            await driver.get("http://app.test/")
+            assert await driver.title() == "Chat"
+            field = await driver.find("message", by="id")
+            await (await field.send_keys("hi ", "there")).click()
+            assert await field.get_attribute("value") == "hi there"
+            items = await driver.find_all("li")
+            assert [await item.text() for item in items] == ["hello", "world"]
+            assert await (await driver.xpath("//button")).is_displayed()
+            form = await driver.find("form")
+            assert await (await form.find("send", by="class name")).text() == "Send"
+            with pytest.raises(NoSuchElementException):
+                await driver.find("table")
+            return driver.session_id
+
+    session_id = asyncio.run(scenario())
+    assert session_id not in server.sessions
+
+
+def test_id_and_name_locators_are_escaped(config):
+    driver = AsyncPyleniumDriver(config)
+    assert driver._locator('say "hi"', by="id") == {"using": "css selector", "value": '[id="say \\"hi\\""]'}
+    assert driver._locator("C:\\tmp", by="name") == {"using": "css selector", "value": '[name="C:\\\\tmp"]'}
+
+
+def test_sessions_are_driven_concurrently(server, config):
+    async def scenario():
+        pool = AsyncDriverPool(config)
+        drivers = await pool.start(3)
+        assert len({driver.session_id for driver in drivers}) == 3
+        await asyncio.gather(*(driver.get("http://app.test/") for driver in drivers))
+        titles = await asyncio.gather(*(driver.title() for driver in drivers))
+        await pool.quit_all()
+        return drivers, titles
+
+    created = server.sessions_created
+    drivers, titles = asyncio.run(scenario())
+    assert titles == ["Chat"] * 3
+    assert server.sessions_created == created + 3
+    assert not any(driver.session_id for driver in drivers)
+
+
+def test_lazy_session_starts_once(server, config):
+    async def scenario():
+        driver = AsyncPyleniumDriver(config)
+        await asyncio.gather(driver.current_url(), driver.current_url())
+        await driver.quit()
+
+    created = server.sessions_created
+    asyncio.run(scenario())
+    assert server.sessions_created == created + 1
+
+
+def test_page_readiness_is_polled_for_stricter_strategies(config):
+    config.page_load_strategy = FastLoadingPageStrategy()
+
+    async def scenario():
+        async with AsyncPyleniumDriver(config) as driver:
+            await driver.get("http://app.test/")
+            return await driver.current_url()
+
+    assert asyncio.run(scenario()) == "http://app.test/"
+
+
+def test_wait_until_times_out(config):
+    async def never():
+        return False
+
+    async def scenario():
+        async with AsyncPyleniumDriver(config) as driver:
+            start = time.monotonic()
+            with pytest.raises(TimeoutException, match="never"):
+                await driver.wait_until(never, timeout=0.1, message="never")
+            return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 1
+
+
+def test_wait_until_times_out_when_the_delays_run_out(config):
+    config.polling_strategy = FinitePollingStrategy()
+
+    async def never():
+        return False
+
+    async def scenario():
+        async with AsyncPyleniumDriver(config) as driver:
+            with pytest.raises(TimeoutException, match="never"):
+                await driver.wait_until(never, message="never")
+
+    asyncio.run(scenario())
+
+
+def test_session_starts_on_another_loop(server, config):
+    driver = AsyncPyleniumDriver(config)
+
+    async def start_and_quit():
+        await asyncio.gather(driver.start(), driver.start())
+        await driver.quit()
+
+    created = server.sessions_created
+    asyncio.run(start_and_quit())
+    asyncio.run(start_and_quit())
+    assert server.sessions_created == created + 2
+
+
+def test_pool_close_quits_sessions_outside_a_loop(server, config):
+    pool = AsyncDriverPool(config)
+    (driver,) = asyncio.run(pool.start())
+    session_id = driver.session_id
+    pool.close()
+    assert session_id not in server.sessions
+
+
+def test_async_fixtures_against_the_fake_webdriver(testdir):
+    testdir.makepyfile(
+        """
+        import asyncio
+
+
+        async def test_two_users(fake_webdriver, async_drivers):
+            fake_webdriver.add_page("http://app.test/", "<title>Chat</title>")
+            alice, bob = await async_drivers.start(2)
+            await asyncio.gather(alice.get("http://app.test/"), bob.get("http://app.test/"))
+            assert await asyncio.gather(alice.title(), bob.title()) == ["Chat", "Chat"]
+
+
+        async def test_single(fake_webdriver, async_driver):
+            fake_webdriver.add_page("http://app.test/", "<title>Solo</title>")
+            await async_driver.get("http://app.test/")
+            assert await async_driver.title() == "Solo"
+
+
+        def test_all_sessions_were_quit(fake_webdriver):
+            assert fake_webdriver.sessions_created == 3
+            assert not fake_webdriver.sessions
+    """
+    )
+    result = testdir.runpytest("--fake-webdriver", "-v")
+    result.assert_outcomes(passed=3)
@@ -0,0 +1,75 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from pylenium.constants.string_globals import CHROME
+from pylenium.driver.binary_resolver import DriverBinaryResolver
+from pylenium.exceptions.custom_exceptions import PyleniumArgumentException
+
+
+def _config(**overrides):
+    options = dict(browser_version="latest", aquire_binary=False, driver_binary_path=None)
+    options.update(overrides)
+    return SimpleNamespace(**options)
+
+
+@pytest.fixture
+def binary(tmp_path):
+    path = tmp_path / "chromedriver"
+    path.write_text("")
+    return str(path)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return str(tmp_path / "drivers.json")
+
+
+def test_resolves_once_per_session(binary, manifest):
+    installs = []
+    resolver = DriverBinaryResolver(_config(), manifest)
+    for _ in range(3):
+        assert resolver.resolve(CHROME, lambda version: installs.append(version) or binary) == binary
+    assert installs == ["latest"]
+
+
+def test_manifest_is_reused_across_sessions(binary, manifest):
+    DriverBinaryResolver(_config(), manifest).resolve(CHROME, lambda version: binary)
+    resolver = DriverBinaryResolver(_config(), manifest)
+    assert resolver.resolve(CHROME, lambda version: pytest.fail("should not install")) == binary
+    with open(manifest) as recorded:
+        assert json.load(recorded)["CHROME:latest"]["path"] == binary
+
+
+def test_manifest_is_keyed_by_version(binary, manifest):
+    DriverBinaryResolver(_config(), manifest).resolve(CHROME, lambda version: binary)
+    installs = []
+    resolver = DriverBinaryResolver(_config(browser_version="79.0"), manifest)
+    resolver.resolve(CHROME, lambda version: installs.append(version) or binary)
+    assert installs == ["79.0"]
+
+
+def test_latest_driver_is_resolved_again_once_stale(binary, manifest):
+    DriverBinaryResolver(_config(), manifest).resolve(CHROME, lambda version: binary)
+    installs = []
+    resolver = DriverBinaryResolver(_config(), manifest, latest_ttl=0)
+    resolver.resolve(CHROME, lambda version: installs.append(version) or binary)
+    assert installs == ["latest"]
+
+
+def test_pinned_driver_does_not_expire(binary, manifest):
+    DriverBinaryResolver(_config(browser_version="79.0"), manifest).resolve(CHROME, lambda version: binary)
+    resolver = DriverBinaryResolver(_config(browser_version="79.0"), manifest, latest_ttl=0)
+    assert resolver.resolve(CHROME, lambda version: pytest.fail("should not install")) == binary
+
+
+def test_driver_binary_path_directory(binary, manifest, tmp_path):
+    resolver = DriverBinaryResolver(_config(driver_binary_path=str(tmp_path)), manifest)
+    assert resolver.resolve(CHROME, lambda version: pytest.fail("should not install")) == binary
+
+
+def test_driver_binary_path_missing(manifest, tmp_path):
+    resolver = DriverBinaryResolver(_config(driver_binary_path=str(tmp_path / "nope")), manifest)
+    with pytest.raises(PyleniumArgumentException):
+        resolver.resolve(CHROME, lambda version: pytest.fail("should not install"))
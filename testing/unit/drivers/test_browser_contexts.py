@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+from selenium import webdriver
+
+from pylenium.driver.browser_contexts import BrowserContextPool
+from pylenium.driver.driver_manager import ThreadLocalDriverManager, quit_concurrently
+from pylenium.driver.pylenium_driver import PyleniumDriver
+from pylenium.fake_webdriver.server import FakeWebDriverServer
+from pylenium.strategies.page_loading_strategy import NormalLoadingPageStrategy
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeWebDriverServer() as fake:
+        for page in range(4):
+            fake.add_page(f"http://app.test/{page}", f"<title>Page {page}</title><h1>Page {page}</h1>")
+        yield fake
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(
+        browser="FAKE",
+        remote=False,
+        driver_reuse="test",
+        contexts_per_browser=2,
+        block_urls=[],
+        driver_listener=None,
+        explicit_wait=2,
+        polling_interval=0.01,
+        polling_strategy=None,
+        wait_mode="poll",
+        page_load_strategy=NormalLoadingPageStrategy(),
+    )
+
+
+@pytest.fixture
+def launch(server, config):
+    def launch_driver():
+        remote = webdriver.Remote(command_executor=server.url, desired_capabilities={"browserName": "chrome"})
+        return PyleniumDriver(config, remote)
+
+    return launch_driver
+
+
+def test_contexts_share_a_browser_in_separate_windows(server, config, launch):
+    pool = BrowserContextPool(config, 2)
+    first, second = pool.acquire(launch), pool.acquire(launch)
+    assert len(pool.browsers) == 1
+    assert first.browser.session_id == second.browser.session_id
+    first.get("http://app.test/0")
+    second.get("http://app.test/1")
+    assert first.title == "Page 0"
+    assert second.title == "Page 1"
+    assert first.browser.window_handles == [first.browser.current_window_handle]
+    assert len(server.sessions[first.browser.session_id].windows) == 3
+    quit_concurrently(pool.drain())
+
+
+def test_concurrent_tests_are_routed_to_their_own_window(config, launch):
+    pool = BrowserContextPool(config, 2)
+    titles = {}
+
+    def run(page):
+        driver = pool.acquire(launch)
+        seen = []
+        for _ in range(20):
+            driver.get(f"http://app.test/{page}")
+            seen.append(driver.title)
+        titles[page] = seen
+        pool.release(driver)
+
+    threads = [threading.Thread(target=run, args=(page,)) for page in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert titles == {page: [f"Page {page}"] * 20 for page in range(2)}
+    assert len(pool.browsers) == 1
+    quit_concurrently(pool.drain())
+
+
+def test_closing_a_context_frees_its_slot(server, config, launch):
+    pool = BrowserContextPool(config, 2)
+    first, second = pool.acquire(launch), pool.acquire(launch)
+    session = server.sessions[first.browser.session_id]
+    pool.release(first)
+    assert len(session.windows) == 2
+    second.quit()
+    assert len(session.windows) == 1
+    assert pool.browsers[0].has_capacity
+    third = pool.acquire(launch)
+    assert third.browser.session_id == session.id
+    quit_concurrently(pool.drain())
+    assert session.id not in server.sessions
+
+
+def test_a_new_browser_is_launched_once_every_browser_is_full(config, launch):
+    pool = BrowserContextPool(config, 2)
+    drivers = [pool.acquire(launch) for _ in range(3)]
+    assert len(pool.browsers) == 2
+    assert drivers[0].browser.session_id != drivers[2].browser.session_id
+    quit_concurrently(pool.drain())
+    assert pool.browsers == []
+
+
+def test_urls_are_blocked_in_every_context(monkeypatch, config, launch):
+    blocked = []
+    monkeypatch.setattr(
+        "pylenium.driver.browser_contexts.block_in_chrome",
+        lambda browser, patterns: blocked.append((browser.current_window_handle, patterns)),
+    )
+    config.block_urls = ["*analytics*"]
+    pool = BrowserContextPool(config, 2)
+    first, second = pool.acquire(launch), pool.acquire(launch)
+    assert blocked == [
+        (first.browser.current_window_handle, ["*analytics*"]),
+        (second.browser.current_window_handle, ["*analytics*"]),
+    ]
+    quit_concurrently(pool.drain())
+
+
+def test_manager_hands_out_contexts_of_a_shared_browser(server, config, launch):
+    manager = ThreadLocalDriverManager(config)
+    manager.supported_drivers = {"FAKE": launch}
+    first = manager.get_driver()
+    assert manager.get_driver() is first
+    manager.release_driver()
+    second = manager.get_driver()
+    assert second is not first
+    assert second.browser.session_id == first.browser.session_id
+    assert len(server.sessions[first.browser.session_id].windows) == 2
+    manager.quit_all()
+    assert manager.context_pool.browsers == []
@@ -0,0 +1,134 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pylenium.driver.driver_health import DriverHealthMonitor, browser_memory, browser_process_ids
+from pylenium.driver.driver_manager import ThreadLocalDriverManager
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="walks the process tree via /proc")
+
+
+class FakeBrowser:
+    def __init__(self, hang=0.0, capabilities=None, service=None):
+        self.hang = hang
+        self.capabilities = capabilities or {}
+        self.service = service
+        self.commands = []
+        self.command_executor = SimpleNamespace(_commands={})
+
+    def execute(self, command, params=None):
+        time.sleep(self.hang)
+        self.commands.append((command, params))
+        if params and params.get("cmd") == "Performance.getMetrics":
+            return {"value": {"metrics": [{"name": "JSHeapTotalSize", "value": 64 * 1024 * 1024}]}}
+        return {"value": None}
+
+
+class FakeDriver:
+    def __init__(self, browser=None):
+        self.browser = browser or FakeBrowser()
+        self.resets = 0
+        self.quit_event = threading.Event()
+
+    def reset(self):
+        self.resets += 1
+
+    def quit(self):
+        self.quit_event.set()
+
+
+def _manager(**thresholds):
+    config = SimpleNamespace(
+        browser="FAKE",
+        remote=False,
+        driver_reuse="session",
+        contexts_per_browser=1,
+        driver_max_tests=thresholds.get("max_tests", 0),
+        driver_max_age=thresholds.get("max_age", 0.0),
+        driver_max_memory=thresholds.get("max_memory", 0.0),
+        driver_liveness_timeout=thresholds.get("liveness_timeout", 1.0),
+    )
+    manager = ThreadLocalDriverManager(config)
+    manager.supported_drivers = {"FAKE": FakeDriver}
+    return manager
+
+
+def test_driver_is_recycled_after_max_tests():
+    manager = _manager(max_tests=2)
+    driver = manager.get_driver()
+    manager.release_driver()
+    assert manager.get_driver() is driver
+    manager.release_driver()
+    assert driver.resets == 1
+    assert driver.quit_event.is_set()
+    assert manager.get_driver() is not driver
+
+
+def test_driver_is_recycled_once_too_old():
+    manager = _manager(max_age=60)
+    driver = manager.get_driver()
+    manager.health_monitor.watch(driver).created_at -= 61
+    manager.release_driver()
+    assert driver.quit_event.is_set()
+    assert manager.peek_driver() is None
+
+
+def test_hung_driver_is_replaced_without_waiting_on_it():
+    manager = _manager(liveness_timeout=0.1)
+    driver = manager.get_driver()
+    driver.browser.hang = 1.0
+    start = time.perf_counter()
+    manager.release_driver()
+    assert time.perf_counter() - start < 0.5
+    assert driver.resets == 0
+    assert manager.peek_driver() is None
+    assert driver.quit_event.wait(timeout=5)
+
+
+def test_healthy_driver_is_kept():
+    manager = _manager(max_tests=10, max_age=60, max_memory=1024 * 1024)
+    driver = manager.get_driver()
+    manager.release_driver()
+    assert manager.get_driver() is driver
+    assert driver.resets == 1
+
+
+def test_probe_is_skipped_without_a_timeout():
+    assert DriverHealthMonitor(liveness_timeout=0).responsive(FakeDriver(FakeBrowser(hang=5)))
+
+
+@linux_only
+def test_driver_is_recycled_once_its_browser_uses_too_much_memory():
+    service = SimpleNamespace(process=SimpleNamespace(pid=os.getpid()))
+    browser = FakeBrowser(capabilities={"moz:processID": os.getpid()}, service=service)
+    assert browser_memory(browser) > 1
+    reason = DriverHealthMonitor(max_memory=1).finished_test(FakeDriver(browser))
+    assert reason.startswith("its browser is using")
+
+
+@linux_only
+def test_chrome_browser_is_found_by_its_profile():
+    profile = "--user-data-dir=/tmp/pylenium-health-profile"
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)", profile])
+    try:
+        service = SimpleNamespace(process=SimpleNamespace(pid=os.getpid()))
+        capabilities = {"browserName": "chrome", "chrome": {"userDataDir": "/tmp/pylenium-health-profile"}}
+        deadline = time.monotonic() + 5
+        while not browser_process_ids(FakeBrowser(capabilities=capabilities, service=service)) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert browser_process_ids(FakeBrowser(capabilities=capabilities, service=service)) == [child.pid]
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_remote_chrome_memory_comes_from_devtools():
+    browser = FakeBrowser(capabilities={"browserName": "chrome"})
+    assert browser_memory(browser) == 64
+    assert browser.commands[0][1]["cmd"] == "Performance.enable"
+    assert browser_memory(FakeBrowser(capabilities={"browserName": "firefox"})) is None
@@ -0,0 +1,60 @@
+import threading
+from types import SimpleNamespace
+
+from pylenium.driver.driver_manager import ThreadLocalDriverManager
+
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.quits = 0
+
+    def quit(self):
+        self.quits += 1
+
+
+def _manager(launch):
+    manager = ThreadLocalDriverManager(SimpleNamespace(browser="FAKE", driver_reuse="test", remote=False, contexts_per_browser=1))
+    manager.supported_drivers = {"FAKE": launch}
+    return manager
+
+
+def test_prewarmed_driver_is_handed_out():
+    created = []
+
+    def launch():
+        created.append(FakeDriver(threading.current_thread().name))
+        return created[-1]
+
+    manager = _manager(launch)
+    manager.prewarm(1)
+    driver = manager.get_driver()
+    assert driver.name.startswith("pylenium-prewarm")
+    assert len(created) == 1
+
+
+def test_failed_prewarm_falls_back_to_fresh_driver():
+    attempts = []
+
+    def launch():
+        attempts.append(threading.current_thread().name)
+        if len(attempts) == 1:
+            raise RuntimeError("chrome crashed")
+        return FakeDriver(attempts[-1])
+
+    manager = _manager(launch)
+    manager.prewarm(1)
+    assert manager.get_driver().name == threading.current_thread().name
+
+
+def test_unclaimed_prewarmed_drivers_are_quit():
+    created = []
+
+    def launch():
+        created.append(FakeDriver("warm"))
+        return created[-1]
+
+    manager = _manager(launch)
+    manager.prewarm(2)
+    manager.quit_all()
+    assert [driver.quits for driver in created] == [1, 1]
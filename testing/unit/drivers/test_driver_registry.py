@@ -0,0 +1,68 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from pylenium.driver.driver_manager import ThreadLocalDriverManager, quit_concurrently
+
+
+class SlowQuitDriver:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.quit_by = None
+
+    def quit(self):
+        time.sleep(0.2)
+        self.quit_by = threading.current_thread().name
+        if self.fail:
+            raise ConnectionError("driver already gone")
+
+
+def _manager():
+    manager = ThreadLocalDriverManager(SimpleNamespace(browser="FAKE", driver_reuse="test", remote=False, contexts_per_browser=1))
+    manager.supported_drivers = {"FAKE": SlowQuitDriver}
+    return manager
+
+
+def test_every_thread_gets_its_own_driver():
+    manager = _manager()
+    drivers = []
+    barrier = threading.Barrier(4, timeout=5)
+
+    def claim():
+        drivers.append((manager.get_driver(), manager.get_driver()))
+        barrier.wait()
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(first is second for first, second in drivers)
+    assert len({id(first) for first, _ in drivers}) == len(manager.drivers) == 4
+
+
+def test_release_from_another_thread_only_touches_its_own_slot():
+    manager = _manager()
+    driver = manager.get_driver()
+    worker = threading.Thread(target=manager.release_driver)
+    worker.start()
+    worker.join()
+    assert manager.peek_driver() is driver
+
+
+def test_quit_all_quits_drivers_in_parallel():
+    manager = _manager()
+    drivers = [SlowQuitDriver() for _ in range(5)]
+    for thread_id, driver in enumerate(drivers, start=1):
+        manager.drivers.put(driver, thread_id)
+    start = time.perf_counter()
+    manager.quit_all()
+    assert time.perf_counter() - start < 0.8
+    assert all(driver.quit_by.startswith("pylenium-quit") for driver in drivers)
+    assert not len(manager.drivers)
+
+
+def test_failed_quit_does_not_stop_the_others():
+    drivers = [SlowQuitDriver(fail=True), SlowQuitDriver()]
+    quit_concurrently(drivers)
+    assert all(driver.quit_by for driver in drivers)
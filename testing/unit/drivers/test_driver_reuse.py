@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from selenium.common.exceptions import WebDriverException
+
+from pylenium.driver.driver_manager import ThreadLocalDriverManager
+
+
+class FakeDriver:
+    def __init__(self, fail_reset=False):
+        self.fail_reset = fail_reset
+        self.resets = 0
+        self.quits = 0
+
+    def reset(self):
+        if self.fail_reset:
+            raise WebDriverException("browser went away")
+        self.resets += 1
+
+    def quit(self):
+        self.quits += 1
+
+
+def _manager_holding(driver, reuse):
+    config = SimpleNamespace(
+        driver_reuse=reuse,
+        contexts_per_browser=1,
+        driver_max_tests=0,
+        driver_max_age=0.0,
+        driver_max_memory=0.0,
+        driver_liveness_timeout=0.0,
+    )
+    manager = ThreadLocalDriverManager(config)
+    manager.drivers.put(driver)
+    return manager
+
+
+def test_release_quits_by_default():
+    driver = FakeDriver()
+    manager = _manager_holding(driver, "test")
+    manager.release_driver()
+    assert driver.quits == 1
+    assert not len(manager.drivers)
+
+
+def test_release_resets_when_reusing():
+    driver = FakeDriver()
+    manager = _manager_holding(driver, "session")
+    manager.release_driver()
+    assert (driver.resets, driver.quits) == (1, 0)
+    assert manager.drivers.get() is driver
+
+
+def test_failed_reset_replaces_driver():
+    driver = FakeDriver(fail_reset=True)
+    manager = _manager_holding(driver, "session")
+    manager.release_driver()
+    assert driver.quits == 1
+    assert not len(manager.drivers)
+
+
+def test_quit_all():
+    driver = FakeDriver()
+    manager = _manager_holding(driver, "session")
+    manager.quit_all()
+    assert driver.quits == 1
+    assert not len(manager.drivers)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+
+from pylenium.driver.grid_balancer import GridBalancer, parse_hub_urls
+from pylenium.exceptions.custom_exceptions import PyleniumGridException
+
+
+def _grid4(free, busy=0):
+    slots = [{"session": None}] * free + [{"session": {"sessionId": "x"}}] * busy
+    return {"value": {"ready": True, "nodes": [{"slots": slots}]}}
+
+
+class FakePool:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append(url)
+        self.timeout = kwargs.get("timeout")
+        return SimpleNamespace(data=json.dumps(self.statuses[url.replace("/wd/hub/status", "")]).encode("utf-8"))
+
+
+def test_parse_hub_urls():
+    assert parse_hub_urls("http://hub-a, hub-b:5555,", 4444) == ["http://hub-a:4444", "http://hub-b:5555"]
+
+
+def test_least_loaded_hub_is_chosen():
+    pool = FakePool({"http://a:1": _grid4(1, 3), "http://b:1": _grid4(3, 1)})
+    balancer = GridBalancer(["http://a:1", "http://b:1"], pool)
+    assert balancer.create_session(lambda hub: hub) == "http://b:1"
+
+
+def test_status_is_cached():
+    pool = FakePool({"http://a:1": _grid4(2)})
+    balancer = GridBalancer(["http://a:1"], pool, status_ttl=60)
+    balancer.candidates()
+    balancer.candidates()
+    assert len(pool.requests) == 1
+
+
+def test_status_uses_its_own_timeout():
+    pool = FakePool({"http://a:1": _grid4(2)})
+    balancer = GridBalancer(["http://a:1"], pool, status_ttl=60, status_timeout=0.5)
+    balancer.candidates()
+    assert pool.timeout == 0.5
+
+
+def test_refused_session_moves_to_next_hub():
+    pool = FakePool({"http://a:1": _grid4(5), "http://b:1": _grid4(1)})
+    balancer = GridBalancer(["http://a:1", "http://b:1"], pool, status_ttl=60)
+    attempts = []
+
+    def start(hub):
+        attempts.append(hub)
+        if hub == "http://a:1":
+            raise SessionNotCreatedException("no capacity")
+        return hub
+
+    assert balancer.create_session(start) == "http://b:1"
+    assert attempts == ["http://a:1", "http://b:1"]
+    assert balancer.candidates() == ["http://b:1"]
+
+
+def test_invalid_capabilities_are_not_retried():
+    pool = FakePool({"http://a:1": _grid4(5), "http://b:1": _grid4(1)})
+    balancer = GridBalancer(["http://a:1", "http://b:1"], pool, status_ttl=60)
+    attempts = []
+
+    def start(hub):
+        attempts.append(hub)
+        raise SessionNotCreatedException("No nodes support the capabilities in the request")
+
+    with pytest.raises(SessionNotCreatedException):
+        balancer.create_session(start)
+    assert attempts == ["http://a:1"]
+
+
+def test_saturated_grid_waits_then_times_out():
+    pool = FakePool({"http://a:1": _grid4(0, 2)})
+    balancer = GridBalancer(["http://a:1"], pool, status_ttl=0, queue_timeout=0.2, poll_interval=0.05)
+    with pytest.raises(PyleniumGridException):
+        balancer.create_session(lambda hub: hub)
+    assert len(pool.requests) > 1
+
+
+def test_saturated_grid_resumes_when_a_slot_frees():
+    pool = FakePool({"http://a:1": _grid4(0, 1)})
+    balancer = GridBalancer(["http://a:1"], pool, status_ttl=0, queue_timeout=5, poll_interval=0.01)
+    original = pool.request
+
+    def request(method, url, **kwargs):
+        if len(pool.requests) == 3:
+            pool.statuses["http://a:1"] = _grid4(1)
+        return original(method, url, **kwargs)
+
+    pool.request = request
+    assert balancer.create_session(lambda hub: hub) == "http://a:1"
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+from types import SimpleNamespace
+
+import pytest
+
+from pylenium.constants.javascript import PAGE_READY, TRACK_NETWORK_ON_NEW_DOCUMENT
+from pylenium.driver.driver_factories import RemoteWebDriverFactory
+from pylenium.driver.pylenium_driver import PyleniumDriver
+from pylenium.strategies.page_loading_strategy import (
+    FastLoadingPageStrategy,
+    NormalLoadingPageStrategy,
+    PageLoadingStrategy,
+    SlowLoadingPageStrategy,
+)
+
+
+class FakeBrowser:
+    def __init__(self, ready_after=1, browser_name="firefox"):
+        self.ready_after = ready_after
+        self.scripts = []
+        self.visited = []
+        self.capabilities = {"browserName": browser_name}
+        self.command_executor = SimpleNamespace(_commands={})
+        self.executed = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute(self, command, params):
+        self.executed.append((command, params, list(self.visited)))
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        return len(self.scripts) >= self.ready_after
+
+
+def _driver(strategy, browser):
+    config = SimpleNamespace(
+        driver_listener=None,
+        explicit_wait=2,
+        polling_interval=0.01,
+        polling_strategy=None,
+        wait_mode="poll",
+        page_load_strategy=strategy,
+    )
+    return PyleniumDriver(config, browser)
+
+
+@pytest.mark.parametrize(
+    "strategy, capability",
+    [(SlowLoadingPageStrategy(), "normal"), (NormalLoadingPageStrategy(), "normal"), (FastLoadingPageStrategy(), "eager")],
+)
+def test_strategies_map_to_page_load_capability(strategy, capability):
+    assert strategy.capability == capability
+
+
+@pytest.mark.parametrize("strategy", [NormalLoadingPageStrategy(), FastLoadingPageStrategy()])
+def test_browser_guaranteed_readiness_costs_no_round_trip(strategy):
+    browser = FakeBrowser()
+    _driver(strategy, browser).get("http://app.test/")
+    assert browser.visited == ["http://app.test/"]
+    assert browser.scripts == []
+
+
+def test_slow_waits_for_a_quiet_network():
+    browser = FakeBrowser(ready_after=3)
+    _driver(SlowLoadingPageStrategy(), browser).get("http://app.test/")
+    assert browser.scripts == [(PAGE_READY, (["complete"], 500))] * 3
+
+
+def test_no_page_load_strategy_waits_for_the_dom():
+    browser = FakeBrowser()
+    strategy = PageLoadingStrategy(capability="none", ready_states=("interactive", "complete"))
+    _driver(strategy, browser).get("http://app.test/")
+    assert browser.scripts == [(PAGE_READY, (["interactive", "complete"], None))]
+
+
+def test_remote_capabilities_carry_page_load_strategy():
+    config = SimpleNamespace(
+        browser="CHROME", browser_capabilities={}, block_urls=[], page_load_strategy=FastLoadingPageStrategy()
+    )
+    assert RemoteWebDriverFactory(config).resolve_capabilities()["pageLoadStrategy"] == "eager"
+    config.browser_capabilities = {"browserName": "chrome", "pageLoadStrategy": "none"}
+    assert RemoteWebDriverFactory(config).resolve_capabilities()["pageLoadStrategy"] == "none"
+
+
+def test_chrome_tracks_the_network_before_the_first_page_loads():
+    browser = FakeBrowser(browser_name="chrome")
+    driver = _driver(NormalLoadingPageStrategy(), browser)
+    driver.get("http://app.test/")
+    driver.get("http://app.test/other")
+    assert browser.executed == [
+        (
+            "executeCdpCommand",
+            {"cmd": "Page.addScriptToEvaluateOnNewDocument", "params": {"source": TRACK_NETWORK_ON_NEW_DOCUMENT}},
+            [],
+        )
+    ]
+
+
+def test_other_browsers_track_the_network_on_the_first_check():
+    browser = FakeBrowser()
+    _driver(NormalLoadingPageStrategy(), browser).get("http://app.test/")
+    assert browser.executed == []
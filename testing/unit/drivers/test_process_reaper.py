@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pylenium.driver.driver_manager import ThreadLocalDriverManager
+from pylenium.driver.process_reaper import (
+    ProcessReaper,
+    TrackedProcess,
+    descendants,
+    driver_process_ids,
+    process_identity,
+)
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="walks the process tree via /proc")
+
+SPAWNS_A_CHILD = (
+    "import subprocess, sys, time;"
+    "subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']);"
+    "time.sleep(60)"
+)
+
+
+@pytest.fixture
+def process_tree():
+    parent = subprocess.Popen([sys.executable, "-c", SPAWNS_A_CHILD])
+    deadline = time.monotonic() + 5
+    while not descendants(parent.pid) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    yield parent
+    parent.kill()
+    parent.wait()
+
+
+def test_reap_kills_tracked_processes_and_their_children(tmp_path, process_tree):
+    reaper = ProcessReaper(str(tmp_path / "main.json"))
+    reaper.track([process_tree.pid])
+    (child,) = descendants(process_tree.pid)
+    assert {process.pid for process in reaper.tracked} == {process_tree.pid, child}
+    assert json.loads((tmp_path / "main.json").read_text())["owner"] == os.getpid()
+    assert reaper.reap() == 2
+    assert process_tree.wait(timeout=5) is not None
+    assert process_identity(child) is None
+    assert not (tmp_path / "main.json").exists()
+
+
+def test_children_outliving_their_parent_are_still_reaped(process_tree):
+    reaper = ProcessReaper()
+    reaper.track([process_tree.pid])
+    (child,) = descendants(process_tree.pid)
+    process_tree.kill()
+    process_tree.wait()
+    assert reaper.reap() == 1
+    assert process_identity(child) is None
+
+
+def test_recycled_pids_are_left_alone(process_tree):
+    assert not TrackedProcess(process_tree.pid, "not-its-start-time").alive()
+    assert TrackedProcess(process_tree.pid, process_identity(process_tree.pid)).alive()
+
+
+def _write_pid_file(path, owner, processes):
+    path.write_text(json.dumps({"owner": owner, "owner_identity": process_identity(owner), "processes": processes}))
+
+
+def test_orphans_of_a_crashed_worker_are_reaped(tmp_path, process_tree):
+    crashed = subprocess.Popen([sys.executable, "-c", "pass"])
+    tracked = [[process_tree.pid, process_identity(process_tree.pid)]]
+    _write_pid_file(tmp_path / "gw0-1.json", crashed.pid, tracked)
+    crashed.wait()
+    assert ProcessReaper.reap_orphans(str(tmp_path)) == 1
+    assert process_tree.wait(timeout=5) is not None
+    assert not (tmp_path / "gw0-1.json").exists()
+
+
+def test_pid_files_of_running_workers_are_left_alone(tmp_path, process_tree):
+    _write_pid_file(tmp_path / "gw1-2.json", os.getpid(), [[process_tree.pid, process_identity(process_tree.pid)]])
+    assert ProcessReaper.reap_orphans(str(tmp_path)) == 0
+    assert process_tree.poll() is None
+    assert (tmp_path / "gw1-2.json").exists()
+
+
+def test_driver_process_ids():
+    service = SimpleNamespace(process=SimpleNamespace(pid=101))
+    assert driver_process_ids(SimpleNamespace(service=service, capabilities={})) == [101]
+    assert driver_process_ids(SimpleNamespace(capabilities={"moz:processID": 202})) == [202]
+
+
+def test_manager_reaps_what_outlives_shutdown(tmp_path, process_tree):
+    class LeakyDriver:
+        service = SimpleNamespace(process=process_tree)
+        capabilities = {}
+
+        @property
+        def browser(self):
+            return self
+
+        def quit(self):
+            pass
+
+    config = SimpleNamespace(browser="FAKE", driver_reuse="test", remote=False, contexts_per_browser=1)
+    manager = ThreadLocalDriverManager(config, reaper=ProcessReaper(str(tmp_path / "main.json")))
+    manager.supported_drivers = {"FAKE": LeakyDriver}
+    manager.get_driver()
+    manager.shutdown()
+    assert process_tree.wait(timeout=5) is not None
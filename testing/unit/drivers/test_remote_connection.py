@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from selenium.webdriver.remote.command import Command
+
+from pylenium.constants.string_globals import CHROME, REMOTE
+from pylenium.driver.driver_manager import ThreadLocalDriverManager
+from pylenium.driver.remote_connection import build_connection_pool, PooledRemoteConnection
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"value": {"ready": True}, "status": 0}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+
+@pytest.fixture
+def hub():
+    server = CountingServer(("127.0.0.1", 0), StatusHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(remote_pool_size=2, remote_connect_timeout=2.0, remote_read_timeout=5.0, remote_retries=1)
+
+
+def test_sessions_share_keep_alive_connections(hub, config):
+    pool = build_connection_pool(config)
+    url = f"http://127.0.0.1:{hub.server_port}/wd/hub"
+    first, second = PooledRemoteConnection(url, pool), PooledRemoteConnection(url, pool)
+    for _ in range(3):
+        assert first.execute(Command.STATUS, {})["value"]["ready"]
+        assert second.execute(Command.STATUS, {})["value"]["ready"]
+    assert hub.connections == 1
+    pool.clear()
+
+
+def test_pool_uses_configured_limits(config):
+    pool = build_connection_pool(config)
+    assert pool.connection_pool_kw["maxsize"] == 2
+    assert pool.connection_pool_kw["timeout"].connect_timeout == 2.0
+    assert pool.connection_pool_kw["timeout"].read_timeout == 5.0
+    assert pool.connection_pool_kw["retries"].connect == 1
+
+
+def test_remote_flag_routes_to_remote_factory():
+    manager = ThreadLocalDriverManager(SimpleNamespace(browser=CHROME, driver_reuse="test", remote=True, contexts_per_browser=1))
+    manager.supported_drivers = {CHROME: lambda: "local", REMOTE: lambda: "remote"}
+    assert manager.get_driver() == "remote"
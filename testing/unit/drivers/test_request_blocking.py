@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import json
+from types import SimpleNamespace
+from urllib.parse import unquote
+
+from pylenium.driver.request_blocking import (
+    block_in_chrome,
+    count_blocked_requests,
+    firefox_preferences,
+    with_blocking,
+)
+
+
+def _event(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeChrome:
+    def __init__(self, log=()):
+        self.command_executor = SimpleNamespace(_commands={})
+        self.executed = []
+        self.log = list(log)
+
+    def execute(self, command, params):
+        self.executed.append((command, params))
+
+    def get_log(self, kind):
+        entries, self.log = self.log, []
+        return entries
+
+
+def test_chrome_blocks_through_devtools():
+    browser = FakeChrome()
+    block_in_chrome(browser, ["*analytics*", "*.ads.test/*"])
+    assert "executeCdpCommand" in browser.command_executor._commands
+    assert browser.executed[-1] == (
+        "executeCdpCommand",
+        {"cmd": "Network.setBlockedURLs", "params": {"urls": ["*analytics*", "*.ads.test/*"]}},
+    )
+
+
+def test_nothing_is_blocked_without_patterns():
+    browser = FakeChrome()
+    block_in_chrome(browser, [])
+    assert browser.executed == []
+    assert firefox_preferences([]) == {}
+    assert with_blocking({"browserName": "chrome"}, []) == {"browserName": "chrome"}
+
+
+def test_blocked_requests_are_counted_from_the_performance_log():
+    browser = FakeChrome(
+        [
+            _event("Network.loadingFailed", blockedReason="inspector"),
+            _event("Network.loadingFailed", errorText="net::ERR_FAILED"),
+            _event("Network.requestWillBeSent"),
+            _event("Network.loadingFailed", blockedReason="inspector"),
+        ]
+    )
+    assert count_blocked_requests(browser) == 2
+    assert count_blocked_requests(browser) == 0
+
+
+def test_firefox_routes_matches_to_a_dead_proxy():
+    preferences = firefox_preferences(["*analytics*"])
+    pac = unquote(preferences["network.proxy.autoconfig_url"])
+    assert preferences["network.proxy.type"] == 2
+    assert 'shExpMatch(url, "*analytics*")' in pac
+    assert "'DIRECT'" in pac
+
+
+def test_remote_capabilities_keep_user_settings():
+    capabilities = with_blocking(
+        {"browserName": "firefox", "moz:firefoxOptions": {"prefs": {"network.proxy.type": 0}}}, ["*ads*"]
+    )
+    assert capabilities["moz:firefoxOptions"]["prefs"]["network.proxy.type"] == 0
+    assert "network.proxy.autoconfig_url" in capabilities["moz:firefoxOptions"]["prefs"]
+    assert with_blocking({"browserName": "chrome"}, ["*ads*"])["goog:loggingPrefs"] == {"performance": "ALL"}
+
+
+def test_firefox_blocking_routes_the_rest_through_the_caching_proxy():
+    pac = unquote(firefox_preferences(["*ads*"], proxy="127.0.0.1:8899")["network.proxy.autoconfig_url"])
+    assert "'PROXY 127.0.0.1:8899'" in pac
+    preferences = firefox_preferences([], proxy="127.0.0.1:8899")
+    assert preferences["network.proxy.type"] == 1
+    assert preferences["network.proxy.http_port"] == 8899
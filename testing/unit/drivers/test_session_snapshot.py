@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+
+from pylenium.driver.session_snapshot import SessionSnapshot, SessionStore
+
+
+class FakeDriver:
+    def __init__(self):
+        self.restored = []
+
+    def restore_session(self, snapshot):
+        self.restored.append(snapshot)
+
+    def snapshot_session(self):
+        return SessionSnapshot("https://app.test/dashboard?tab=1", cookies=[{"name": "sid", "value": "1", "extra": 2}])
+
+
+def test_origin_and_cookie_fields():
+    snapshot = FakeDriver().snapshot_session()
+    assert snapshot.origin == "https://app.test/"
+    assert snapshot.restorable_cookies() == [{"name": "sid", "value": "1"}]
+
+
+def test_only_cookies_of_the_snapshot_domain_are_restored():
+    cookies = [
+        {"name": "host", "value": "1"},
+        {"name": "exact", "value": "1", "domain": "app.test"},
+        {"name": "parent", "value": "1", "domain": ".app.test"},
+        {"name": "sso", "value": "1", "domain": ".sso.test"},
+        {"name": "lookalike", "value": "1", "domain": "myapp.test"},
+    ]
+    snapshot = SessionSnapshot("https://app.test:8443/", cookies=cookies)
+    assert [cookie["name"] for cookie in snapshot.restorable_cookies()] == ["host", "exact", "parent"]
+
+
+def test_expiry():
+    snapshot = SessionSnapshot("https://app.test/", captured_at=100.0)
+    assert not snapshot.expired(ttl=60, now=130.0)
+    assert snapshot.expired(ttl=60, now=160.0)
+    snapshot.cookies.append({"name": "sid", "value": "1", "expiry": 120})
+    assert snapshot.expired(ttl=60, now=130.0)
+
+
+def test_login_runs_once_then_restores():
+    store, logins = SessionStore(ttl=60), []
+    first, second = FakeDriver(), FakeDriver()
+    store.login("admin", first, logins.append)
+    store.login("admin", second, logins.append)
+    assert logins == [first]
+    assert len(second.restored) == 1
+    assert not first.restored
+
+
+def test_stale_snapshot_logs_in_again():
+    store, logins = SessionStore(ttl=60), []
+    store.put("admin", SessionSnapshot("https://app.test/", captured_at=time.time() - 120))
+    store.login("admin", FakeDriver(), logins.append)
+    assert len(logins) == 1
+
+
+def test_roles_are_independent_and_concurrent_logins_wait():
+    store, logins = SessionStore(ttl=60), []
+
+    def login(driver):
+        time.sleep(0.05)
+        logins.append(driver)
+
+    threads = [threading.Thread(target=store.login, args=("user", FakeDriver(), login)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    store.login("admin", FakeDriver(), login)
+    assert len(logins) == 2
+    store.invalidate()
+    assert store.get("user") is None
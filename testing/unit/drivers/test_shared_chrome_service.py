@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+from pylenium.driver import driver_factories
+from pylenium.driver.driver_factories import ChromeDriverFactory
+from pylenium.strategies.page_loading_strategy import NormalLoadingPageStrategy
+
+
+class FakeService:
+    started = []
+
+    def __init__(self, executable_path):
+        self.executable_path = executable_path
+        self.process = None
+        self.stopped = False
+
+    def start(self):
+        self.process = SimpleNamespace(poll=lambda: 0 if self.stopped else None)
+        FakeService.started.append(self)
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    FakeService.started = []
+    monkeypatch.setattr(driver_factories, "Service", FakeService)
+    monkeypatch.setattr(driver_factories, "SharedServiceChrome", lambda service, desired_capabilities: service)
+    monkeypatch.setattr(driver_factories, "PyleniumDriver", lambda config, browser: browser)
+    resolver = SimpleNamespace(resolve=lambda browser, install: "/bin/chromedriver")
+    return ChromeDriverFactory(
+        SimpleNamespace(chrome_switches=[], block_urls=[], proxy_address=None, page_load_strategy=NormalLoadingPageStrategy()), resolver
+    )
+
+
+def test_sessions_share_one_service(factory):
+    assert factory.get_driver() is factory.get_driver()
+    assert len(FakeService.started) == 1
+
+
+def test_dead_service_is_restarted(factory):
+    first = factory.get_driver()
+    first.stopped = True
+    assert factory.get_driver() is not first
+    assert len(FakeService.started) == 2
+
+
+def test_shutdown_stops_service(factory):
+    service = factory.get_driver()
+    factory.shutdown()
+    assert service.stopped
@@ -0,0 +1,46 @@
+from pylenium.elements.pylenium_elements import PyleniumElements
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.calls = []
+
+    def execute_script(self, script, elements, reads):
+        self.calls.append(reads)
+        results = {
+            ("text",): [f"row {index}" for index, _ in enumerate(elements)],
+            ("visible",): [True for _ in elements],
+        }
+        return [results.get(tuple(read), [read[-1] for _ in elements]) for read in reads]
+
+
+def test_texts_are_read_in_one_call():
+    browser = FakeBrowser()
+    elements = PyleniumElements(browser, range(500))
+    assert elements.texts()[499] == "row 499"
+    assert len(browser.calls) == 1
+
+
+def test_reads_are_cached_until_refresh():
+    browser = FakeBrowser()
+    elements = PyleniumElements(browser, range(3))
+    elements.attributes("href")
+    elements.attributes("href")
+    assert len(browser.calls) == 1
+    elements.refresh().attributes("href")
+    assert len(browser.calls) == 2
+
+
+def test_prefetch_reads_everything_at_once():
+    browser = FakeBrowser()
+    elements = PyleniumElements(browser, range(3)).prefetch(attributes=("href", "class"))
+    assert browser.calls == [[("text",), ("visible",), ("attribute", "href"), ("attribute", "class")]]
+    assert elements.visibility() == [True, True, True]
+    assert elements.attributes("class") == ["class", "class", "class"]
+    assert len(browser.calls) == 1
+
+
+def test_empty_collection_makes_no_calls():
+    browser = FakeBrowser()
+    assert PyleniumElements(browser, []).texts() == []
+    assert not browser.calls
@@ -0,0 +1,152 @@
+from itertools import islice
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from pylenium.constants.javascript import NETWORK_IDLE
+from pylenium.elements.pylenium_wait import PyleniumWait
+from pylenium.strategies.polling_strategy import BackoffPollingStrategy, FixedPollingStrategy, PollingStrategy
+
+
+def test_backoff_delays_are_capped():
+    strategy = BackoffPollingStrategy(initial=0.01, factor=2.0, maximum=0.05, jitter=0)
+    assert list(islice(strategy.delays(), 5)) == [0.01, 0.02, 0.04, 0.05, 0.05]
+
+
+def test_backoff_jitter_stays_in_bounds():
+    strategy = BackoffPollingStrategy(initial=0.1, maximum=0.1, jitter=0.2)
+    assert all(0.08 <= delay <= 0.12 for delay in islice(strategy.delays(), 50))
+
+
+def test_polling_strategy_is_abstract():
+    with pytest.raises(TypeError):
+        PollingStrategy()
+
+
+def test_until_counts_polls():
+    attempts = iter([False, False, "found"])
+
+    def element_is_ready(driver):
+        return next(attempts)
+
+    wait = PyleniumWait(None, 5, polling_strategy=FixedPollingStrategy(0))
+    assert wait.until(element_is_ready) == "found"
+    assert wait.last_poll_count == 3
+    assert wait.statistics["element_is_ready"].polls == 3
+    assert wait.statistics["element_is_ready"].timeouts == 0
+
+
+def test_until_ignores_not_found():
+    attempts = iter([NoSuchElementException(), "found"])
+
+    def element_is_present(driver):
+        outcome = next(attempts)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    wait = PyleniumWait(None, 5, polling_strategy=FixedPollingStrategy(0))
+    assert wait.until(element_is_present) == "found"
+
+
+def test_until_times_out():
+    def never(driver):
+        return False
+
+    wait = PyleniumWait(None, 0.05, polling_strategy=FixedPollingStrategy(0.01))
+    with pytest.raises(TimeoutException):
+        wait.until(never)
+    assert wait.statistics["never"].timeouts == 1
+    assert wait.last_poll_count > 1
+
+
+def test_until_not():
+    attempts = iter([True, False])
+    wait = PyleniumWait(None, 5, polling_strategy=FixedPollingStrategy(0))
+    assert wait.until_not(lambda driver: next(attempts))
+    assert wait.last_poll_count == 2
+
+
+class FakeBrowser:
+    def __init__(self, async_result=None, async_error=None):
+        self.async_result = async_result
+        self.async_error = async_error
+        self.scripts = []
+        self.found = 0
+        self.script_timeouts = []
+
+    def set_script_timeout(self, timeout):
+        self.script_timeouts.append(timeout)
+
+    def execute_async_script(self, script, *args):
+        self.scripts.append(args)
+        if self.async_error:
+            raise self.async_error
+        return self.async_result
+
+    def find_element(self, by, value):
+        self.found += 1
+        return "polled"
+
+
+def test_observer_resolves_in_one_call():
+    browser = FakeBrowser(async_result={"value": "observed"})
+    wait = PyleniumWait(browser, 5, wait_mode="observer")
+    assert wait.until_located((By.ID, "login"), "present") == "observed"
+    assert browser.scripts == [("css", '[id="login"]', "present", None, 5000)]
+    assert wait.statistics["observe_present"].polls == 1
+
+
+def test_observer_restores_the_script_timeout():
+    class ReportingBrowser(FakeBrowser):
+        command_executor = type("Executor", (), {"_commands": {}})()
+
+        def execute(self, command, params=None):
+            return {"value": {"script": 10000, "pageLoad": 300000, "implicit": 0}}
+
+    browser = ReportingBrowser(async_error=WebDriverException("async scripts unsupported"))
+    wait = PyleniumWait(browser, 5, wait_mode="observer", polling_strategy=FixedPollingStrategy(0))
+    wait.until_located((By.ID, "login"), "present")
+    assert browser.script_timeouts == [10, 10.0]
+
+
+def test_observer_restores_the_default_script_timeout():
+    browser = FakeBrowser(async_result={"value": "observed"})
+    PyleniumWait(browser, 5, wait_mode="observer").until_located((By.ID, "login"), "present")
+    assert browser.script_timeouts == [10, 30.0]
+
+
+def test_observer_timeout():
+    wait = PyleniumWait(FakeBrowser(async_result={"timeout": True}), 1, wait_mode="observer")
+    with pytest.raises(TimeoutException):
+        wait.until_located((By.CSS_SELECTOR, "#login"), "visible")
+
+
+def test_observer_falls_back_to_polling():
+    browser = FakeBrowser(async_error=WebDriverException("async scripts unsupported"))
+    wait = PyleniumWait(browser, 5, wait_mode="observer", polling_strategy=FixedPollingStrategy(0))
+    assert wait.until_located((By.XPATH, "//form"), "present") == "polled"
+    assert browser.found == 1
+
+
+def test_unobservable_locator_polls():
+    browser = FakeBrowser()
+    wait = PyleniumWait(browser, 5, wait_mode="observer", polling_strategy=FixedPollingStrategy(0))
+    assert wait.until_located((By.LINK_TEXT, "Sign in"), "present") == "polled"
+    assert not browser.scripts
+
+
+def test_until_network_idle():
+    class Page:
+        calls = []
+
+        def execute_script(self, script, *args):
+            self.calls.append((script, args))
+            return len(self.calls) == 3
+
+    page = Page()
+    wait = PyleniumWait(page, 5, polling_strategy=FixedPollingStrategy(0))
+    assert wait.until_network_idle(0.25)
+    assert page.calls == [(NETWORK_IDLE, (250,))] * 3
+    assert wait.statistics["network_is_idle"].polls == 3
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import pytest
+
+from pylenium.fake_webdriver.dom import InvalidSelector, parse, select, xpath
+
+PAGE = """
+<html><head><title>Fixture</title></head><body>
+<div id="main" class="panel wide">
+  <p>Hello <b>world</b></p>
+  <a href="/next" data-role="nav-link">Next</a>
+  <ul><li>one</li><li style="display: none">two</li><li hidden>three</li></ul>
+</div>
+<input type="checkbox" name="agree" checked>
+</body></html>
+"""
+
+
+@pytest.fixture
+def document():
+    return parse(PAGE)
+
+
+@pytest.mark.parametrize(
+    "selector, tags",
+    [
+        ("#main > p", ["p"]),
+        ("div b", ["b"]),
+        (".panel.wide a", ["a"]),
+        ("[data-role^=nav]", ["a"]),
+        ('input[name="agree"], p', ["p", "input"]),
+        ("body > b", []),
+    ],
+)
+def test_css_selectors(document, selector, tags):
+    assert [node.tag for node in select(document, selector)] == tags
+
+
+@pytest.mark.parametrize(
+    "expression, count",
+    [("//li", 3), ("//div[@id='main']//a", 1), ("//a[text()='Next']", 1), ("//p[contains(., 'world')]", 1), ("//li[2]", 1)],
+)
+def test_xpath(document, expression, count):
+    assert len(xpath(document, expression)) == count
+
+
+def test_unsupported_selectors_are_rejected(document):
+    with pytest.raises(InvalidSelector):
+        select(document, "li + li")
+    with pytest.raises(InvalidSelector):
+        xpath(document, "//li[last()]")
+
+
+def test_visible_text_skips_hidden_nodes(document):
+    assert select(document, "#main")[0].visible_text() == "Hello world Next one"
+    assert not select(document, "li")[1].displayed()
+    assert select(document, "p")[0].visible_text() == "Hello world"
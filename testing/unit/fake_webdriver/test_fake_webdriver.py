@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+import json
+from urllib.request import urlopen
+
+import pytest
+from selenium import webdriver
+from selenium.common.exceptions import (
+    InvalidSelectorException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+
+from pylenium.driver.grid_balancer import HubStatus
+from pylenium.fake_webdriver.server import FakeWebDriverServer
+
+HOME = """
+<title>Home</title>
+<form><input name="q"><input type="checkbox" id="agree"></form>
+<a href="/next">Next page</a>
+"""
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FakeWebDriverServer() as fake:
+        fake.add_page("http://app.test/", HOME)
+        fake.add_page("http://app.test/next", "<title>Next</title><h1 class='heading'>Arrived</h1>")
+        yield fake
+
+
+@pytest.fixture
+def browser(server):
+    remote = webdriver.Remote(command_executor=f"{server.url}/wd/hub", desired_capabilities={"browserName": "chrome"})
+    remote.get("http://app.test/")
+    yield remote
+    remote.quit()
+
+
+def test_session_lifecycle(server):
+    created = server.sessions_created
+    remote = webdriver.Remote(command_executor=server.url, desired_capabilities={"browserName": "chrome"})
+    assert remote.w3c
+    assert remote.session_id in server.sessions
+    remote.quit()
+    assert remote.session_id not in server.sessions
+    assert server.sessions_created == created + 1
+
+
+def test_interactions(browser):
+    field = browser.find_element_by_name("q")
+    field.send_keys("pylenium")
+    checkbox = browser.find_element_by_id("agree")
+    checkbox.click()
+    assert field.get_attribute("value") == "pylenium"
+    assert checkbox.is_selected()
+    assert browser.title == "Home"
+
+
+def test_navigation_invalidates_elements(browser):
+    link = browser.find_element_by_link_text("Next page")
+    link.click()
+    assert browser.current_url == "http://app.test/next"
+    assert browser.find_element_by_class_name("heading").text == "Arrived"
+    with pytest.raises(StaleElementReferenceException):
+        link.text
+    browser.back()
+    assert browser.title == "Home"
+
+
+def test_errors(browser):
+    with pytest.raises(NoSuchElementException):
+        browser.find_element_by_id("missing")
+    with pytest.raises(InvalidSelectorException):
+        browser.find_element_by_css_selector("a ~ b")
+    with pytest.raises(WebDriverException):
+        browser.execute_script("return 1 + 1")
+
+
+def test_failing_handlers_are_unknown_errors(server, browser):
+    server.register_script("return broken()", lambda session: 1 / 0)
+    with pytest.raises(WebDriverException, match="ZeroDivisionError"):
+        browser.execute_script("return broken()")
+    assert browser.title == "Home"
+
+
+def test_status_is_not_saturated(server):
+    payload = json.loads(urlopen(f"{server.url}/wd/hub/status").read())
+    assert not HubStatus.from_payload(server.url, payload).saturated()
+
+
+def test_registered_scripts(server, browser):
+    server.register_script("return arguments[0].tagName", lambda session, element: element.tag.upper())
+    assert browser.execute_script("return arguments[0].tagName", browser.find_element_by_name("q")) == "INPUT"
+
+
+def test_cookies_and_windows(browser):
+    browser.add_cookie({"name": "token", "value": "abc"})
+    assert browser.get_cookie("token")["value"] == "abc"
+    browser.delete_all_cookies()
+    assert browser.get_cookies() == []
+    assert len(browser.window_handles) == 1
+
+
+def test_plugin_runs_against_fake_webdriver(testdir):
+    testdir.makepyfile(
+        """
+        def test_fake(fake_webdriver, driver, pylenium_config):
+            fake_webdriver.add_page("http://app.test/", "<ul><li>a</li><li>b</li></ul>")
+            driver.get("http://app.test/")
+            assert driver.find_all("li").texts() == ["a", "b"]
+            assert pylenium_config.remote
+    """
+    )
+    result = testdir.runpytest("--fake-webdriver", "-v")
+    result.stdout.fnmatch_lines(
+        ["*::test_fake PASSED*",]
+    )
+    assert result.ret == 0
+
+
+def test_login_as_restores_the_captured_session(testdir):
+    testdir.makepyfile(
+        """
+        import pytest
+
+        logins = []
+
+
+        def login(driver):
+            logins.append(driver)
+            driver.get("http://app.test/login")
+            driver.browser.add_cookie({"name": "sid", "value": "secret"})
+
+
+        @pytest.mark.parametrize("attempt", range(3))
+        def test_login(fake_webdriver, driver, login_as, attempt):
+            fake_webdriver.add_page("http://app.test/login", "<title>Login</title>")
+            fake_webdriver.add_page("http://app.test/", "<title>Home</title>")
+            login_as("admin", login)
+            assert driver.browser.get_cookie("sid")["value"] == "secret"
+            assert len(logins) == 1
+    """
+    )
+    result = testdir.runpytest("--fake-webdriver", "--driver-reuse=session", "-v")
+    result.assert_outcomes(passed=3)
+
+
+def test_blocked_requests_are_reported(testdir):
+    testdir.makepyfile(
+        """
+        def test_blocking(fake_webdriver, driver, request):
+            fake_webdriver.add_page("http://app.test/", "<p>page</p>")
+            driver.get("http://app.test/")
+    """
+    )
+    result = testdir.runpytest("--fake-webdriver", "--block-urls=*analytics*", "-v")
+    result.stdout.fnmatch_lines(["*pylenium request blocking*", "0 requests blocked across 1 tests"])
+    assert result.ret == 0
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import http.client
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import urllib3
+
+from pylenium.exceptions.custom_exceptions import PyleniumProxyException
+from pylenium.proxy.caching_proxy import CachingProxy
+
+BUNDLE = b"console.log('bundle');" * 1000
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    routes = {
+        "/fresh.js": {"Content-Type": "application/javascript", "Cache-Control": "max-age=600", "ETag": '"v1"'},
+        "/stale.js": {"Content-Type": "application/javascript", "Cache-Control": "no-cache", "ETag": '"v1"'},
+        "/page.html": {"Content-Type": "text/html"},
+        "/tracked.png": {"Content-Type": "image/png", "Set-Cookie": "id=1"},
+    }
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/socket":
+            self.send_response(101, "Switching Protocols")
+            self.send_header("Connection", "Upgrade")
+            self.send_header("Upgrade", self.headers["Upgrade"])
+            self.end_headers()
+            self.wfile.flush()
+            self.connection.sendall(self.connection.recv(4))
+            self.close_connection = True
+            return
+        if self.path == "/feed":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in (b"data: 1\n\n", b"data: 2\n\n"):
+                self.wfile.write(b"%x\r\n%b\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        headers = self.routes[self.path]
+        if "ETag" in headers and self.headers.get("If-None-Match") == headers["ETag"]:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(BUNDLE)))
+        self.end_headers()
+        self.wfile.write(BUNDLE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OriginHandler)
+    server.daemon_threads = True
+    server.requests = []
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def proxy(tmp_path):
+    running = CachingProxy(str(tmp_path)).start()
+    yield running
+    running.stop()
+
+
+def _get(proxy, url):
+    client = urllib3.ProxyManager(f"http://{proxy.address}")
+    try:
+        return client.request("GET", url, retries=False)
+    finally:
+        client.clear()
+
+
+def test_fresh_assets_are_served_from_cache(origin, proxy):
+    url, server = origin
+    assert _get(proxy, f"{url}/fresh.js").data == BUNDLE
+    assert _get(proxy, f"{url}/fresh.js").data == BUNDLE
+    assert len(server.requests) == 1
+    assert proxy.statistics.hits == 1
+    assert proxy.statistics.bytes_from_cache == len(BUNDLE)
+    assert proxy._fetch_locks == {}
+
+
+def test_stale_assets_are_revalidated_by_etag(origin, proxy):
+    url, server = origin
+    _get(proxy, f"{url}/stale.js")
+    assert _get(proxy, f"{url}/stale.js").data == BUNDLE
+    assert server.requests == [("/stale.js", None), ("/stale.js", '"v1"')]
+    assert proxy.statistics.revalidated == 1
+
+
+@pytest.mark.parametrize("path", ["/page.html", "/tracked.png"])
+def test_documents_and_personalised_responses_are_not_cached(origin, proxy, path):
+    url, server = origin
+    _get(proxy, f"{url}{path}")
+    _get(proxy, f"{url}{path}")
+    assert len(server.requests) == 2
+    assert proxy.statistics.hits == 0
+
+
+def test_cache_is_shared_between_proxies(origin, proxy, tmp_path):
+    url, server = origin
+    _get(proxy, f"{url}/fresh.js")
+    other = CachingProxy(str(tmp_path)).start()
+    try:
+        assert _get(other, f"{url}/fresh.js").data == BUNDLE
+    finally:
+        other.stop()
+    assert len(server.requests) == 1
+
+
+def test_connect_is_tunnelled(origin, proxy):
+    url, server = origin
+    host, port = proxy.address.split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=5)
+    connection.set_tunnel("127.0.0.1", int(url.rsplit(":", 1)[1]))
+    connection.request("GET", "/page.html")
+    assert connection.getresponse().read() == BUNDLE
+    connection.close()
+
+
+def test_responses_without_a_length_are_streamed(origin, proxy):
+    url, server = origin
+    response = _get(proxy, f"{url}/feed")
+    assert response.data == b"data: 1\n\ndata: 2\n\n"
+    assert response.headers["Transfer-Encoding"] == "chunked"
+    assert proxy.statistics.misses == 1
+
+
+def test_upgrade_is_tunnelled(origin, proxy):
+    url, server = origin
+    host, port = proxy.address.split(":")
+    with socket.create_connection((host, int(port)), timeout=5) as client:
+        request = f"GET {url}/socket HTTP/1.1\r\nHost: {url[7:]}\r\nConnection: Upgrade\r\nUpgrade: websocket\r\n\r\n"
+        client.sendall(request.encode())
+        response = b""
+        while b"\r\n\r\n" not in response:
+            response += client.recv(1024)
+        assert response.startswith(b"HTTP/1.1 101")
+        assert b"Upgrade: websocket" in response
+        client.sendall(b"ping")
+        assert client.recv(4) == b"ping"
+
+
+def test_unusable_port_raises(tmp_path):
+    taken = socket.socket()
+    taken.bind(("127.0.0.1", 0))
+    taken.listen()
+    try:
+        with pytest.raises(PyleniumProxyException):
+            CachingProxy(str(tmp_path), port=taken.getsockname()[1])
+    finally:
+        taken.close()
@@ -0,0 +1,60 @@
+import base64
+import gzip
+
+from pylenium.reporting.artifacts import ArtifactWriter, artifact_name
+
+
+def test_artifacts_are_compressed_in_the_background(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), compression="gzip")
+    path = writer.submit("page.html", "<html></html>")
+    writer.close()
+    assert path == str(tmp_path / "page.html.gz")
+    with gzip.open(path) as written:
+        assert written.read() == b"<html></html>"
+
+
+def test_base64_payloads_are_decoded(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), compression="gzip")
+    path = writer.submit("shot.png", base64.b64encode(b"\x89PNG").decode(), base64_encoded=True, compress=False)
+    writer.close()
+    with open(path, "rb") as written:
+        assert written.read() == b"\x89PNG"
+
+
+def test_session_byte_limit(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), compression="none", max_bytes=10)
+    assert writer.submit("first.txt", "123456") == str(tmp_path / "first.txt")
+    assert writer.submit("second.txt", "123456") is None
+    writer.close()
+    assert [path.name for path in tmp_path.iterdir()] == ["first.txt"]
+    assert writer.bytes_written == 6
+    assert writer.bytes_reserved == 0
+    assert writer.dropped == 1
+
+
+def test_compressed_artifacts_reserve_their_worst_case(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), compression="gzip", max_bytes=100)
+    assert writer.submit("tiny.txt", "x") is not None
+    writer.close()
+    with gzip.open(tmp_path / "tiny.txt.gz") as written:
+        assert written.read() == b"x"
+    assert 0 < writer.bytes_written <= 1 + 64
+
+
+def test_artifact_name_is_file_system_safe():
+    assert artifact_name("tests/test_login.py::test_user[admin/root]", ".png") == (
+        "tests_test_login.py_test_user_admin_root.png"
+    )
+
+
+def test_failing_report_lists_its_artifacts(testdir):
+    testdir.makeconftest(
+        """
+        def pytest_runtest_logreport(report):
+            if report.when == "call":
+                print("PROPERTIES", report.user_properties)
+    """
+    )
+    testdir.makepyfile("def test_fails():\n    assert False\n")
+    result = testdir.runpytest("--stack-trace-on-fail", "--artifacts-dir=artifacts", "-s")
+    result.stdout.fnmatch_lines(["*PROPERTIES [[]('pylenium_artifact', '*test_fails.txt.gz')[]]"])
@@ -0,0 +1,53 @@
+import threading
+
+from pylenium.reporting.command_timings import CommandTimingRecorder, percentile
+
+
+class FakeBrowser:
+    def execute(self, driver_command, params=None):
+        return {"value": driver_command}
+
+
+def test_percentile_nearest_rank():
+    ordered = [float(value) for value in range(1, 101)]
+    assert percentile(ordered, 0.50) == 50.0
+    assert percentile(ordered, 0.95) == 95.0
+    assert percentile(ordered, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_instrumented_commands_are_recorded_per_test():
+    recorder = CommandTimingRecorder()
+    browser = recorder.instrument(FakeBrowser())
+    recorder.start_test("test_login")
+    assert browser.execute("findElement", {})["value"] == "findElement"
+    browser.execute("clickElement", {})
+    recorder.finish_test()
+    assert set(recorder.summary()) == {"findElement", "clickElement"}
+    assert recorder.top_tests()[0]["nodeid"] == "test_login"
+    assert recorder.top_tests()[0]["commands"] == 2
+
+
+def test_instrumenting_twice_times_once():
+    recorder = CommandTimingRecorder()
+    browser = recorder.instrument(recorder.instrument(FakeBrowser()))
+    browser.execute("get", {})
+    assert recorder.summary()["get"]["count"] == 1
+
+
+def test_tests_are_tracked_per_thread():
+    recorder = CommandTimingRecorder()
+    recorder.start_test("test_main")
+    worker = threading.Thread(target=lambda: recorder.record("get", 0.1))
+    worker.start()
+    worker.join()
+    assert recorder.top_tests()[0]["nodeid"] == "<outside of a test>"
+
+
+def test_merge_worker_timings():
+    worker, controller = CommandTimingRecorder(), CommandTimingRecorder()
+    worker.record("get", 0.5)
+    controller.record("get", 0.1)
+    controller.merge(worker.to_dict())
+    assert controller.summary()["get"]["count"] == 2
+    assert controller.summary()["get"]["max"] == 0.5
@@ -0,0 +1,25 @@
+import json
+import subprocess
+import sys
+
+HEAVY_MODULES = ["selenium.webdriver", "webdriver_manager", "yaml", "loguru"]
+IMPORT_BUDGET_MICROSECONDS = 100_000
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True)
+
+
+def test_plugin_defers_heavy_imports():
+    imported = _run(
+        "import json, sys, pylenium.plugin;"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    )
+    assert json.loads(imported.stdout) == []
+
+
+def test_plugin_import_budget():
+    # pytest is imported first as it is always loaded before the plugin, only pyleniums own cost is measured
+    timings = _run("import pytest; import pylenium.plugin", "-X", "importtime").stderr.splitlines()
+    cumulative = [int(line.split("|")[1]) for line in timings if line.split("|")[-1].strip() == "pylenium"]
+    assert cumulative and cumulative[0] < IMPORT_BUDGET_MICROSECONDS
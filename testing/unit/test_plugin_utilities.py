@@ -1,5 +1,7 @@
+from types import SimpleNamespace
+
 from pylenium.constants.string_globals import PYTEST_XDIST_WORKER
-from pylenium.utilities.plugin_utility import is_master_process
+from pylenium.utilities.plugin_utility import is_master_process, is_xdist_controller
 
 
 def test_is_master_on_xdist_worker(monkeypatch):
@@ -9,3 +11,19 @@ def test_is_master_on_xdist_worker(monkeypatch):
 
 def test_is_master_on_master():
     assert is_master_process()
+
+
+def test_is_xdist_controller_with_numprocesses():
+    config = SimpleNamespace(option=SimpleNamespace(numprocesses=4))
+    assert is_xdist_controller(config)
+
+
+def test_is_xdist_controller_without_xdist():
+    config = SimpleNamespace(option=SimpleNamespace())
+    assert not is_xdist_controller(config)
+
+
+def test_is_xdist_controller_on_worker(monkeypatch):
+    monkeypatch.setenv(PYTEST_XDIST_WORKER, "gw0")
+    config = SimpleNamespace(option=SimpleNamespace(numprocesses=4))
+    assert not is_xdist_controller(config)
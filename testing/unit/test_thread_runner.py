@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+
+#  MIT License
+#
+#  Copyright (c) 2019 Simon Kerr
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+#  documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+#  and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all copies or substantial portions of the
+#  Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT
+#  NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from pylenium.utilities.thread_runner import check_pytest_supported
+
+CONFTEST = """
+import threading
+
+import pytest
+
+events = []
+barrier = threading.Barrier(2, timeout=5)
+
+
+@pytest.fixture(scope="session")
+def resource():
+    events.append("session setup")
+    yield barrier
+    events.append("session teardown")
+
+
+def pytest_unconfigure(config):
+    print("EVENTS", sorted(events))
+"""
+
+
+def test_modules_run_concurrently(testdir):
+    testdir.makeconftest(CONFTEST)
+    for name in ("test_first", "test_second"):
+        testdir.makepyfile(
+            **{
+                name: """
+                import threading
+
+                import pytest
+
+                from conftest import events
+
+
+                @pytest.fixture(scope="module")
+                def module_resource(request):
+                    events.append(f"module setup {request.module.__name__}")
+                    yield
+                    events.append(f"module teardown {request.module.__name__}")
+
+
+                def test_waits_for_the_other_module(resource, module_resource):
+                    resource.wait()
+                    assert threading.current_thread().name.startswith("pylenium-runner")
+
+
+                def test_after(module_resource):
+                    pass
+            """
+            }
+        )
+    result = testdir.runpytest("--pylenium-threads=2", "-v", "-s")
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines(
+        [
+            "EVENTS ['module setup test_first', 'module setup test_second', 'module teardown test_first', "
+            "'module teardown test_second', 'session setup', 'session teardown']",
+        ]
+    )
+
+
+def test_single_thread_runs_as_usual(testdir):
+    testdir.makepyfile(
+        """
+        import threading
+
+        def test_main_thread():
+            assert threading.current_thread() is threading.main_thread()
+    """
+    )
+    result = testdir.runpytest()
+    result.assert_outcomes(passed=1)
+
+
+def test_exitfirst_stops_every_thread(testdir):
+    testdir.makepyfile(
+        test_failing="""
+        def test_fails():
+            assert False
+    """,
+        test_passing="""
+        import time
+
+        def test_slow():
+            time.sleep(0.2)
+
+        def test_skipped_by_exitfirst():
+            pass
+    """,
+    )
+    result = testdir.runpytest("--pylenium-threads=2", "-x")
+    assert result.ret == 1
+    outcomes = result.parseoutcomes()
+    assert outcomes["failed"] == 1
+    assert outcomes.get("passed", 0) < 2
+
+
+def test_function_fixtures_are_set_up_per_thread(testdir):
+    testdir.makeconftest(
+        """
+        import threading
+
+        import pytest
+
+        @pytest.fixture(scope="session")
+        def barrier():
+            return threading.Barrier(2, timeout=5)
+
+
+        @pytest.fixture
+        def thread_id():
+            return threading.get_ident()
+    """
+    )
+    for name in ("test_first", "test_second"):
+        testdir.makepyfile(
+            **{
+                name: """
+                import threading
+
+
+                def test_thread_id(barrier, thread_id):
+                    barrier.wait()
+                    assert thread_id == threading.get_ident()
+            """
+            }
+        )
+    result = testdir.runpytest("--pylenium-threads=2", "-v")
+    result.assert_outcomes(passed=2)
+
+
+def test_function_fixtures_are_set_up_concurrently(testdir):
+    testdir.makeconftest(
+        """
+        import threading
+
+        import pytest
+
+
+        @pytest.fixture(scope="session")
+        def barrier():
+            return threading.Barrier(2, timeout=5)
+
+
+        @pytest.fixture
+        def slow_browser(barrier):
+            # both threads are inside setup / teardown at once, as launching and quitting browsers would be
+            barrier.wait()
+            yield
+            barrier.wait()
+    """
+    )
+    for name in ("test_first", "test_second"):
+        testdir.makepyfile(**{name: "def test_launches(slow_browser):\n    pass\n"})
+    result = testdir.runpytest("--pylenium-threads=2", "-v")
+    result.assert_outcomes(passed=2)
+
+
+def test_unsupported_pytest_is_rejected():
+    with pytest.raises(pytest.UsageError, match="--pylenium-threads supports pytest 7.0"):
+        check_pytest_supported("6.2.5")
+    check_pytest_supported("8.3.1")
+
+
+def test_driver_fixture_is_set_up_per_thread(testdir):
+    testdir.makeconftest(
+        """
+        import threading
+
+        import pytest
+
+
+        @pytest.fixture(scope="session")
+        def barrier():
+            return threading.Barrier(2, timeout=5)
+    """
+    )
+    for name in ("test_first", "test_second"):
+        testdir.makepyfile(
+            **{
+                name: """
+                from pylenium.plugin import thread_local_drivers
+
+
+                def test_driver(barrier, fake_webdriver, driver):
+                    barrier.wait()
+                    assert driver is thread_local_drivers.peek_driver()
+                    fake_webdriver.add_page("http://app.test/", "<title>app</title>")
+                    driver.get("http://app.test/")
+            """
+            }
+        )
+    result = testdir.runpytest("--fake-webdriver", "--pylenium-threads=2", "-v")
+    result.assert_outcomes(passed=2)